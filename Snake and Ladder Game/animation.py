@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Централен распоредувач на анимации за Tk
+Еден tick со фиксна фреквенција ги движи сите активни анимации, напредокот
+се пресметува од времето (не од бројот на frame-ови), со режими normal/turbo/instant
+"""
+
+import time
+
+from latency_stats import LatencyStats
+
+FRAME_RATE = 60
+
+MODE_NORMAL = "normal"
+MODE_TURBO = "turbo"
+# Instant: анимациите веднаш завршуваат (ботови, replay, надоврзување по reconnect)
+MODE_INSTANT = "instant"
+MODE_SPEED = {MODE_NORMAL: 1.0, MODE_TURBO: 4.0}
+
+
+def linear(t):
+    return t
+
+
+def ease_in_out(t):
+    return t * t * (3.0 - 2.0 * t)
+
+
+class Animation:
+    """on_frame(progress) за progress во [0, 1], па on_done() на крај"""
+
+    __slots__ = ("duration", "on_frame", "on_done", "easing", "started_at", "cancelled")
+
+    def __init__(self, duration, on_frame, on_done, easing, started_at):
+        self.duration = duration
+        self.on_frame = on_frame
+        self.on_done = on_done
+        self.easing = easing
+        self.started_at = started_at
+        self.cancelled = False
+
+    def deadline(self):
+        return self.started_at + self.duration
+
+
+class AnimationScheduler:
+    """
+    Сите анимации на еден прозорец делат еден root.after тајмер.
+    Тајмерот постои само додека има активни анимации; ако ниту една не
+    црта (само чекања), tick-от спие до најблискиот рок наместо по frame.
+    """
+
+    def __init__(self, root, fps=FRAME_RATE, mode=MODE_NORMAL):
+        self.root = root
+        self.frame_interval = 1.0 / fps
+        self.mode = mode
+        self._animations = {}
+        self._next_key = 0
+        self._after_id = None
+        self._last_tick = None
+        self.closed = False
+
+        # Време на работа по tick и вистински интервал меѓу tick-ови
+        self.frame_times = LatencyStats()
+        self.frame_intervals = LatencyStats()
+
+    def set_mode(self, mode):
+        if mode not in MODE_SPEED and mode != MODE_INSTANT:
+            raise ValueError(f"Unknown animation mode: {mode}")
+        self.mode = mode
+
+    def scaled(self, duration, mode=None):
+        """Траење во секунди за дадениот режим"""
+        mode = mode or self.mode
+        if mode == MODE_INSTANT:
+            return 0.0
+        return duration / MODE_SPEED.get(mode, 1.0)
+
+    def animate(self, duration, on_frame=None, on_done=None, key=None, mode=None, easing=linear):
+        """
+        Започни анимација; врати го клучот. Нова анимација со ист клуч ја
+        откажува претходната (без нејзиниот on_done). Со нулто траење
+        (instant) последниот frame и on_done се повикуваат веднаш.
+        """
+        if key is None:
+            key = ("anim", self._next_key)
+            self._next_key += 1
+        self.cancel(key)
+
+        duration = self.scaled(duration, mode)
+        if duration <= 0 or self.closed:
+            if on_frame:
+                on_frame(1.0)
+            if on_done:
+                on_done()
+            return key
+
+        self._animations[key] = Animation(duration, on_frame, on_done, easing, time.perf_counter())
+        if self._after_id is None:
+            self._last_tick = time.perf_counter()
+            self._schedule(self.frame_interval)
+        return key
+
+    def wait(self, duration, callback, key=None, mode=None):
+        """Одложен повик - заменува root.after во анимациските синџири"""
+        return self.animate(duration, on_done=callback, key=key, mode=mode)
+
+    def is_running(self, key):
+        return key in self._animations
+
+    def cancel(self, key):
+        animation = self._animations.pop(key, None)
+        if animation is not None:
+            animation.cancelled = True
+
+    def cancel_all(self):
+        for key in list(self._animations):
+            self.cancel(key)
+
+    def finish_all(self):
+        """Скокни на крајот на сите анимации (пр. пред snapshot на состојба)"""
+        while self._animations:
+            key, animation = next(iter(self._animations.items()))
+            del self._animations[key]
+            self._complete(animation)
+
+    def _complete(self, animation):
+        try:
+            if animation.on_frame:
+                animation.on_frame(1.0)
+            if animation.on_done:
+                animation.on_done()
+        except Exception as e:
+            print(f"Error finishing animation: {e}")
+
+    def _schedule(self, delay):
+        self._after_id = self.root.after(max(1, int(delay * 1000)), self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        if self.closed:
+            return
+
+        now = time.perf_counter()
+        self.frame_intervals.record(now - self._last_tick)
+        self._last_tick = now
+
+        finished = []
+        for key, animation in list(self._animations.items()):
+            if animation.cancelled:
+                continue
+            elapsed = now - animation.started_at
+            if elapsed >= animation.duration:
+                finished.append((key, animation))
+            elif animation.on_frame:
+                try:
+                    animation.on_frame(animation.easing(elapsed / animation.duration))
+                except Exception as e:
+                    print(f"Error in animation frame: {e}")
+
+        for key, animation in finished:
+            if self._animations.get(key) is animation:
+                del self._animations[key]
+                self._complete(animation)
+
+        spent = time.perf_counter() - now
+        self.frame_times.record(spent)
+
+        # on_done може веќе да закажал tick за нова анимација
+        if self._animations and self._after_id is None:
+            if any(animation.on_frame for animation in self._animations.values()):
+                delay = self.frame_interval - spent
+            else:
+                delay = min(animation.deadline() for animation in self._animations.values()) - time.perf_counter()
+            self._schedule(delay)
+
+    def stats(self):
+        """Статистики за профилирање (ms)"""
+        return {
+            "mode": self.mode,
+            "active": len(self._animations),
+            "frame_work": self.frame_times.summary(),
+            "frame_interval": self.frame_intervals.summary()
+        }
+
+    def close(self):
+        self.closed = True
+        self.cancel_all()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
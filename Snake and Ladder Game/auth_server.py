@@ -17,11 +17,16 @@ if sys.platform.startswith('win'):
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import uvicorn
-import json
-import hashlib
 import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from bounded_executor import BoundedExecutor, PoolBusy
+from password_hashing import DEFAULT_HASHER, hash_password, verify_and_rehash, verify_password
+from session_tokens import SESSION_TOKEN_TTL, issue_token, load_secret
+from user_store import CachedUserStore, SQLiteUserStore, migrate_json, new_user_record
 
 app = FastAPI(title="Snake & Ladder Auth Server", version="1.0")
 
@@ -34,40 +39,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# База на корисници во JSON
+# База на корисници: SQLite; старата JSON датотека се мигрира еднаш при прво стартување
+USERS_DB = "game_users.db"
 USERS_FILE = "game_users.json"
 
 
-class UserCredentials(BaseModel):
-    username: str
-    password: str
+def open_user_store():
+    """
+    Отвори ја SQLite базата (со JSON миграција ако е празна) зад кеш;
+    last_login и статистиките се запишуваат во серии, најдоцна по FLUSH_INTERVAL.
+    """
+    store = SQLiteUserStore(USERS_DB)
+    if store.count() == 0 and os.path.exists(USERS_FILE):
+        migrate_json(USERS_FILE, store)
+    return CachedUserStore(store)
 
 
-def load_users():
-    """Вчитај корисници"""
-    if os.path.exists(USERS_FILE):
-        try:
-            with open(USERS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading users: {e}")
-    return {}
+# Базата не смее да го блокира event loop-от: оди во ограничен thread pool
+BLOCKING_THREADS = 8
+BLOCKING_QUEUE = 256
 
+# Хаширањето е CPU работа (scrypt): посебни процеси, по еден на јадро
+PASSWORD_HASHER = DEFAULT_HASHER
+HASH_WORKERS = os.cpu_count() or 1
+HASH_QUEUE = 256
+
+# Се отвораат при startup, за import на модулот (пр. во процесите за хаширање) да нема ефекти
+users = None
+blocking = None
+hashing = None
+token_secret = None
+# Хаш за непостоечки корисници: /login троши исто време, па не открива кои имиња постојат
+dummy_hash = None
 
-def save_users(users):
-    """Зачувај корисници"""
-    try:
-        with open(USERS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(users, f, indent=2, ensure_ascii=False)
-        return True
-    except Exception as e:
-        print(f"Error saving users: {e}")
-        return False
 
+@app.on_event("startup")
+def open_stores():
+    global users, blocking, hashing, token_secret, dummy_hash
+    users = open_user_store()
+    blocking = BoundedExecutor(ThreadPoolExecutor(BLOCKING_THREADS, thread_name_prefix="auth-blocking"),
+                               BLOCKING_THREADS, BLOCKING_QUEUE, "auth blocking pool")
+    token_secret = load_secret()
+    dummy_hash = hash_password(os.urandom(16).hex(), PASSWORD_HASHER)
+    hashing = BoundedExecutor(ProcessPoolExecutor(HASH_WORKERS), HASH_WORKERS, HASH_QUEUE, "password hashing pool")
 
-def hash_password(password):
-    """Хаширај лозинка"""
-    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+
+@app.on_event("shutdown")
+def close_user_store():
+    """Запиши ги задоцнетите промени пред излез"""
+    hashing.shutdown()
+    blocking.shutdown()
+    users.close()
+
+
+@app.exception_handler(PoolBusy)
+async def pool_busy(request, exc):
+    return JSONResponse(status_code=503, content={"detail": "Server busy, try again"},
+                        headers={"Retry-After": "1"})
+
+
+class UserCredentials(BaseModel):
+    username: str
+    password: str
 
 
 def validate_credentials(username, password):
@@ -87,6 +120,19 @@ def validate_credentials(username, password):
     return True, "OK"
 
 
+def user_rows():
+    return [
+        {
+            "username": username,
+            "created_at": data.get("created_at"),
+            "games_played": data.get("games_played", 0),
+            "wins": data.get("wins", 0),
+            "losses": data.get("losses", 0)
+        }
+        for username, data in users.iter_users()
+    ]
+
+
 @app.get("/")
 async def root():
     """Основна информација"""
@@ -94,7 +140,7 @@ async def root():
         "message": "Snake & Ladder Auth Server",
         "version": "1.0",
         "endpoints": ["/register", "/login", "/status"],
-        "users_count": len(load_users())
+        "users_count": await blocking.run(users.count)
     }
 
 
@@ -107,32 +153,20 @@ async def register(credentials: UserCredentials):
         if not valid:
             raise HTTPException(status_code=400, detail=msg)
 
-        users = load_users()
+        password_hash = await hashing.run(hash_password, credentials.password, PASSWORD_HASHER)
+        record = new_user_record(password_hash, datetime.datetime.now().isoformat())
 
-        # Провери дали корисникот постои
-        if credentials.username.lower() in [u.lower() for u in users.keys()]:
+        # Уникатниот индекс одлучува - и при два паралелни /register за исто име
+        if not await blocking.run(users.create, credentials.username, record):
             raise HTTPException(status_code=400, detail="Username already exists")
 
-        # Создај нов корисник
-        users[credentials.username] = {
-            "password_hash": hash_password(credentials.password),
-            "created_at": datetime.datetime.now().isoformat(),
-            "last_login": None,
-            "games_played": 0,
-            "wins": 0,
-            "losses": 0
+        return {
+            "success": True,
+            "message": "User registered successfully",
+            "username": credentials.username
         }
 
-        if save_users(users):
-            return {
-                "success": True,
-                "message": "User registered successfully",
-                "username": credentials.username
-            }
-        else:
-            raise HTTPException(status_code=500, detail="Failed to save user data")
-
-    except HTTPException:
+    except (HTTPException, PoolBusy):
         raise
     except Exception as e:
         print(f"Register error: {e}")
@@ -143,33 +177,31 @@ async def register(credentials: UserCredentials):
 async def login(credentials: UserCredentials):
     """Најави се"""
     try:
-        users = load_users()
-
-        # Најди го корисникот (case insensitive)
-        user_key = None
-        for key in users.keys():
-            if key.lower() == credentials.username.lower():
-                user_key = key
-                break
-
-        if not user_key:
+        # Најди го корисникот (case insensitive, преку индексот)
+        found = await blocking.run(users.get, credentials.username)
+        if found is None:
+            await hashing.run(verify_password, credentials.password, dummy_hash)
             raise HTTPException(status_code=401, detail="Invalid username or password")
 
-        user_data = users[user_key]
-        password_hash = hash_password(credentials.password)
-
-        if user_data["password_hash"] != password_hash:
+        user_key, user_data = found
+        valid, rehashed = await hashing.run(verify_and_rehash, credentials.password,
+                                            user_data["password_hash"], PASSWORD_HASHER)
+        if not valid:
             raise HTTPException(status_code=401, detail="Invalid username or password")
 
-        # Ажурирај last_login
-        user_data["last_login"] = datetime.datetime.now().isoformat()
-        users[user_key] = user_data
-        save_users(users)
+        # Ажурирај last_login; стар SHA-256 или друга цена -> нов хаш со PASSWORD_HASHER
+        fields = {"last_login": datetime.datetime.now().isoformat()}
+        if rehashed:
+            fields["password_hash"] = rehashed
+        await blocking.run(users.update, user_key, **fields)
 
         return {
             "success": True,
             "message": "Login successful",
             "username": user_key,
+            # Се праќа на signaling серверот, кој го проверува без повик до auth
+            "session_token": issue_token(user_key, token_secret),
+            "token_expires_in": SESSION_TOKEN_TTL,
             "user_data": {
                 "games_played": user_data.get("games_played", 0),
                 "wins": user_data.get("wins", 0),
@@ -178,7 +210,7 @@ async def login(credentials: UserCredentials):
             }
         }
 
-    except HTTPException:
+    except (HTTPException, PoolBusy):
         raise
     except Exception as e:
         print(f"Login error: {e}")
@@ -188,11 +220,14 @@ async def login(credentials: UserCredentials):
 @app.get("/status")
 async def status():
     """Статус на серверот"""
-    users = load_users()
     return {
         "server_status": "active",
-        "total_users": len(users),
-        "users_file_exists": os.path.exists(USERS_FILE),
+        "total_users": await blocking.run(users.count),
+        "users_db": USERS_DB,
+        "user_cache": users.stats(),
+        "blocking_pool": blocking.stats(),
+        "hashing_pool": hashing.stats(),
+        "password_hasher": f"{PASSWORD_HASHER.algorithm} {PASSWORD_HASHER.params}",
         "timestamp": datetime.datetime.now().isoformat()
     }
 
@@ -200,18 +235,8 @@ async def status():
 @app.get("/users")
 async def list_users():
     """Листа на корисници (за debugging)"""
-    users = load_users()
     return {
-        "users": [
-            {
-                "username": username,
-                "created_at": data.get("created_at"),
-                "games_played": data.get("games_played", 0),
-                "wins": data.get("wins", 0),
-                "losses": data.get("losses", 0)
-            }
-            for username, data in users.items()
-        ]
+        "users": await blocking.run(user_rows)
     }
 
 
@@ -223,11 +248,6 @@ if __name__ == "__main__":
     print("Press Ctrl+C to stop")
     print()
 
-    # Создај празен users файл ако не постои
-    if not os.path.exists(USERS_FILE):
-        save_users({})
-        print(f"Created {USERS_FILE}")
-
     try:
         uvicorn.run(app, host="127.0.0.1", port=8000, log_level="info")
     except KeyboardInterrupt:
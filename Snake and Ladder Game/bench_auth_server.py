@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Load test за auth серверот: мешан register/login сообраќај
+Серверот работи во посебен процес со празна база во привремен директориум;
+CLIENTS threads праќаат барања без пауза, а на крајот се печатат латенциите
+по endpoint (p50/p95/p99) и метриките на blocking pool-от од /status.
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+HOST = "127.0.0.1"
+PORT = 8790
+CLIENTS = 32
+DURATION = 10.0
+REGISTER_SHARE = 0.2
+SEED_USERS = 200
+PASSWORD = "secret-pass"
+
+
+def start_server(directory, port):
+    """uvicorn со auth_server во directory (таму се креира game_users.db)"""
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, "-c", "import uvicorn, auth_server; "
+                               f"uvicorn.run(auth_server.app, host='{HOST}', port={port}, log_level='warning')"],
+        cwd=directory, env=env)
+
+    url = f"http://{HOST}:{port}"
+    for _ in range(100):
+        try:
+            requests.get(f"{url}/status", timeout=1)
+            return process, url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Auth server did not start")
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+
+
+def client(url, client_id, stop_at, names, results, lock):
+    session = requests.Session()
+    rng = random.Random(client_id)
+    latencies = {"register": [], "login": []}
+    errors = 0
+    counter = 0
+
+    while time.perf_counter() < stop_at:
+        if rng.random() < REGISTER_SHARE:
+            counter += 1
+            endpoint, username = "register", f"load{client_id}x{counter}"
+        else:
+            endpoint, username = "login", rng.choice(names)
+
+        started = time.perf_counter()
+        response = session.post(f"{url}/{endpoint}", json={"username": username, "password": PASSWORD})
+        latencies[endpoint].append(time.perf_counter() - started)
+        if response.status_code != 200:
+            errors += 1
+        elif endpoint == "register":
+            with lock:
+                names.append(username)
+
+    with lock:
+        for endpoint, samples in latencies.items():
+            results[endpoint].extend(samples)
+        results["errors"] += errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=CLIENTS)
+    parser.add_argument("--duration", type=float, default=DURATION)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        process, url = start_server(directory, args.port)
+        try:
+            names = [f"seed{index}" for index in range(SEED_USERS)]
+            with requests.Session() as session:
+                for username in names:
+                    session.post(f"{url}/register", json={"username": username, "password": PASSWORD})
+
+            results = {"register": [], "login": [], "errors": 0}
+            lock = threading.Lock()
+            stop_at = time.perf_counter() + args.duration
+            threads = [threading.Thread(target=client, args=(url, index, stop_at, names, results, lock))
+                       for index in range(args.clients)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            status = requests.get(f"{url}/status").json()
+        finally:
+            process.terminate()
+            process.wait()
+
+    total = len(results["register"]) + len(results["login"])
+    print(f"{args.clients} clients, {args.duration:.0f}s, {REGISTER_SHARE:.0%} register: "
+          f"{total / args.duration:,.0f} req/s, {results['errors']} errors")
+    for endpoint in ("register", "login"):
+        ordered = sorted(results[endpoint])
+        if ordered:
+            print(f"{endpoint:<9} n={len(ordered):<7} p50 {percentile(ordered, 0.5):7.2f} ms"
+                  f"  p95 {percentile(ordered, 0.95):7.2f} ms  p99 {percentile(ordered, 0.99):7.2f} ms"
+                  f"  max {ordered[-1] * 1000:7.2f} ms")
+
+    for name in ("blocking_pool", "hashing_pool"):
+        pool = status[name]
+        print(f"{name}: limit {pool['limit']}, peak queue {pool['peak_waiting']}, rejected {pool['rejected']}, "
+              f"queue wait p99 {pool['queue_wait']['p99_ms']:.2f} ms, run time p99 {pool['run_time']['p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark за испраќање пораки преку WebRTCClient против локален signaling сервер
+Мери пораки/секунда и латенција по порака (host -> server relay -> guest)
+"""
+
+import asyncio
+import contextlib
+import io
+import logging
+import statistics
+import threading
+import time
+
+import websockets
+
+from webrtc_client import WebRTCClient
+from webrtc_signaling_server import EnhancedSignalingServer, logger
+
+HOST = "127.0.0.1"
+PORT = 8799
+MESSAGE_COUNT = 5_000
+LATENCY_SAMPLES = 500
+
+
+def start_local_server():
+    """Стартај signaling сервер во посебен thread"""
+    ready = threading.Event()
+
+    def run():
+        async def serve():
+            server = EnhancedSignalingServer()
+            async with websockets.serve(server.handle_client, HOST, PORT):
+                ready.set()
+                await asyncio.Future()
+
+        asyncio.run(serve())
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait(timeout=10)
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise TimeoutError("Condition not reached")
+        time.sleep(0.01)
+
+
+def run_benchmark():
+    logger.disabled = True
+    logging.getLogger("websockets").setLevel(logging.WARNING)
+    start_local_server()
+
+    url = f"ws://{HOST}:{PORT}"
+    latencies = []
+    received = threading.Event()
+    expected = [MESSAGE_COUNT]
+
+    def on_guest_message(data):
+        latencies.append(time.perf_counter() - data["sent_at"])
+        if len(latencies) >= expected[0]:
+            received.set()
+
+    # Клиентите печатат секоја порака - исклучи го излезот за време на мерењето
+    with contextlib.redirect_stdout(io.StringIO()):
+        host = WebRTCClient(url)
+        guest = WebRTCClient(url)
+        guest.on_message_received = on_guest_message
+
+        host.create_session("BenchHost")
+        wait_for(lambda: host.invite_code)
+        guest.join_session(host.invite_code, "BenchGuest")
+        wait_for(lambda: host.connection_state == "connected" and guest.connection_state == "connected")
+
+        # 1. Throughput: burst од пораки без чекање
+        start = time.perf_counter()
+        for i in range(MESSAGE_COUNT):
+            host.send_message({"type": "dice_roll", "player": 0, "value": i % 6 + 1,
+                               "sent_at": time.perf_counter()})
+        received.wait(timeout=60)
+        elapsed = time.perf_counter() - start
+        burst_count = len(latencies)
+
+        # 2. Латенција: една порака во лет (како потези во игра)
+        latencies.clear()
+        for i in range(LATENCY_SAMPLES):
+            received.clear()
+            expected[0] = i + 1
+            host.send_message({"type": "dice_roll", "player": 0, "value": i % 6 + 1,
+                               "sent_at": time.perf_counter()})
+            received.wait(timeout=5)
+
+        host.close()
+        guest.close()
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    print(f"Messages:      {burst_count}/{MESSAGE_COUNT}")
+    print(f"Throughput:    {burst_count / elapsed:,.0f} msg/s")
+    if latencies_ms:
+        print(f"Latency mean:  {statistics.mean(latencies_ms):.3f} ms")
+        print(f"Latency p50:   {latencies_ms[len(latencies_ms) // 2]:.3f} ms")
+        print(f"Latency p99:   {latencies_ms[int(len(latencies_ms) * 0.99) - 1]:.3f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmark()
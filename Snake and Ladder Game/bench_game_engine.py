@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Benchmark за headless rules engine (потези во секунда во чист Python)
+"""
+
+import random
+import sys
+import time
+
+from board_config import CLASSIC_BOARD, load_board
+
+TURNS = 3_000_000
+
+
+def run_benchmark(board=CLASSIC_BOARD, turns=TURNS, seed=42):
+    engine = board.engine()
+    rng = random.Random(seed)
+    dice = rng.choices(range(1, engine.faces + 1), k=turns)
+
+    apply_roll = engine.apply_roll
+    initial = engine.initial_state()
+    finished = engine.finished_flag
+
+    # Цели игри: по победа се почнува нова од почетната состојба
+    state = initial
+    games = 0
+    start = time.perf_counter()
+    for die in dice:
+        state = apply_roll(state, die)
+        if state >= finished:
+            games += 1
+            state = initial
+    elapsed = time.perf_counter() - start
+
+    print(f"Board:       {board.name} {board.rows}x{board.cols}, {engine.last_tile} tiles, {len(engine.snakes)} snakes, {len(engine.ladders)} ladders")
+    print(f"Turns:       {turns:,} ({games:,} games finished)")
+    print(f"Throughput:  {turns / elapsed:,.0f} turns/s")
+
+
+if __name__ == "__main__":
+    # python bench_game_engine.py boards/grand_20x20.json - иста брзина за поголема табла
+    run_benchmark(load_board(sys.argv[1]) if len(sys.argv) > 1 else CLASSIC_BOARD)
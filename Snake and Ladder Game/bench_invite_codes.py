@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark за приклучување на сесија по invite код (од 10 до 100k отворени сесии)
+Се мери целиот join_session пат преку handle_message: JSON, пребарување на кодот,
+валидација и известувањата до host-от и guest-от, наспроти истиот пат со старото
+линеарно скенирање на сесиите.
+"""
+
+import asyncio
+import json
+import time
+
+from webrtc_signaling_server import EnhancedSignalingServer, logger
+
+SESSION_COUNTS = [10, 100, 1_000, 10_000, 100_000]
+JOINS = 2_000
+LEGACY_JOINS = 200
+
+
+class BenchSocket:
+    """Минимален websocket за benchmark - само собира пораки"""
+
+    def __init__(self):
+        self.remote_address = ("127.0.0.1", 0)
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+class LegacyScanServer(EnhancedSignalingServer):
+    """Старото пребарување: линеарно скенирање на сите сесии (за споредба)"""
+
+    def resolve_session_id(self, session_id=None, invite_code=None):
+        if invite_code and not session_id:
+            for sid in self.sessions:
+                if sid[:8].upper() == invite_code.upper():
+                    return sid
+        return session_id
+
+
+async def populate(server, count):
+    """Отвори count сесии преку вистинскиот create handler; врати ги host сокетите"""
+    hosts = {}
+    for _ in range(count):
+        host = BenchSocket()
+        server.all_clients.add(host)
+        await server.handle_create_session(host, {"player_name": "Host"})
+        hosts[next(reversed(server.sessions))] = host
+    return hosts
+
+
+async def time_joins(server, hosts, code_of, joins):
+    """Приклучи guest на joins сесии распределени низ регистарот; врати латенции во µs"""
+    session_items = list(server.sessions.items())
+    step = max(1, len(session_items) // joins)
+    latencies = []
+    for session_id, data in session_items[::step][:joins]:
+        guest = BenchSocket()
+        server.all_clients.add(guest)
+        message = json.dumps({"type": "join_session", "invite_code": code_of(session_id, data),
+                              "player_name": "Guest"})
+
+        start = time.perf_counter()
+        await server.handle_message(guest, message)
+        latencies.append((time.perf_counter() - start) * 1e6)
+
+        # Join-от се брои само ако двете страни се известени
+        if json.loads(guest.sent[-1])["type"] != "session_joined" or \
+                json.loads(hosts[session_id].sent[-1])["type"] != "guest_joined":
+            raise RuntimeError(f"Join failed for session {session_id}")
+    return sorted(latencies)
+
+
+def summary(latencies):
+    return sum(latencies) / len(latencies), latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+
+async def run_benchmark():
+    logger.disabled = True
+    print(f"{'sessions':>10} {'join µs':>10} {'join p99 µs':>12} {'legacy join µs':>15} {'legacy p99 µs':>14}")
+
+    for count in SESSION_COUNTS:
+        server = EnhancedSignalingServer()
+        hosts = await populate(server, count)
+        mean_us, p99_us = summary(await time_joins(server, hosts, lambda sid, data: data["invite_code"],
+                                                   min(JOINS, count)))
+
+        legacy = LegacyScanServer()
+        legacy_hosts = await populate(legacy, count)
+        legacy_mean_us, legacy_p99_us = summary(await time_joins(legacy, legacy_hosts,
+                                                                 lambda sid, data: sid[:8].upper(),
+                                                                 min(LEGACY_JOINS, count)))
+
+        print(f"{count:>10} {mean_us:>10.1f} {p99_us:>12.1f} {legacy_mean_us:>15.1f} {legacy_p99_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark за цената на хаширање на лозинки
+За секоја поставка од HASHERS: најави/секунда во еден процес (по јадро) и со
+process pool од еден процес по јадро, како во auth серверот.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from password_hashing import HASHERS, hash_password, verify_password
+
+PASSWORD = "correct horse battery"
+SECONDS_PER_SETTING = 2.0
+
+
+def verify_batch(encoded, count):
+    for _ in range(count):
+        verify_password(PASSWORD, encoded)
+    return count
+
+
+def single_core_rate(encoded):
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < SECONDS_PER_SETTING:
+        count += verify_batch(encoded, 1)
+    return count / (time.perf_counter() - started)
+
+
+def pool_rate(pool, workers, encoded, per_worker):
+    started = time.perf_counter()
+    total = sum(pool.map(verify_batch, [encoded] * workers, [per_worker] * workers))
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    cores = os.cpu_count() or 1
+    print(f"{cores} cores, {SECONDS_PER_SETTING:.0f}s per setting")
+    print(f"{'setting':<13} {'ms/login':>9} {'logins/s/core':>14} {'pool logins/s':>14} {'pool per core':>14}")
+
+    with ProcessPoolExecutor(cores) as pool:
+        for name, hasher in HASHERS.items():
+            encoded = hash_password(PASSWORD, hasher)
+            rate = single_core_rate(encoded)
+            pooled = pool_rate(pool, cores, encoded, max(1, int(rate * SECONDS_PER_SETTING)))
+            print(f"{name:<13} {1000 / rate:9.2f} {rate:14,.1f} {pooled:14,.1f} {pooled / cores:14,.1f}")
+
+
+if __name__ == "__main__":
+    main()
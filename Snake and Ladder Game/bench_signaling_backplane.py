@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark за relay преку backplane помеѓу два signaling јазли
+Host е на јазолот што ја води сесијата, guest на другиот, па секоја порака
+host -> guest поминува еден backplane скок. Латенцијата се споредува со
+ист пар на еден јазол; разликата е цената на cluster relay.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+
+import websockets
+
+from signaling_backplane import InMemoryBackplane, InMemoryHub, PubSubBroker, backplane_from_url
+from webrtc_signaling_server import EnhancedSignalingServer, logger
+
+HOST = "127.0.0.1"
+BROKER_PORT = 6499
+MESSAGES = 2_000
+NODES = ["node-a", "node-b"]
+
+
+async def expect(websocket, message_type):
+    while True:
+        data = json.loads(await websocket.recv())
+        if data.get("type") == message_type:
+            return data
+
+
+async def start_nodes(make_backplane, nodes):
+    servers = []
+    for node_id in nodes:
+        server = EnhancedSignalingServer(backplane=make_backplane(), node_id=node_id, nodes=nodes)
+        await server.start_backplane()
+        servers.append((server, await websockets.serve(server.handle_client, HOST, 0)))
+    return servers
+
+
+async def stop_nodes(servers):
+    for server, listener in servers:
+        listener.close()
+        await listener.wait_closed()
+        await server.backplane.close()
+
+
+def url_of(listener):
+    return f"ws://{HOST}:{listener.sockets[0].getsockname()[1]}"
+
+
+async def one_way_latencies(host_url, guest_url):
+    """Секвенцијални host -> guest пораки; врати латенции во ms"""
+    host = await websockets.connect(host_url)
+    guest = await websockets.connect(guest_url)
+    await host.send(json.dumps({"type": "create_session", "player_name": "Host"}))
+    created = await expect(host, "session_created")
+    await guest.send(json.dumps({"type": "join_session", "invite_code": created["invite_code"],
+                                 "player_name": "Guest"}))
+    await expect(guest, "session_joined")
+    session_id = created["session_id"]
+    for websocket in (host, guest):
+        await websocket.send(json.dumps({"type": "client_ready", "session_id": session_id}))
+    for websocket in (host, guest):
+        await expect(websocket, "connection_established")
+
+    latencies = []
+    for seq in range(1, MESSAGES + 1):
+        started = time.perf_counter()
+        await host.send(json.dumps({"type": "game_message", "session_id": session_id, "seq": seq,
+                                    "data": {"type": "turn", "seq": seq, "player": 0, "die": 4}}))
+        await expect(guest, "game_message")
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    for websocket in (host, guest):
+        await websocket.close()
+    return latencies
+
+
+def summary(latencies):
+    ordered = sorted(latencies)
+    return statistics.median(ordered), ordered[int(len(ordered) * 0.99)]
+
+
+async def measure(label, make_backplane, baseline):
+    servers = await start_nodes(make_backplane, NODES)
+    try:
+        p50, p99 = summary(await one_way_latencies(url_of(servers[0][1]), url_of(servers[1][1])))
+    finally:
+        await stop_nodes(servers)
+    print(f"{label:<22} p50 {p50:6.3f} ms  p99 {p99:6.3f} ms  added p50 {p50 - baseline[0]:+6.3f} ms")
+
+
+async def main(redis_url):
+    logger.setLevel(logging.WARNING)
+    logging.getLogger("websockets").setLevel(logging.WARNING)
+    print(f"{MESSAGES} sequential host -> guest messages")
+
+    single = await start_nodes(InMemoryBackplane, ["node-a"])
+    try:
+        url = url_of(single[0][1])
+        baseline = summary(await one_way_latencies(url, url))
+    finally:
+        await stop_nodes(single)
+    print(f"{'single node':<22} p50 {baseline[0]:6.3f} ms  p99 {baseline[1]:6.3f} ms")
+
+    hub = InMemoryHub()
+    await measure("cluster, in-memory", lambda: InMemoryBackplane(hub), baseline)
+
+    broker = await PubSubBroker().serve(HOST, BROKER_PORT)
+    try:
+        await measure("cluster, tcp broker", lambda: backplane_from_url(f"tcp://{HOST}:{BROKER_PORT}"), baseline)
+        # Broker-от треба да ги види затворените конекции пред крајот на loop-от
+        await asyncio.sleep(0.1)
+    finally:
+        broker.close()
+
+    if redis_url:
+        await measure("cluster, redis", lambda: backplane_from_url(redis_url), baseline)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--redis", default=None, help="redis://host:port to include the Redis backend")
+    asyncio.run(main(parser.parse_args().redis))
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Load test за signaling серверот со повеќе worker процеси
+За секој број worker-и: генератори во посебни процеси отвораат host/guest парови,
+host-от праќа game_message со ограничен број пораки во лет, а guest-от ги брои.
+Мери relay-ирани пораки/секунда и ги споредува со еден worker.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+
+import websockets
+
+from signaling_workers import start_worker_pool, stop_worker_pool
+from webrtc_signaling_server import logger
+
+HOST = "127.0.0.1"
+BASE_PORT = 8810
+PAIRS_PER_GENERATOR = 16
+WINDOW = 32
+WARMUP = 1.0
+DURATION = 5.0
+
+
+async def expect(websocket, message_type):
+    while True:
+        data = json.loads(await websocket.recv())
+        if data.get("type") == message_type:
+            return data
+        if data.get("type") == "error":
+            raise RuntimeError(data.get("message"))
+
+
+async def open_pair(url):
+    """Host креира сесија, guest се приклучува со invite кодот (можеби на друг worker)"""
+    host = await websockets.connect(url, ping_interval=None)
+    guest = await websockets.connect(url, ping_interval=None)
+    await host.send(json.dumps({"type": "create_session", "player_name": "Host"}))
+    created = await expect(host, "session_created")
+    await guest.send(json.dumps({"type": "join_session", "invite_code": created["invite_code"],
+                                 "player_name": "Guest"}))
+    await expect(guest, "session_joined")
+
+    session_id = created["session_id"]
+    for websocket in (host, guest):
+        await websocket.send(json.dumps({"type": "client_ready", "session_id": session_id}))
+    for websocket in (host, guest):
+        await expect(websocket, "connection_established")
+    return session_id, host, guest
+
+
+async def drive_pair(url, counters, stop_at):
+    """Host праќа додека има место во прозорецот; guest брои и ослободува место"""
+    session_id, host, guest = await open_pair(url)
+    credit = asyncio.Semaphore(WINDOW)
+
+    async def send():
+        seq = 0
+        while time.perf_counter() < stop_at:
+            await credit.acquire()
+            seq += 1
+            await host.send(json.dumps({"type": "game_message", "session_id": session_id, "seq": seq,
+                                        "data": {"type": "turn", "seq": seq, "player": 0, "die": 3}}))
+
+    async def receive():
+        async for raw in guest:
+            if json.loads(raw).get("type") == "game_message":
+                counters["received"] += 1
+                credit.release()
+
+    receiver = asyncio.ensure_future(receive())
+    try:
+        await send()
+        await asyncio.sleep(0.2)
+    finally:
+        receiver.cancel()
+        for websocket in (host, guest):
+            await websocket.close()
+
+
+def run_generator(url, pairs, start_at, results):
+    """Еден процес генератор; враќа пораки примени во мерниот прозорец"""
+    logging.getLogger("websockets").setLevel(logging.WARNING)
+
+    async def main():
+        counters = {"received": 0}
+        stop_at = start_at + WARMUP + DURATION
+        tasks = [asyncio.ensure_future(drive_pair(url, counters, stop_at)) for _ in range(pairs)]
+
+        await asyncio.sleep(max(0.0, start_at + WARMUP - time.perf_counter()))
+        measured_from = counters["received"]
+        await asyncio.sleep(max(0.0, stop_at - time.perf_counter()))
+        results.put(counters["received"] - measured_from)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(main())
+
+
+def measure(workers, generators, port):
+    processes = start_worker_pool(HOST, port, workers)
+    time.sleep(0.5)
+    try:
+        results = multiprocessing.Queue()
+        # perf_counter е CLOCK_MONOTONIC на Linux - ист за сите процеси
+        start_at = time.perf_counter() + 1.0
+        clients = [multiprocessing.Process(target=run_generator,
+                                           args=(f"ws://{HOST}:{port}", PAIRS_PER_GENERATOR, start_at, results))
+                   for _ in range(generators)]
+        for client in clients:
+            client.start()
+        relayed = sum(results.get(timeout=60) for _ in clients)
+        for client in clients:
+            client.join()
+    finally:
+        stop_worker_pool(processes)
+    return relayed / DURATION
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=[n for n in (1, 2, 4, 8, 16) if n <= max(1, cpus // 2)] or [1])
+    parser.add_argument("--generators", type=int, default=None,
+                        help="load generator processes (default: same as workers)")
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    logging.getLogger("websockets").setLevel(logging.WARNING)
+    print(f"{cpus} CPUs, {PAIRS_PER_GENERATOR} pairs per generator, window {WINDOW}, {DURATION:.0f}s per run")
+    if cpus < 2 * max(args.workers):
+        print("Note: fewer than 2 CPUs per worker - generators and workers compete for cores")
+
+    baseline = None
+    for index, workers in enumerate(args.workers):
+        rate = measure(workers, args.generators or workers, BASE_PORT + index)
+        baseline = baseline or rate
+        print(f"workers={workers:<3} relayed {rate:>10,.0f} msg/s   speedup x{rate / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
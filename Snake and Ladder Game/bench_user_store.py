@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark за складиштето на корисници со 100k корисници
+JSON (цела датотека по барање) наспроти SQLite (индексиран ред по барање) и
+SQLite зад кеш со write-behind: миграција, login (пребарување + last_login) и register.
+"""
+
+import datetime
+import hashlib
+import os
+import random
+import tempfile
+import time
+
+from user_store import CachedUserStore, JsonUserStore, SQLiteUserStore, migrate_json, new_user_record
+
+USERS = 100_000
+SQLITE_OPERATIONS = 5_000
+JSON_OPERATIONS = 10
+
+
+def make_users(count):
+    password_hash = hashlib.sha256(b"password").hexdigest()
+    created_at = datetime.datetime.now().isoformat()
+    return {f"player{index:06d}": new_user_record(password_hash, created_at) for index in range(count)}
+
+
+def login(store, username):
+    found = store.get(username.upper())
+    store.update(found[0], last_login=datetime.datetime.now().isoformat())
+
+
+def run(label, store, names, operations):
+    rng = random.Random(1)
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(operations):
+        login_started = time.perf_counter()
+        login(store, rng.choice(names))
+        latencies.append(time.perf_counter() - login_started)
+    login_rate = operations / (time.perf_counter() - started)
+    latencies.sort()
+    p99_ms = latencies[int(len(latencies) * 0.99)] * 1000
+
+    started = time.perf_counter()
+    for index in range(operations):
+        store.create(f"new-{label}-{index}", new_user_record("x", None))
+    register_rate = operations / (time.perf_counter() - started)
+
+    print(f"{label:<8} login {login_rate:>10,.1f} ops/s (p99 {p99_ms:8.3f} ms)"
+          f"   register {register_rate:>10,.1f} ops/s")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "users.json")
+        db_path = os.path.join(directory, "users.db")
+
+        users = make_users(USERS)
+        names = list(users)
+        json_store = JsonUserStore(json_path)
+        json_store.save(users)
+        print(f"{USERS:,} users, JSON file {os.path.getsize(json_path) / 1e6:.1f} MB")
+
+        sqlite_store = SQLiteUserStore(db_path)
+        started = time.perf_counter()
+        migrate_json(json_path, sqlite_store)
+        print(f"Migration took {time.perf_counter() - started:.2f}s")
+
+        run("json", json_store, names, JSON_OPERATIONS)
+        run("sqlite", sqlite_store, names, SQLITE_OPERATIONS)
+
+        cached_store = CachedUserStore(sqlite_store)
+        run("cached", cached_store, names, SQLITE_OPERATIONS)
+        cached_store.close()
+        print(f"cached   {cached_store.flushes} flushes, {cached_store.flushed_users:,} user updates written")
+
+
+if __name__ == "__main__":
+    main()
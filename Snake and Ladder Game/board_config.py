@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Табли како податоци: произволен број редови/колони и сет на змии и скали,
+вчитани од JSON датотека, валидирани и идентификувани со content hash
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+from game_engine import RulesEngine, SNAKES, LADDERS
+
+BOARDS_DIR = "boards"
+MIN_SIDE = 2
+MAX_SIDE = 50
+
+
+class BoardConfigError(ValueError):
+    """Невалидна дефиниција на табла"""
+
+
+def _parse_int(value, what) -> int:
+    """Цел број од JSON (клучевите се стрингови); 2.7 или true не се прифаќаат"""
+    if isinstance(value, bool):
+        raise BoardConfigError(f"Invalid {what}: {value!r}")
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, (int, str)):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    raise BoardConfigError(f"Invalid {what}: {value!r}")
+
+
+def _parse_jumps(raw, kind) -> Dict[int, int]:
+    """Прифати {"98": 78} или [[98, 78], ...]"""
+    if raw is None:
+        return {}
+    if not isinstance(raw, (dict, list)):
+        raise BoardConfigError(f"Invalid {kind}s: expected an object or a list")
+    items = raw.items() if isinstance(raw, dict) else raw
+
+    jumps = {}
+    for item in items:
+        if not isinstance(item, (tuple, list)) or len(item) != 2:
+            raise BoardConfigError(f"Invalid {kind} entry: {item!r}")
+        start, end = _parse_int(item[0], f"{kind} start"), _parse_int(item[1], f"{kind} end")
+        if start in jumps:
+            raise BoardConfigError(f"Duplicate {kind} start on tile {start}")
+        jumps[start] = end
+    return jumps
+
+
+class BoardConfig:
+    """Дефиниција на табла"""
+
+    def __init__(self, rows=10, cols=10, snakes=None, ladders=None, name="custom"):
+        self.name = name
+        self.rows = _parse_int(rows, "rows")
+        self.cols = _parse_int(cols, "cols")
+        self.snakes = _parse_jumps(snakes, "snake")
+        self.ladders = _parse_jumps(ladders, "ladder")
+        self.validate()
+
+        self.fingerprint = hashlib.sha256(self.canonical_json().encode("utf-8")).hexdigest()
+        self._engine = None
+
+    @property
+    def last_tile(self):
+        return self.rows * self.cols
+
+    def validate(self):
+        """O(n) валидација: граници, насоки, преклопени краеви и верижни скокови"""
+        if not (MIN_SIDE <= self.rows <= MAX_SIDE and MIN_SIDE <= self.cols <= MAX_SIDE):
+            raise BoardConfigError(f"Board must be between {MIN_SIDE} and {MAX_SIDE} tiles per side")
+
+        last_tile = self.last_tile
+        for kind, jumps in (("snake", self.snakes), ("ladder", self.ladders)):
+            for start, end in jumps.items():
+                if not (1 <= start < last_tile) or not (1 <= end <= last_tile):
+                    raise BoardConfigError(f"{kind.title()} {start}->{end} is outside the board")
+                if kind == "snake" and end >= start:
+                    raise BoardConfigError(f"Snake {start}->{end} must go down")
+                if kind == "ladder" and end <= start:
+                    raise BoardConfigError(f"Ladder {start}->{end} must go up")
+
+        shared = self.snakes.keys() & self.ladders.keys()
+        if shared:
+            raise BoardConfigError(f"Tile {min(shared)} starts both a snake and a ladder")
+
+        jumps = dict(self.snakes)
+        jumps.update(self.ladders)
+
+        # Крај на еден скок не смее да е почеток на друг - без верижни скокови нема ни циклуси
+        for start, end in jumps.items():
+            if end in jumps:
+                raise BoardConfigError(f"Jump {start}->{end} ends on the start of another jump")
+
+    def canonical_json(self):
+        """Канонски опис - основа на content hash-от (името не влегува)"""
+        return json.dumps({
+            "rows": self.rows,
+            "cols": self.cols,
+            "snakes": sorted(self.snakes.items()),
+            "ladders": sorted(self.ladders.items())
+        }, separators=(",", ":"))
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "rows": self.rows,
+            "cols": self.cols,
+            "snakes": {str(start): end for start, end in sorted(self.snakes.items())},
+            "ladders": {str(start): end for start, end in sorted(self.ladders.items())}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if not isinstance(data, dict):
+            raise BoardConfigError(f"Board definition must be an object, not {type(data).__name__}")
+        return cls(rows=data.get("rows", 10), cols=data.get("cols", 10),
+                   snakes=data.get("snakes"), ladders=data.get("ladders"),
+                   name=data.get("name", "custom"))
+
+    def engine(self, players=2) -> RulesEngine:
+        """Rules engine за оваа табла (кеширан)"""
+        if self._engine is None or self._engine.players != players:
+            self._engine = RulesEngine(self.snakes, self.ladders, last_tile=self.last_tile, players=players)
+        return self._engine
+
+    def tile_cell(self, tile):
+        """(ред од долу, колона) за плочка - змијулест редослед"""
+        index = tile - 1
+        row = index // self.cols
+        col = index % self.cols
+        if row % 2 == 1:
+            col = self.cols - 1 - col
+        return row, col
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+CLASSIC_BOARD = BoardConfig(10, 10, SNAKES, LADDERS, name="classic")
+
+
+def load_board(path) -> BoardConfig:
+    """Вчитај и валидирај табла од JSON датотека"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise BoardConfigError(f"Could not read board file {path}: {e}")
+    return BoardConfig.from_dict(data)
+
+
+def find_board(fingerprint, directory=BOARDS_DIR) -> Optional[BoardConfig]:
+    """Најди локална табла според hash-от што го испратил peer-от"""
+    if fingerprint == CLASSIC_BOARD.fingerprint:
+        return CLASSIC_BOARD
+    if not os.path.isdir(directory):
+        return None
+
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            board = load_board(os.path.join(directory, filename))
+        except BoardConfigError as e:
+            print(f"Skipping board {filename}: {e}")
+            continue
+        if board.fingerprint == fingerprint:
+            return board
+    return None
+
+
+def load_default_board() -> BoardConfig:
+    """Табла од SNAKE_LADDER_BOARD (патека до JSON) или класичната 10x10"""
+    path = os.environ.get("SNAKE_LADDER_BOARD")
+    if not path:
+        return CLASSIC_BOARD
+    try:
+        return load_board(path)
+    except BoardConfigError as e:
+        print(f"Invalid board {path}: {e} - using classic board")
+        return CLASSIC_BOARD
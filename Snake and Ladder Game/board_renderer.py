@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Пред-рендерирана табла: плочки, броеви, змии и скали се цртаат еднаш со PIL
+во една слика, која се кешира на диск по fingerprint на таблата и големина
+"""
+
+import math
+import os
+import time
+import weakref
+
+from PIL import Image, ImageDraw, ImageFont, ImageTk
+
+from sprite_cache import SPRITES
+
+BOARD_CACHE_DIR = ".board_cache"
+# Зголеми кога се менува изгледот - старите слики во кешот се игнорираат
+RENDER_VERSION = 1
+
+BACKGROUND = "#2c3e50"
+TILE_COLORS = ['#3498db', '#5dade2', '#85c1e9', '#aed6f1', '#d6eaf8', '#ebf5fb']
+FONT_CANDIDATES = ("arialbd.ttf", "Arial Bold.ttf", "DejaVuSans-Bold.ttf", "LiberationSans-Bold.ttf")
+
+# Меморискиот кеш избегнува читање од диск при нов прозорец во истиот процес
+_RENDERED = {}
+# PhotoImage на таблата по Tk root - реванш или втор прозорец не ја копира сликата повторно
+_PHOTOS = weakref.WeakKeyDictionary()
+
+
+def _load_font(size):
+    for name in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+class BoardRenderer:
+    """Ја црта статичната табла во една RGBA слика"""
+
+    def __init__(self, board, tile_size, margin, sprites=SPRITES):
+        self.board = board
+        self.tile_size = tile_size
+        self.margin = margin
+        self.sprites = sprites
+        self.width = tile_size * board.cols + margin * 2
+        self.height = tile_size * board.rows + margin * 2
+
+    def tile_origin(self, tile):
+        row, col = self.board.tile_cell(tile)
+        return col * self.tile_size + self.margin, (self.board.rows - 1 - row) * self.tile_size + self.margin
+
+    def tile_center(self, tile):
+        x, y = self.tile_origin(tile)
+        return x + self.tile_size // 2, y + self.tile_size // 2
+
+    def render(self) -> Image.Image:
+        image = Image.new("RGBA", (self.width, self.height), BACKGROUND)
+        draw = ImageDraw.Draw(image)
+
+        self._draw_tiles(draw)
+        for start, end in self.board.snakes.items():
+            self._draw_snake(image, draw, start, end)
+        for start, end in self.board.ladders.items():
+            self._draw_ladder(image, draw, start, end)
+        return image
+
+    def _draw_tiles(self, draw):
+        tile_size = self.tile_size
+        # Големина во пиксели што одговара на Tk фонтот од 7-12 поени
+        font = _load_font(max(9, min(16, tile_size // 4)))
+        last_tile = self.board.last_tile
+
+        for tile in range(1, last_tile + 1):
+            row, col = self.board.tile_cell(tile)
+            x1, y1 = self.tile_origin(tile)
+
+            color = TILE_COLORS[(row + col) % len(TILE_COLORS)]
+            if tile == 1:
+                color = '#27ae60'
+            elif tile == last_tile:
+                color = '#f1c40f'
+            elif tile in self.board.snakes:
+                color = '#e74c3c'
+            elif tile in self.board.ladders:
+                color = '#2ecc71'
+
+            draw.rectangle([x1, y1, x1 + tile_size, y1 + tile_size], fill=color, outline=BACKGROUND, width=2)
+            draw.text((x1 + tile_size // 2, y1 + tile_size // 2), str(tile),
+                      font=font, fill=BACKGROUND, anchor="mm")
+
+    def _paste_centered(self, image, sprite, x, y):
+        image.alpha_composite(sprite, (int(x - sprite.width // 2), int(y - sprite.height // 2)))
+
+    def _draw_snake(self, image, draw, start, end):
+        start_x, start_y = self.tile_center(start)
+        end_x, end_y = self.tile_center(end)
+
+        # Тело со стрелка кон опашката (како arrowshape=(16, 20, 6) во Tk)
+        angle = math.atan2(end_y - start_y, end_x - start_x)
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+        base_x, base_y = end_x - 16 * cos_a, end_y - 16 * sin_a
+        draw.line([(start_x, start_y), (base_x, base_y)], fill='#c0392b', width=8, joint="curve")
+        draw.ellipse([start_x - 4, start_y - 4, start_x + 4, start_y + 4], fill='#c0392b')
+        half = 10
+        draw.polygon([(end_x, end_y),
+                      (end_x - 20 * cos_a - half * sin_a, end_y - 20 * sin_a + half * cos_a),
+                      (base_x, base_y),
+                      (end_x - 20 * cos_a + half * sin_a, end_y - 20 * sin_a - half * cos_a)],
+                     fill='#c0392b')
+
+        sprite = self.sprites.image("snake", 40)
+        self._paste_centered(image, sprite, end_x, end_y)
+
+    def _draw_ladder(self, image, draw, start, end):
+        start_x, start_y = self.tile_center(start)
+        end_x, end_y = self.tile_center(end)
+
+        offset = 8
+        draw.line([(start_x - offset, start_y), (end_x - offset, end_y)], fill='#27ae60', width=4)
+        draw.line([(start_x + offset, start_y), (end_x + offset, end_y)], fill='#27ae60', width=4)
+
+        steps = 5
+        for i in range(1, steps):
+            step_x = start_x + (end_x - start_x) * i / steps
+            step_y = start_y + (end_y - start_y) * i / steps
+            draw.line([(step_x - offset, step_y), (step_x + offset, step_y)], fill='#2ecc71', width=3)
+
+        angle_deg = math.degrees(math.atan2(end_y - start_y, end_x - start_x))
+        sprite = self.sprites.image("ladder", 50, angle=angle_deg)
+        self._paste_centered(image, sprite, (start_x + end_x) // 2, (start_y + end_y) // 2)
+
+
+def board_cache_key(board, tile_size, margin, sprites=SPRITES):
+    # Друг asset за змија/скала дава друг клуч
+    return (f"{board.fingerprint[:16]}_{board.rows}x{board.cols}_t{tile_size}_m{margin}"
+            f"_{sprites.digest('snake', 'ladder')}_v{RENDER_VERSION}")
+
+
+def render_board_image(board, tile_size, margin, sprites=SPRITES, cache_dir=BOARD_CACHE_DIR):
+    """
+    Врати ја статичната табла како PIL слика.
+    Редослед: мемориски кеш -> PNG на диск -> рендерирање и запишување.
+    """
+    key = board_cache_key(board, tile_size, margin, sprites)
+    image = _RENDERED.get(key)
+    if image is not None:
+        return image
+
+    renderer = BoardRenderer(board, tile_size, margin, sprites)
+    path = os.path.join(cache_dir, key + ".png") if cache_dir else None
+
+    if path and os.path.exists(path):
+        try:
+            with Image.open(path) as cached:
+                image = cached.convert("RGBA")
+            if image.size != (renderer.width, renderer.height):
+                image = None
+        except OSError as e:
+            print(f"Ignoring unreadable board cache {path}: {e}")
+            image = None
+
+    if image is None:
+        image = renderer.render()
+        if path:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                # Атомско запишување - друг прозорец не смее да прочита половична слика
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                image.save(temp_path, "PNG")
+                os.replace(temp_path, path)
+            except OSError as e:
+                print(f"Could not write board cache {path}: {e}")
+
+    _RENDERED[key] = image
+    return image
+
+
+def board_photo(widget, board, tile_size, margin, sprites=SPRITES, cache_dir=BOARD_CACHE_DIR):
+    """PhotoImage од render_board_image, кеширан по Tk root"""
+    root = widget._root()
+    photos = _PHOTOS.get(root)
+    if photos is None:
+        photos = _PHOTOS[root] = {}
+
+    key = board_cache_key(board, tile_size, margin, sprites)
+    photo = photos.get(key)
+    if photo is None:
+        image = render_board_image(board, tile_size, margin, sprites, cache_dir)
+        photo = photos[key] = ImageTk.PhotoImage(image, master=root)
+    return photo
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    from board_config import CLASSIC_BOARD, load_board
+
+    board = load_board(sys.argv[1]) if len(sys.argv) > 1 else CLASSIC_BOARD
+    tile_size = 640 // max(board.rows, board.cols)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        BoardRenderer(board, tile_size, 40).render()
+        rendered_in = time.perf_counter() - start
+
+        render_board_image(board, tile_size, 40, cache_dir=cache_dir)
+        _RENDERED.clear()
+        start = time.perf_counter()
+        render_board_image(board, tile_size, 40, cache_dir=cache_dir)
+        disk_in = time.perf_counter() - start
+
+        start = time.perf_counter()
+        render_board_image(board, tile_size, 40, cache_dir=cache_dir)
+        memory_in = time.perf_counter() - start
+
+    print(f"Board {board.name} {board.rows}x{board.cols}: render {rendered_in * 1000:.1f} ms, "
+          f"disk cache {disk_in * 1000:.1f} ms, memory cache {memory_in * 1e6:.1f} µs")
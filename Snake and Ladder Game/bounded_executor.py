@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Ограничен pool за блокирачка работа од asyncio handler-и
+Најмногу limit задачи работат истовремено, најмногу max_queue чекаат; повеќе од тоа
+се одбива веднаш (PoolBusy) наместо да расте редицата и латенцијата на сите.
+"""
+
+import asyncio
+import functools
+import time
+
+from latency_stats import LatencyStats
+
+
+class PoolBusy(Exception):
+    """Редицата е полна - барањето се одбива"""
+
+
+class BoundedExecutor:
+    def __init__(self, executor, limit, max_queue, name="pool"):
+        self.executor = executor
+        self.limit = limit
+        self.max_queue = max_queue
+        self.name = name
+        self._slots = None
+        self.running = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait = LatencyStats()
+        self.run_time = LatencyStats()
+
+    async def run(self, func, *args, **kwargs):
+        """Изврши func(*args) во pool-от; чекањето во редицата се мери посебно"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.limit)
+        if self.running + self.waiting >= self.limit + self.max_queue:
+            self.rejected += 1
+            raise PoolBusy(f"{self.name} is busy")
+
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        queued_at = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        started = time.perf_counter()
+        self.queue_wait.record(started - queued_at)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, functools.partial(func, *args, **kwargs))
+        finally:
+            self.run_time.record(time.perf_counter() - started)
+            self.running -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait.summary(),
+            "run_time": self.run_time.summary()
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Headless правила за Snake & Ladder (без Tk)
+
+Состојбата е еден int: позициите на играчите се спакувани по битови,
+над нив е индексот на играчот што е на ред, а највисокиот бит означува крај на игра.
+Табелата на дестинации [позиција][коцка] веќе ги содржи змиите, скалите
+и правилото за пречекорување (остануваш на место, редот се менува).
+Zobrist хашот на состојбата се ажурира инкрементално и служи за откривање на desync.
+"""
+
+import hashlib
+import json
+import random
+from typing import Dict, List, Optional, Tuple
+
+SNAKES = {98: 78, 95: 56, 87: 24, 62: 18, 54: 34, 16: 6}
+LADDERS = {1: 38, 4: 14, 9: 21, 28: 84, 36: 44, 51: 67, 71: 91, 80: 100}
+
+LAST_TILE = 100
+DIE_FACES = 6
+ZOBRIST_BITS = 64
+
+
+def build_jump_table(snakes: Dict[int, int], ladders: Dict[int, int], last_tile=LAST_TILE) -> List[int]:
+    """jumps[tile] -> каде завршува играчот по змија/скала"""
+    jumps = list(range(last_tile + 1))
+    for start, end in snakes.items():
+        jumps[start] = end
+    for start, end in ladders.items():
+        jumps[start] = end
+    return jumps
+
+
+class ZobristKeys:
+    """
+    Случаен клуч за секој пар (играч, плочка), за играчот на ред и за крај на игра.
+    Генераторот е seed-иран со fingerprint-от на таблата, па peers со иста табла имаат исти клучеви.
+    """
+
+    def __init__(self, engine, bits=ZOBRIST_BITS):
+        rng = random.Random(engine.fingerprint)
+        self.pieces = [[rng.getrandbits(bits) for _ in range(engine.last_tile + 1)]
+                       for _ in range(engine.players)]
+        self.turns = [rng.getrandbits(bits) for _ in range(engine.players)]
+        self.finished = rng.getrandbits(bits)
+
+
+class RulesEngine:
+    """Правила на игра со претходно пресметани табели"""
+
+    def __init__(self, snakes=None, ladders=None, last_tile=LAST_TILE, players=2, faces=DIE_FACES):
+        self.snakes = dict(SNAKES if snakes is None else snakes)
+        self.ladders = dict(LADDERS if ladders is None else ladders)
+        self.last_tile = last_tile
+        self.players = players
+        self.faces = faces
+        self._fingerprint = None
+        self._zobrist = None
+
+        self.jumps = build_jump_table(self.snakes, self.ladders, last_tile)
+
+        # landing[pos * stride + die] - плочката по чекорите (пред змија/скала), pos ако пречекорува
+        # destinations[pos * stride + die] - крајната позиција
+        self.stride = faces + 1
+        self.landing = [0] * ((last_tile + 1) * self.stride)
+        self.destinations = [0] * ((last_tile + 1) * self.stride)
+        for position in range(last_tile + 1):
+            for die in range(1, faces + 1):
+                target = position + die
+                if target > last_tile:
+                    target = position
+                index = position * self.stride + die
+                self.landing[index] = target
+                self.destinations[index] = self.jumps[target] if target != position else position
+
+        # Битови за спакуваната состојба
+        self.position_bits = last_tile.bit_length()
+        self.position_mask = (1 << self.position_bits) - 1
+        self.turn_shift = self.position_bits * players
+        self.finished_flag = 1 << (self.turn_shift + max(1, (players - 1).bit_length()))
+
+    @property
+    def fingerprint(self) -> str:
+        """Хаш на правилата на таблата (за кеширање на анализи)"""
+        if self._fingerprint is None:
+            description = json.dumps({
+                "last_tile": self.last_tile,
+                "faces": self.faces,
+                "snakes": sorted(self.snakes.items()),
+                "ladders": sorted(self.ladders.items())
+            }, separators=(",", ":"))
+            self._fingerprint = hashlib.sha256(description.encode("utf-8")).hexdigest()
+        return self._fingerprint
+
+    @property
+    def zobrist(self) -> ZobristKeys:
+        if self._zobrist is None:
+            self._zobrist = ZobristKeys(self)
+        return self._zobrist
+
+    # ---------- Компактна состојба ----------
+    def initial_state(self, current_player=0) -> int:
+        return current_player << self.turn_shift
+
+    def pack(self, positions, current_player) -> int:
+        state = current_player << self.turn_shift
+        for player, position in enumerate(positions):
+            state |= position << (player * self.position_bits)
+            if position == self.last_tile:
+                # Победникот е „на ред“ во завршена состојба
+                state = (state & ((1 << self.turn_shift) - 1)) | (player << self.turn_shift) | self.finished_flag
+        return state
+
+    def positions(self, state) -> List[int]:
+        return [(state >> (player * self.position_bits)) & self.position_mask
+                for player in range(self.players)]
+
+    def position_of(self, state, player) -> int:
+        return (state >> (player * self.position_bits)) & self.position_mask
+
+    def current_player(self, state) -> int:
+        return (state & ~self.finished_flag) >> self.turn_shift
+
+    def is_finished(self, state) -> bool:
+        return state >= self.finished_flag
+
+    def winner(self, state) -> Optional[int]:
+        """Победникот останува „на ред“ по завршниот потег"""
+        if state < self.finished_flag:
+            return None
+        return self.current_player(state)
+
+    # ---------- Хаш на состојбата ----------
+    def state_hash(self, state) -> int:
+        """Целосен Zobrist хаш на состојбата"""
+        keys = self.zobrist
+        value = keys.turns[self.current_player(state)]
+        for player in range(self.players):
+            value ^= keys.pieces[player][self.position_of(state, player)]
+        if self.is_finished(state):
+            value ^= keys.finished
+        return value
+
+    def update_hash(self, value, old_state, new_state) -> int:
+        """Инкрементално ажурирање: XOR само за играчите што се помрднале и за редот"""
+        keys = self.zobrist
+        for player in range(self.players):
+            old = self.position_of(old_state, player)
+            new = self.position_of(new_state, player)
+            if old != new:
+                value ^= keys.pieces[player][old] ^ keys.pieces[player][new]
+
+        old_turn = self.current_player(old_state)
+        new_turn = self.current_player(new_state)
+        if old_turn != new_turn:
+            value ^= keys.turns[old_turn] ^ keys.turns[new_turn]
+        if self.is_finished(old_state) != self.is_finished(new_state):
+            value ^= keys.finished
+        return value
+
+    # ---------- Правила ----------
+    def resolve_move(self, position, die) -> Tuple[Optional[int], int]:
+        """
+        Врати (landing, final) за движење од position со коцка die.
+        landing е None ако потегот пречекорува (играчот останува на место).
+        """
+        index = position * self.stride + die
+        landing = self.landing[index]
+        if landing == position:
+            return None, position
+        return landing, self.destinations[index]
+
+    def is_winning(self, position) -> bool:
+        return position >= self.last_tile
+
+    def apply_roll(self, state, die) -> int:
+        """Одиграј еден потег за играчот на ред; врати нова состојба"""
+        if state >= self.finished_flag:
+            return state
+
+        turn_shift = self.turn_shift
+        player = state >> turn_shift
+        shift = player * self.position_bits
+        position = (state >> shift) & self.position_mask
+
+        destination = self.destinations[position * self.stride + die]
+        state += (destination - position) << shift
+
+        # Победникот останува на ред; инаку редот оди на следниот играч
+        if destination == self.last_tile:
+            return state | self.finished_flag
+
+        next_player = player + 1
+        if next_player == self.players:
+            next_player = 0
+        return state + ((next_player - player) << turn_shift)
+
+
+DEFAULT_ENGINE = RulesEngine()
+
+
+def apply_roll(state, die) -> int:
+    """apply_roll врз стандардната табла"""
+    return DEFAULT_ENGINE.apply_roll(state, die)
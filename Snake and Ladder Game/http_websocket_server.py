@@ -12,14 +12,22 @@ import uuid
 from websockets.server import serve
 from websockets.exceptions import ConnectionClosed
 
+from invite_codes import InviteCodeRegistry, normalize_invite_code
+from session_resume import RESUME_GRACE_SECONDS, ResumableSession, other_role, role_of
+from p2p_datachannel import UNRELIABLE, WEBRTC_SIGNALS
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class HTTPWebSocketServer:
-    def __init__(self):
+    def __init__(self, resume_grace=RESUME_GRACE_SECONDS):
         self.sessions: Dict[str, Dict] = {}
         self.all_clients: Set = set()
+        self.invite_codes = InviteCodeRegistry()
+        # Конекција -> сесии во кои учествува
+        self.client_sessions: Dict = {}
+        self.resume_grace = resume_grace
 
     async def register_client(self, websocket):
         self.all_clients.add(websocket)
@@ -29,27 +37,93 @@ class HTTPWebSocketServer:
         if websocket in self.all_clients:
             self.all_clients.remove(websocket)
 
-        # Отстрани ги сесиите што содржат овој клиент
-        sessions_to_remove = []
-        for session_id, session_data in self.sessions.items():
-            if websocket in session_data.values():
-                sessions_to_remove.append(session_id)
-                # Извести го другиот клиент
-                for role, client in session_data.items():
-                    if client != websocket and client in self.all_clients:
-                        try:
-                            await client.send(json.dumps({
-                                "type": "peer_disconnected",
-                                "session_id": session_id
-                            }))
-                        except:
-                            pass
-
-        for session_id in sessions_to_remove:
-            del self.sessions[session_id]
+        # Отстрани ги сесиите што содржат овој клиент (преку обратниот индекс)
+        notifications = []
+        for session_id in self.client_sessions.pop(websocket, set()):
+            session_data = self.sessions.get(session_id)
+            if not session_data:
+                continue
+
+            # Игра во тек: чекај reconnect пред крај на сесијата
+            role = role_of(session_data, websocket)
+            if role is not None and session_data["guest"] is not None:
+                self.suspend_role(session_id, role)
+                peer_role = other_role(role)
+                if session_data["resume"].is_connected(peer_role):
+                    notifications.append(self.send_safe(session_data[peer_role], json.dumps({
+                        "type": "peer_connection_lost",
+                        "session_id": session_id,
+                        "grace_seconds": self.resume_grace
+                    })))
+                continue
+
+            # Извести го другиот клиент
+            message = json.dumps({
+                "type": "peer_disconnected",
+                "session_id": session_id
+            })
+            for role in ("host", "guest"):
+                client = session_data.get(role)
+                if client is not None and client != websocket and client in self.all_clients:
+                    notifications.append(self.send_safe(client, message))
+
+            self.remove_session(session_id)
+
+        if notifications:
+            await asyncio.gather(*notifications)
 
         logger.info(f"Client disconnected. Remaining: {len(self.all_clients)}")
 
+    async def send_safe(self, websocket, message):
+        """Испрати порака, игнорирај грешки при испраќање"""
+        try:
+            await websocket.send(message)
+            return True
+        except Exception:
+            return False
+
+    def index_session(self, websocket, session_id):
+        self.client_sessions.setdefault(websocket, set()).add(session_id)
+
+    def unindex_session(self, websocket, session_id):
+        session_ids = self.client_sessions.get(websocket)
+        if session_ids is not None:
+            session_ids.discard(session_id)
+            if not session_ids:
+                del self.client_sessions[websocket]
+
+    def remove_session(self, session_id):
+        """Избриши сесија и ослободи го invite кодот"""
+        session_data = self.sessions.pop(session_id, None)
+        if session_data:
+            self.invite_codes.release(session_data.get("invite_code"))
+            session_data["resume"].close()
+            for role in ("host", "guest"):
+                if session_data.get(role) is not None:
+                    self.unindex_session(session_data[role], session_id)
+
+    def suspend_role(self, session_id, role):
+        """Сесијата се брише ако улогата не се врати во grace периодот"""
+        timer = asyncio.get_running_loop().call_later(
+            self.resume_grace, lambda: asyncio.ensure_future(self.expire_role(session_id, role)))
+        self.sessions[session_id]["resume"].suspend(role, timer)
+        logger.info(f"{role} disconnected, holding session for {self.resume_grace}s")
+
+    async def expire_role(self, session_id, role):
+        session_data = self.sessions.get(session_id)
+        if not session_data or session_data["resume"].is_connected(role):
+            return
+
+        peer_role = other_role(role)
+        peer_connected = session_data["resume"].is_connected(peer_role)
+        self.remove_session(session_id)
+        if peer_connected and session_data[peer_role] is not None:
+            await self.send_safe(session_data[peer_role], json.dumps({
+                "type": "peer_disconnected",
+                "session_id": session_id
+            }))
+        logger.info(f"Session expired: {session_data['invite_code']}")
+
     async def handle_message(self, websocket, message):
         try:
             data = json.loads(message)
@@ -60,8 +134,16 @@ class HTTPWebSocketServer:
                 await self.handle_create_session(websocket, data)
             elif message_type == "join_session":
                 await self.handle_join_session(websocket, data)
+            elif message_type == "client_ready":
+                await self.handle_client_ready(websocket, data)
             elif message_type == "game_message":
                 await self.handle_game_message(websocket, data)
+            elif message_type == "resume_session":
+                await self.handle_resume_session(websocket, data)
+            elif message_type in WEBRTC_SIGNALS:
+                await self.handle_webrtc_signal(websocket, data)
+            elif message_type == "leave_session":
+                await self.handle_leave_session(websocket, data)
 
         except Exception as e:
             logger.error(f"Error: {e}")
@@ -70,34 +152,33 @@ class HTTPWebSocketServer:
         session_id = str(uuid.uuid4())
         player_name = data.get("player_name", "Host")
         player_avatar = data.get("player_avatar", "🙂")
+        invite_code = self.invite_codes.allocate(session_id)
 
         self.sessions[session_id] = {
             "host": websocket,
             "guest": None,
-            "host_info": {"name": player_name, "avatar": player_avatar}
+            "host_info": {"name": player_name, "avatar": player_avatar},
+            "invite_code": invite_code,
+            "resume": ResumableSession()
         }
-
-        invite_code = session_id[:8].upper()
+        self.index_session(websocket, session_id)
 
         await websocket.send(json.dumps({
             "type": "session_created",
             "session_id": session_id,
-            "invite_code": invite_code
+            "invite_code": invite_code,
+            "resume_token": self.sessions[session_id]["resume"].issue_token("host")
         }))
 
         logger.info(f"Session created: {invite_code}")
 
     async def handle_join_session(self, websocket, data):
-        invite_code = data.get("invite_code", "").upper()
+        invite_code = normalize_invite_code(data.get("invite_code"))
         player_name = data.get("player_name", "Guest")
         player_avatar = data.get("player_avatar", "😎")
 
         # Најди ја сесијата
-        session_id = None
-        for sid in self.sessions:
-            if sid[:8].upper() == invite_code:
-                session_id = sid
-                break
+        session_id = self.invite_codes.lookup(invite_code)
 
         if not session_id or session_id not in self.sessions:
             await websocket.send(json.dumps({
@@ -118,26 +199,45 @@ class HTTPWebSocketServer:
         # Додај го guest-ot
         session_data["guest"] = websocket
         session_data["guest_info"] = {"name": player_name, "avatar": player_avatar}
+        self.index_session(websocket, session_id)
 
         # Извести го host-ot
         await session_data["host"].send(json.dumps({
             "type": "guest_joined",
+            "session_id": session_id,
             "guest_info": session_data["guest_info"]
         }))
 
         # Извести го guest-ot
         await websocket.send(json.dumps({
             "type": "session_joined",
-            "host_info": session_data["host_info"]
+            "session_id": session_id,
+            "host_info": session_data["host_info"],
+            "resume_token": session_data["resume"].issue_token("guest")
         }))
 
-        # Поврзаност
-        await asyncio.sleep(0.5)
-        connection_msg = {"type": "connection_established"}
-        await session_data["host"].send(json.dumps(connection_msg))
-        await websocket.send(json.dumps(connection_msg))
+        logger.info(f"Guest joined {invite_code}")
+
+    async def handle_client_ready(self, websocket, data):
+        """Поврзаност: чекај двата клиенти да потврдат client_ready"""
+        session_data = self.sessions.get(data.get("session_id"))
+        if not session_data:
+            return
+
+        role = role_of(session_data, websocket)
+        if role is None:
+            return
+
+        ready_roles = session_data.setdefault("ready", set())
+        if role in ready_roles:
+            return
+        ready_roles.add(role)
 
-        logger.info(f"Connection established for {invite_code}")
+        if ready_roles == {"host", "guest"}:
+            connection_msg = json.dumps({"type": "connection_established"})
+            await asyncio.gather(self.send_safe(session_data["host"], connection_msg),
+                                 self.send_safe(session_data["guest"], connection_msg))
+            logger.info(f"Connection established for {session_data['invite_code']}")
 
     async def handle_game_message(self, websocket, data):
         session_id = data.get("session_id")
@@ -145,21 +245,94 @@ class HTTPWebSocketServer:
             return
 
         session_data = self.sessions[session_id]
-        target = None
-
-        if websocket == session_data["host"] and session_data["guest"]:
-            target = session_data["guest"]
-        elif websocket == session_data["guest"] and session_data["host"]:
-            target = session_data["host"]
-
-        if target:
-            try:
-                await target.send(json.dumps({
-                    "type": "game_message",
-                    "data": data.get("data")
-                }))
-            except:
-                pass
+        resume = session_data["resume"]
+        role = role_of(session_data, websocket)
+        if role is None or session_data["guest"] is None:
+            return
+
+        # Неподредена лента: се проследува без seq и replay buffer
+        if data.get("lane") == UNRELIABLE:
+            if resume.is_connected(other_role(role)):
+                await self.send_safe(session_data[other_role(role)], json.dumps(data))
+            return
+
+        # Дупликат од препраќање по reconnect
+        if not resume.accept_from(role, data.get("seq")):
+            return
+
+        target_role = other_role(role)
+        payload = resume.stamp_for(target_role, session_id, data.get("data"), data.get("seq"))
+        if resume.is_connected(target_role):
+            await self.send_safe(session_data[target_role], payload)
+
+    async def handle_webrtc_signal(self, websocket, data):
+        """SDP и ICE кандидати до другиот peer, непроменети"""
+        session_data = self.sessions.get(data.get("session_id"))
+        if not session_data:
+            return
+
+        role = role_of(session_data, websocket)
+        if role is None or session_data["guest"] is None:
+            return
+
+        target_role = other_role(role)
+        if session_data["resume"].is_connected(target_role):
+            await self.send_safe(session_data[target_role], json.dumps(data))
+
+    async def handle_leave_session(self, websocket, data):
+        """Намерно излегување - без grace период"""
+        session_id = data.get("session_id")
+        session_data = self.sessions.get(session_id)
+        role = role_of(session_data, websocket) if session_data else None
+        if role is None:
+            return
+
+        peer_role = other_role(role)
+        peer_connected = session_data["resume"].is_connected(peer_role)
+        self.remove_session(session_id)
+        if peer_connected and session_data[peer_role] is not None:
+            await self.send_safe(session_data[peer_role], json.dumps({
+                "type": "peer_disconnected",
+                "session_id": session_id
+            }))
+
+    async def handle_resume_session(self, websocket, data):
+        """Врати го клиентот во сесијата и испрати ги пропуштените пораки"""
+        session_id = data.get("session_id")
+        session_data = self.sessions.get(session_id)
+        role = session_data["resume"].role_for_token(data.get("resume_token")) if session_data else None
+        if role is None:
+            await websocket.send(json.dumps({
+                "type": "error",
+                "message": "Session expired"
+            }))
+            return
+
+        resume = session_data["resume"]
+        resume.cancel_grace(role)
+        if session_data[role] is not None and session_data[role] != websocket:
+            self.unindex_session(session_data[role], session_id)
+        session_data[role] = websocket
+        self.index_session(websocket, session_id)
+
+        missed, complete = resume.outbox[role].since(int(data.get("last_seq", 0)))
+        await websocket.send(json.dumps({
+            "type": "session_resumed",
+            "session_id": session_id,
+            "last_seq": resume.last_received[role],
+            "replay_complete": complete,
+            "replayed": len(missed)
+        }))
+        for payload in missed:
+            await websocket.send(payload)
+
+        peer_role = other_role(role)
+        if resume.is_connected(peer_role) and session_data[peer_role] is not None:
+            await self.send_safe(session_data[peer_role], json.dumps({
+                "type": "peer_reconnected",
+                "session_id": session_id
+            }))
+        logger.info(f"{role} resumed {session_data['invite_code']}, replayed {len(missed)}")
 
     async def handle_client(self, websocket, path):
         await self.register_client(websocket)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Регистар на invite кодови за signaling серверите
+"""
+
+import secrets
+from typing import Dict, Optional
+
+INVITE_CODE_LENGTH = 8
+
+# Без 0/O и 1/I за да не се мешаат при рачно внесување
+INVITE_CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+
+
+def normalize_invite_code(invite_code) -> str:
+    """Нормализирај invite код (празно место, мали букви)"""
+    if not invite_code:
+        return ""
+    return str(invite_code).strip().upper()
+
+
+class InviteCodeRegistry:
+    """
+    Индекс invite код -> session_id со O(1) пребарување.
+    Алокаторот гарантира дека ниту еден активен код не се повторува.
+    prefix е фиксниот почеток на секој код (пр. id на worker процесот),
+    а accept(code) ги филтрира генерираните кодови (пр. кодови што му припаѓаат на јазолот).
+    """
+
+    def __init__(self, length=INVITE_CODE_LENGTH, alphabet=INVITE_CODE_ALPHABET, max_attempts=64, prefix="",
+                 accept=None):
+        self.length = length
+        self.alphabet = alphabet
+        self.max_attempts = max_attempts
+        self.prefix = prefix
+        self.accept = accept
+        self._codes: Dict[str, str] = {}
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __contains__(self, invite_code):
+        return normalize_invite_code(invite_code) in self._codes
+
+    def _generate_code(self) -> str:
+        return self.prefix + "".join(secrets.choice(self.alphabet) for _ in range(self.length - len(self.prefix)))
+
+    def allocate(self, session_id: str) -> str:
+        """Алоцирај уникатен код за сесија"""
+        for _ in range(self.max_attempts):
+            invite_code = self._generate_code()
+            if invite_code not in self._codes and (self.accept is None or self.accept(invite_code)):
+                self._codes[invite_code] = session_id
+                return invite_code
+
+        raise RuntimeError("Could not allocate a unique invite code")
+
+    def lookup(self, invite_code) -> Optional[str]:
+        """Најди session_id за код"""
+        return self._codes.get(normalize_invite_code(invite_code))
+
+    def release(self, invite_code) -> Optional[str]:
+        """Ослободи код при teardown на сесија"""
+        return self._codes.pop(normalize_invite_code(invite_code), None)
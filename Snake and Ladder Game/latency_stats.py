@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Статистика на латенција без зависност од tkinter (за серверите)
+"""
+
+import collections
+
+
+class LatencyStats:
+    """Латенција на доставени пораки (последните N мерења)"""
+
+    def __init__(self, window=1000):
+        self.samples = collections.deque(maxlen=window)
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def summary(self):
+        """Врати статистика во милисекунди"""
+        if not self.samples:
+            return {"count": self.count, "mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "mean_ms": sum(ordered) / len(ordered) * 1000,
+            "p50_ms": ordered[len(ordered) // 2] * 1000,
+            "p99_ms": ordered[max(0, int(len(ordered) * 0.99) - 1)] * 1000,
+            "max_ms": self.max * 1000
+        }
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Точна анализа на таблата како апсорбирачки Марков синџир
+Очекуван број на потези од секоја плочка, дистрибуција на времето до крај
+и табела на веројатности за победа за двајца играчи
+"""
+
+import sys
+import time
+
+from game_engine import DEFAULT_ENGINE
+from board_config import load_board
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("Warning: numpy not installed. Install with: pip install numpy")
+
+# Дистрибуцијата се сече кога преостанатата веројатност е под оваа граница
+TAIL_EPSILON = 1e-12
+MAX_TURNS = 5000
+
+# Кеш на решенија по fingerprint на таблата
+_SOLUTIONS = {}
+
+
+def transition_matrix(engine=None):
+    """(N x N) матрица на премини, N = last_tile + 1; последната плочка е апсорбирачка"""
+    engine = engine or DEFAULT_ENGINE
+    size = engine.last_tile + 1
+    matrix = np.zeros((size, size))
+    probability = 1.0 / engine.faces
+
+    for position in range(engine.last_tile):
+        for die in range(1, engine.faces + 1):
+            matrix[position, engine.destinations[position * engine.stride + die]] += probability
+    matrix[engine.last_tile, engine.last_tile] = 1.0
+    return matrix
+
+
+class MarkovSolution:
+    """Решение за една табла"""
+
+    def __init__(self, engine, tail_epsilon=TAIL_EPSILON, max_turns=MAX_TURNS):
+        self.engine = engine
+        self.fingerprint = engine.fingerprint
+        self.matrix = transition_matrix(engine)
+        last = engine.last_tile
+
+        # Очекувани потези: (I - Q) t = 1 за транзиентните состојби
+        transient = self.matrix[:last, :last]
+        self.expected_turns = np.zeros(last + 1)
+        self.expected_turns[:last] = np.linalg.solve(np.eye(last) - transient, np.ones(last))
+
+        # cdf[:, t] = P(T <= t) за секоја почетна плочка; T = број на сопствени потези до крај
+        columns = [np.zeros(last + 1)]
+        columns[0][last] = 1.0
+        while len(columns) <= max_turns:
+            columns.append(self.matrix @ columns[-1])
+            if columns[-1][:last].min() >= 1.0 - tail_epsilon:
+                break
+        self.finish_cdf = np.column_stack(columns)
+        self.finish_pmf = np.diff(self.finish_cdf, axis=1, prepend=0.0)
+        self.horizon = self.finish_cdf.shape[1] - 1
+        self._win_table = None
+
+    @property
+    def win_table(self):
+        """
+        win_table[a, b] - веројатност да победи играчот на ред на плочка a
+        против противник на плочка b (играчот на ред фрла прв).
+        Победува ако T_a <= T_b: сума по t од P(T_a = t) * P(T_b >= t).
+        """
+        if self._win_table is None:
+            survival = np.ones_like(self.finish_cdf)
+            survival[:, 1:] = 1.0 - self.finish_cdf[:, :-1]
+            self._win_table = self.finish_pmf @ survival.T
+        return self._win_table
+
+    def win_probability(self, mover_position, opponent_position):
+        return float(self.win_table[mover_position, opponent_position])
+
+    def expected_turns_from(self, position):
+        return float(self.expected_turns[position])
+
+    def finish_distribution(self, position=0):
+        """P(T = t) за t = 0..horizon, од дадена плочка"""
+        return self.finish_pmf[position]
+
+
+def solve_board(engine=None):
+    """Реши ја таблата; резултатот се кешира по fingerprint"""
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy is required for the Markov solver")
+
+    engine = engine or DEFAULT_ENGINE
+    fingerprint = engine.fingerprint
+    solution = _SOLUTIONS.get(fingerprint)
+    if solution is None:
+        solution = MarkovSolution(engine)
+        _SOLUTIONS[fingerprint] = solution
+    return solution
+
+
+if __name__ == "__main__":
+    board_engine = load_board(sys.argv[1]).engine() if len(sys.argv) > 1 else None
+
+    start = time.perf_counter()
+    solution = solve_board(board_engine)
+    solved_in = time.perf_counter() - start
+
+    start = time.perf_counter()
+    win_table = solution.win_table
+    table_in = time.perf_counter() - start
+
+    start = time.perf_counter()
+    solve_board(board_engine)
+    cached_in = time.perf_counter() - start
+
+    pmf = solution.finish_distribution(0)
+    cumulative = pmf.cumsum()
+    print(f"Board fingerprint:     {solution.fingerprint[:16]}")
+    print(f"Expected turns from 0: {solution.expected_turns_from(0):.4f}")
+    print(f"Median / p90 / p99:    {int((cumulative >= 0.5).argmax())} / {int((cumulative >= 0.9).argmax())} / "
+          f"{int((cumulative >= 0.99).argmax())} turns")
+    print(f"Most likely length:    {int(pmf.argmax())} turns (p={pmf.max():.4f})")
+    print(f"First player wins:     {solution.win_probability(0, 0):.6f}")
+    print(f"Solve: {solved_in * 1000:.1f} ms, win table: {table_in * 1000:.1f} ms, "
+          f"cached lookup: {cached_in * 1e6:.1f} µs (horizon {solution.horizon} turns)")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Векторизиран NumPy Monte Carlo симулатор за цели игри
+Ги движи сите игри одеднаш како низи од позиции - за проверка на балансот на таблата
+"""
+
+import sys
+import time
+
+from game_engine import DEFAULT_ENGINE
+from board_config import load_board
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("Warning: numpy not installed. Install with: pip install numpy")
+
+MAX_ROUNDS = 1000
+BATCH_SIZE = 1_000_000
+
+
+class SimulationReport:
+    """Резултати од симулација"""
+
+    def __init__(self, engine, n_games, length_counts, wins, tile_visits, unfinished, elapsed):
+        self.engine = engine
+        self.n_games = n_games
+        # length_counts[r] - број на игри завршени во рунда r (рунда = секој играч фрла по еднаш)
+        self.length_counts = length_counts
+        self.wins = wins
+        self.tile_visits = tile_visits
+        self.unfinished = unfinished
+        self.elapsed = elapsed
+
+    @property
+    def finished_games(self):
+        return int(self.length_counts.sum())
+
+    @property
+    def mean_length(self):
+        rounds = np.arange(len(self.length_counts))
+        return float((rounds * self.length_counts).sum() / max(1, self.finished_games))
+
+    def length_percentile(self, q):
+        """Должина (рунди) под која завршуваат q% од игрите"""
+        cumulative = np.cumsum(self.length_counts)
+        return int(np.searchsorted(cumulative, cumulative[-1] * q / 100.0))
+
+    @property
+    def win_rates(self):
+        return self.wins / max(1, self.finished_games)
+
+    @property
+    def first_player_advantage(self):
+        """Разлика во стапка на победи: прв играч минус фер удел"""
+        return float(self.win_rates[0] - 1.0 / self.engine.players)
+
+    @property
+    def tile_frequencies(self):
+        """Удел на потези што завршуваат на секоја плочка"""
+        return self.tile_visits / max(1, self.tile_visits.sum())
+
+    def summary(self):
+        lines = [
+            f"Games:              {self.n_games:,} ({self.unfinished:,} unfinished after {len(self.length_counts) - 1} rounds)",
+            f"Speed:              {self.n_games / self.elapsed:,.0f} games/s",
+            f"Mean length:        {self.mean_length:.2f} rounds",
+            f"Median / p90 / p99: {self.length_percentile(50)} / {self.length_percentile(90)} / "
+            f"{self.length_percentile(99)} rounds",
+            f"Shortest game:      {int(np.flatnonzero(self.length_counts)[0])} rounds",
+            "Win rates:          " + ", ".join(f"P{i + 1} {rate:.4f}" for i, rate in enumerate(self.win_rates)),
+            f"First-player edge:  {self.first_player_advantage:+.4f}",
+        ]
+
+        frequencies = self.tile_frequencies
+        hottest = np.argsort(frequencies)[::-1][:5]
+        lines.append("Most visited tiles: " + ", ".join(f"{tile} ({frequencies[tile]:.3%})" for tile in hottest))
+        return "\n".join(lines)
+
+
+def simulate_games(n_games, engine=None, seed=None, max_rounds=MAX_ROUNDS, batch_size=BATCH_SIZE):
+    """Симулирај n_games независни игри, векторизирано по batch-ови"""
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy is required for Monte Carlo simulation")
+
+    engine = engine or DEFAULT_ENGINE
+    players = engine.players
+    last_tile = engine.last_tile
+    stride = engine.stride
+    destinations = np.asarray(engine.destinations, dtype=np.int32)
+    rng = np.random.default_rng(seed)
+
+    length_counts = np.zeros(max_rounds + 1, dtype=np.int64)
+    wins = np.zeros(players, dtype=np.int64)
+    tile_visits = np.zeros(last_tile + 1, dtype=np.int64)
+    unfinished = 0
+
+    start_time = time.perf_counter()
+    for batch_start in range(0, n_games, batch_size):
+        # Само активните игри остануваат во низата - завршените се отстрануваат
+        positions = np.zeros((min(batch_size, n_games - batch_start), players), dtype=np.int32)
+
+        for round_number in range(1, max_rounds + 1):
+            for player in range(players):
+                dice = rng.integers(1, engine.faces + 1, size=len(positions), dtype=np.int32)
+                moved = destinations[positions[:, player] * stride + dice]
+                positions[:, player] = moved
+                tile_visits += np.bincount(moved, minlength=last_tile + 1)
+
+                finished = moved == last_tile
+                finished_count = int(np.count_nonzero(finished))
+                if finished_count:
+                    wins[player] += finished_count
+                    length_counts[round_number] += finished_count
+                    positions = positions[~finished]
+                    if not len(positions):
+                        break
+
+            if not len(positions):
+                break
+
+        unfinished += len(positions)
+
+    elapsed = time.perf_counter() - start_time
+    return SimulationReport(engine, n_games, length_counts, wins, tile_visits, unfinished, elapsed)
+
+
+if __name__ == "__main__":
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    board_engine = load_board(sys.argv[2]).engine() if len(sys.argv) > 2 else None
+    report = simulate_games(games, engine=board_engine, seed=12345)
+    print(report.summary())
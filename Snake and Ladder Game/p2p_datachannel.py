@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Надградба од WebSocket relay на директен WebRTC DataChannel
+Играта почнува преку relay-от на signaling серверот; host праќа offer веднаш
+по connection_established и пораките преминуваат на DataChannel кога ICE ќе заврши.
+Две ленти: сигурна и подредена за потези, и неподредена без повторно праќање
+за козметички/presence пораки, за изгубен ping да не блокира потег.
+"""
+
+import asyncio
+
+try:
+    from aiortc import RTCConfiguration, RTCIceServer, RTCPeerConnection, RTCSessionDescription
+    from aiortc.sdp import candidate_from_sdp
+
+    AIORTC_AVAILABLE = True
+except ImportError:
+    AIORTC_AVAILABLE = False
+
+ICE_SERVERS = ["stun:stun.l.google.com:19302", "stun:stun1.l.google.com:19302"]
+WEBRTC_SIGNALS = ("webrtc_offer", "webrtc_answer", "webrtc_ice_candidate")
+
+RELIABLE = "reliable"
+UNRELIABLE = "unreliable"
+LANE_LABELS = {RELIABLE: "game", UNRELIABLE: "fast"}
+# Пораки чие губење е прифатливо; сè друго (turn, ack, snapshot, reset...) оди сигурно
+UNRELIABLE_TYPES = frozenset({"ping", "pong", "presence", "emote", "animation_hint"})
+# Ако DataChannel не се отвори во овој рок, играта останува на relay
+UPGRADE_TIMEOUT = 15.0
+
+
+def lane_for(message_type):
+    return UNRELIABLE if message_type in UNRELIABLE_TYPES else RELIABLE
+
+
+class DataChannelLink:
+    """
+    Една RTCPeerConnection со две DataChannel ленти: "game" (ordered, reliable)
+    и "fast" (unordered, maxRetransmits=0). Врската е отворена кога е отворена
+    сигурната лента; on_message(message, lane) ја добива и лентата.
+    Signaling пораките се обработуваат по ред во посебен task, за да
+    ICE gathering не го блокира читањето на relay пораките.
+    """
+
+    def __init__(self, send_signal, on_open, on_message, on_close, ice_servers=ICE_SERVERS,
+                 timeout=UPGRADE_TIMEOUT):
+        # send_signal(dict) е корутина што праќа webrtc_* порака преку signaling серверот
+        self.send_signal = send_signal
+        self.on_open = on_open
+        self.on_message = on_message
+        self.on_close = on_close
+        self.timeout = timeout
+
+        servers = [RTCIceServer(urls=url) for url in ice_servers]
+        self.pc = RTCPeerConnection(configuration=RTCConfiguration(iceServers=servers))
+        self.pc.on("datachannel", self._attach)
+        self.pc.on("connectionstatechange", self._on_connection_state)
+
+        self.channels = {}
+        self.is_open = False
+        self.closed = False
+        self._signals = asyncio.Queue()
+        self._worker = None
+        self._timer = None
+
+    def start(self, offer=False):
+        """Стартувај го обработувачот; host (offer=True) го креира каналот и праќа offer"""
+        self._worker = asyncio.ensure_future(self._process_signals())
+        self._timer = asyncio.get_running_loop().call_later(self.timeout, self._on_timeout)
+        if offer:
+            self._signals.put_nowait({"type": "create_offer"})
+
+    def post(self, data):
+        """Signaling порака од peer-от (offer/answer/ICE кандидат)"""
+        self._signals.put_nowait(data)
+
+    async def _process_signals(self):
+        while not self.closed:
+            data = await self._signals.get()
+            try:
+                await self._handle_signal(data)
+            except Exception as e:
+                print(f"WebRTC signaling error ({data.get('type')}): {e}")
+                await self.close()
+
+    async def _handle_signal(self, data):
+        kind = data.get("type")
+        if kind == "create_offer":
+            self._attach(self.pc.createDataChannel(LANE_LABELS[RELIABLE], ordered=True))
+            self._attach(self.pc.createDataChannel(LANE_LABELS[UNRELIABLE], ordered=False, maxRetransmits=0))
+            # aiortc не прави trickle: локалните кандидати се веќе во SDP-то по setLocalDescription
+            await self.pc.setLocalDescription(await self.pc.createOffer())
+            await self.send_signal({"type": "webrtc_offer", "offer": self._local_description()})
+
+        elif kind == "webrtc_offer":
+            offer = data["offer"]
+            await self.pc.setRemoteDescription(RTCSessionDescription(sdp=offer["sdp"], type=offer["type"]))
+            await self.pc.setLocalDescription(await self.pc.createAnswer())
+            await self.send_signal({"type": "webrtc_answer", "answer": self._local_description()})
+
+        elif kind == "webrtc_answer":
+            answer = data["answer"]
+            await self.pc.setRemoteDescription(RTCSessionDescription(sdp=answer["sdp"], type=answer["type"]))
+
+        elif kind == "webrtc_ice_candidate":
+            # Trickle кандидати од peers што ги праќаат одделно (пр. прелистувач); празен = крај
+            candidate_data = data.get("candidate") or {}
+            line = candidate_data.get("candidate")
+            if line:
+                candidate = candidate_from_sdp(line.split(":", 1)[1] if line.startswith("candidate:") else line)
+                candidate.sdpMid = candidate_data.get("sdpMid")
+                candidate.sdpMLineIndex = candidate_data.get("sdpMLineIndex")
+                await self.pc.addIceCandidate(candidate)
+
+    def _local_description(self):
+        description = self.pc.localDescription
+        return {"type": description.type, "sdp": description.sdp}
+
+    def _attach(self, channel):
+        lane = UNRELIABLE if channel.label == LANE_LABELS[UNRELIABLE] else RELIABLE
+        self.channels[lane] = channel
+        channel.on("message", lambda message: self.on_message(message, lane))
+        if lane == UNRELIABLE:
+            return
+
+        channel.on("close", lambda: asyncio.ensure_future(self.close()))
+        # Каналот од peer-от пристигнува веќе отворен
+        if channel.readyState == "open":
+            self._opened()
+        else:
+            channel.on("open", self._opened)
+
+    def _opened(self):
+        if self.is_open or self.closed:
+            return
+        self.is_open = True
+        if self._timer:
+            self._timer.cancel()
+        self.on_open()
+
+    async def _on_connection_state(self):
+        if self.pc.connectionState in ("failed", "closed"):
+            await self.close()
+
+    def _on_timeout(self):
+        if not self.is_open:
+            print(f"DataChannel not open after {self.timeout}s - staying on relay")
+            asyncio.ensure_future(self.close())
+
+    def lane_open(self, lane):
+        channel = self.channels.get(lane)
+        return self.is_open and channel is not None and channel.readyState == "open"
+
+    def send(self, payload, lane=RELIABLE):
+        self.channels[lane].send(payload)
+
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.is_open = False
+        if self._timer:
+            self._timer.cancel()
+        if self._worker and self._worker is not asyncio.current_task():
+            self._worker.cancel()
+        try:
+            await self.pc.close()
+        finally:
+            self.on_close()
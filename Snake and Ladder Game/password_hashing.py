@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Хаширање на лозинки со сол и подесива цена (scrypt / PBKDF2 од hashlib)
+Алгоритмот и параметрите се запишуваат во самиот хаш, па секој запис се
+проверува со своите параметри:
+
+    scrypt$n=16384,r=8,p=1$<сол>$<хаш>
+    pbkdf2_sha256$i=300000$<сол>$<хаш>
+
+Стари записи (64 hex знаци, SHA-256 без сол) се проверуваат и при успешна
+најава се хашираат одново со тековниот hasher (needs_rehash).
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _parse_params(text):
+    return {key: int(value) for key, value in (item.split("=", 1) for item in text.split(","))}
+
+
+class ScryptHasher:
+    algorithm = "scrypt"
+
+    def __init__(self, n=2 ** 14, r=8, p=1):
+        self.n = n
+        self.r = r
+        self.p = p
+
+    @classmethod
+    def from_params(cls, params):
+        return cls(**_parse_params(params))
+
+    @property
+    def params(self):
+        return f"n={self.n},r={self.r},p={self.p}"
+
+    def derive(self, password, salt):
+        # scrypt троши 128 * r * n бајти; OpenSSL стандардно дозволува само 32 MB
+        return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=self.n, r=self.r, p=self.p,
+                              maxmem=256 * self.r * (self.n + self.p), dklen=KEY_BYTES)
+
+
+class Pbkdf2Hasher:
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, i=300_000):
+        self.iterations = i
+
+    @classmethod
+    def from_params(cls, params):
+        return cls(**_parse_params(params))
+
+    @property
+    def params(self):
+        return f"i={self.iterations}"
+
+    def derive(self, password, salt):
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, self.iterations, KEY_BYTES)
+
+
+ALGORITHMS = {hasher.algorithm: hasher for hasher in (ScryptHasher, Pbkdf2Hasher)}
+
+# Поставки по цена; bench_password_hashing.py мери најави/секунда по јадро за секоја
+HASHERS = {
+    "scrypt-n13": ScryptHasher(n=2 ** 13),
+    "scrypt-n14": ScryptHasher(n=2 ** 14),
+    "scrypt-n15": ScryptHasher(n=2 ** 15),
+    "pbkdf2-100k": Pbkdf2Hasher(i=100_000),
+    "pbkdf2-300k": Pbkdf2Hasher(i=300_000),
+    "pbkdf2-600k": Pbkdf2Hasher(i=600_000),
+}
+DEFAULT_HASHER = HASHERS["scrypt-n14"]
+
+
+def is_legacy_hash(encoded):
+    return len(encoded) == 64 and "$" not in encoded
+
+
+def hash_password(password, hasher=DEFAULT_HASHER):
+    """Нов хаш со случајна сол, во формат algorithm$params$salt$hash"""
+    salt = os.urandom(SALT_BYTES)
+    return "$".join((hasher.algorithm, hasher.params, _b64encode(salt), _b64encode(hasher.derive(password, salt))))
+
+
+def verify_password(password, encoded):
+    """Провери лозинка со алгоритмот и параметрите запишани во хашот"""
+    if is_legacy_hash(encoded):
+        legacy = hashlib.sha256(password.encode("utf-8")).hexdigest()
+        return hmac.compare_digest(legacy, encoded)
+
+    try:
+        algorithm, params, salt, expected = encoded.split("$")
+        hasher = ALGORITHMS[algorithm].from_params(params)
+        actual = hasher.derive(password, _b64decode(salt))
+    except (KeyError, TypeError, ValueError):
+        return False
+    return hmac.compare_digest(actual, _b64decode(expected))
+
+
+def needs_rehash(encoded, hasher=DEFAULT_HASHER):
+    """Дали записот е со стар алгоритам или со друга цена од тековната"""
+    return not encoded.startswith(f"{hasher.algorithm}${hasher.params}$")
+
+
+def verify_and_rehash(password, encoded, hasher=DEFAULT_HASHER):
+    """
+    Проверка за /login во еден повик до process pool-от: врати (точна, нов хаш).
+    Новиот хаш е None освен ако лозинката е точна, а записот треба надградба.
+    """
+    if not verify_password(password, encoded):
+        return False, None
+    return True, hash_password(password, hasher) if needs_rehash(encoded, hasher) else None
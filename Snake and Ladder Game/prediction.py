@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Предвидување на потезите на противникот од dice_roll
+Engine-от е детерминистички: од позицијата и коцката се знае каде ќе заврши
+токенот, па анимацијата почнува веднаш, а player_move само потврдува или поправа
+"""
+
+import time
+from typing import Dict, Optional, Tuple
+
+from latency_stats import LatencyStats
+
+
+class Prediction:
+    """Предвиден потег на еден играч"""
+
+    __slots__ = ("player", "start", "die", "landing", "final", "created_at")
+
+    def __init__(self, player, start, die, landing, final):
+        self.player = player
+        self.start = start
+        self.die = die
+        self.landing = landing
+        self.final = final
+        self.created_at = time.perf_counter()
+
+    @property
+    def overshoot(self):
+        """Пречекорување - играчот останува, player_move нема да дојде"""
+        return self.landing is None
+
+
+class MovePredictor:
+    """
+    Чува по едно предвидување по играч до пристигнување на player_move.
+    hidden_latency е времето од предвидувањето до авторитативниот потег,
+    т.е. колку порано почнала анимацијата кај примачот.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.pending: Dict[int, Prediction] = {}
+        self.confirmed = 0
+        self.corrected = 0
+        self.unpredicted = 0
+        self.hidden_latency = LatencyStats()
+
+    def predict(self, player, position, die) -> Prediction:
+        landing, final = self.engine.resolve_move(position, die)
+        prediction = Prediction(player, position, die, landing, final)
+        if prediction.overshoot:
+            self.pending.pop(player, None)
+        else:
+            self.pending[player] = prediction
+        return prediction
+
+    def reconcile(self, player, position) -> Tuple[Optional[Prediction], bool]:
+        """Спореди со player_move; врати (предвидување, дали се совпаѓа)"""
+        prediction = self.pending.pop(player, None)
+        if prediction is None:
+            self.unpredicted += 1
+            return None, False
+
+        self.hidden_latency.record(time.perf_counter() - prediction.created_at)
+        if prediction.final == position:
+            self.confirmed += 1
+            return prediction, True
+
+        self.corrected += 1
+        return prediction, False
+
+    def discard(self, player=None):
+        """Отфрли предвидувања (пр. по авторитативен game_sync)"""
+        if player is None:
+            self.pending.clear()
+        else:
+            self.pending.pop(player, None)
+
+    def stats(self):
+        return {
+            "confirmed": self.confirmed,
+            "corrected": self.corrected,
+            "unpredicted": self.unpredicted,
+            "hidden_latency": self.hidden_latency.summary()
+        }
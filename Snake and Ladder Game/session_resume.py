@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Продолжување на сесии по прекин на конекцијата
+Секоја game порака добива реден број, серверот чува ограничен replay buffer
+по примач, а клиентот се враќа со resume token и ги добива само пропуштените пораки
+"""
+
+import hmac
+import json
+import secrets
+from collections import deque
+
+# Колку долго сесијата чека клиент што ја изгубил конекцијата
+RESUME_GRACE_SECONDS = 30
+REPLAY_BUFFER_SIZE = 256
+
+ROLES = ("host", "guest")
+
+
+def new_resume_token():
+    return secrets.token_urlsafe(18)
+
+
+def other_role(role):
+    return "guest" if role == "host" else "host"
+
+
+def role_of(session_data, websocket):
+    """Улогата на конекцијата во сесијата (host/guest) или None"""
+    for role in ROLES:
+        if session_data.get(role) is not None and session_data[role] == websocket:
+            return role
+    return None
+
+
+class ReplayBuffer:
+    """Последните N пораки за еден примач, со нивните редни броеви"""
+
+    def __init__(self, size=REPLAY_BUFFER_SIZE):
+        self.next_seq = 1
+        self.entries = deque(maxlen=size)
+
+    def add(self, build_payload):
+        """build_payload(seq) -> str; врати (seq, payload)"""
+        seq = self.next_seq
+        self.next_seq += 1
+        payload = build_payload(seq)
+        self.entries.append((seq, payload))
+        return seq, payload
+
+    def since(self, last_seq):
+        """
+        Пораки по last_seq и дали се сите - ако најстарите се веќе исфрлени
+        од buffer-от, клиентот бара целосна состојба од peer-от.
+        """
+        missed = [payload for seq, payload in self.entries if seq > last_seq]
+        complete = not self.entries or self.entries[0][0] <= last_seq + 1
+        return missed, complete
+
+
+class ResumableSession:
+    """
+    Resume состојба на една сесија: token по улога, replay buffer за пораките
+    кон секоја улога, последен примен реден број од секоја улога (за dedup)
+    и тајмери за grace период на исклучените улоги.
+    """
+
+    def __init__(self, buffer_size=REPLAY_BUFFER_SIZE):
+        self.tokens = {}
+        self.outbox = {role: ReplayBuffer(buffer_size) for role in ROLES}
+        self.last_received = {role: 0 for role in ROLES}
+        self.grace_timers = {}
+
+    def issue_token(self, role):
+        token = new_resume_token()
+        self.tokens[role] = token
+        return token
+
+    def role_for_token(self, token):
+        if not token:
+            return None
+        candidate = str(token).encode()
+        for role, expected in self.tokens.items():
+            if hmac.compare_digest(expected.encode(), candidate):
+                return role
+        return None
+
+    def accept_from(self, role, seq):
+        """Dedup на пораки од клиентот; клиенти без seq секогаш се примаат"""
+        if seq is None:
+            return True
+        seq = int(seq)
+        if seq <= self.last_received[role]:
+            return False
+        self.last_received[role] = seq
+        return True
+
+    def stamp_for(self, role, session_id, game_data, peer_seq=None):
+        """
+        Нумерирај и запамти game порака за улогата; врати JSON payload.
+        peer_seq е редниот број на испраќачот - примачот по него ги подредува
+        пораките што стигнуваат и преку relay и преку DataChannel.
+        """
+        _, payload = self.outbox[role].add(lambda seq: json.dumps({
+            "type": "game_message",
+            "session_id": session_id,
+            "seq": seq,
+            "peer_seq": peer_seq,
+            "data": game_data
+        }))
+        return payload
+
+    def is_connected(self, role):
+        return role not in self.grace_timers
+
+    def suspend(self, role, timer):
+        """Улогата е исклучена; timer е asyncio handle што ја бриши сесијата"""
+        self.cancel_grace(role)
+        self.grace_timers[role] = timer
+
+    def cancel_grace(self, role):
+        timer = self.grace_timers.pop(role, None)
+        if timer is not None:
+            timer.cancel()
+
+    def close(self):
+        for role in list(self.grace_timers):
+            self.cancel_grace(role)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Потпишани session tokens од auth серверот
+/login издава краток token (корисник + рок), потпишан со HMAC-SHA256 со
+заедничка тајна; signaling серверот го проверува локално, без повик до auth.
+
+    <base64url(JSON {"sub": корисник, "exp": unix време})>.<base64url(HMAC)>
+
+Тајната е во SNL_SESSION_SECRET, или во .session_secret до модулот
+(се креира при прва употреба) кога двата сервери се на иста машина.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from collections import OrderedDict
+from typing import Optional
+
+SESSION_TOKEN_TTL = 12 * 60 * 60
+SECRET_ENV = "SNL_SESSION_SECRET"
+SECRET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".session_secret")
+VERIFY_CACHE_SIZE = 1024
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def load_secret(path=SECRET_FILE) -> bytes:
+    """Тајна од околината или од датотеката (креирај ја ако не постои)"""
+    if os.environ.get(SECRET_ENV):
+        return os.environ[SECRET_ENV].encode("utf-8")
+
+    if not os.path.exists(path):
+        # Прво во привремена датотека, па атомичен link: процес што стартува истовремено
+        # (auth и signaling) никогаш не чита половично запишана тајна
+        temp_path = f"{path}.{os.getpid()}"
+        with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w",
+                       encoding="ascii") as f:
+            f.write(secrets.token_urlsafe(32))
+        try:
+            os.link(temp_path, path)
+        except FileExistsError:
+            pass  # друг процес бил побрз - важи неговата тајна
+        finally:
+            os.unlink(temp_path)
+
+    with open(path, "r", encoding="ascii") as f:
+        return f.read().strip().encode("ascii")
+
+
+def _sign(secret, payload):
+    return _b64encode(hmac.new(secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def issue_token(username, secret, ttl=SESSION_TOKEN_TTL, now=None) -> str:
+    expires = int((now or time.time()) + ttl)
+    payload = _b64encode(json.dumps({"sub": username, "exp": expires}, separators=(",", ":"),
+                                    ensure_ascii=False).encode("utf-8"))
+    return f"{payload}.{_sign(secret, payload)}"
+
+
+class TokenVerifier:
+    """
+    Проверка на tokens со мал LRU кеш: клиент што се поврзува повторно со
+    истиот token не плаќа HMAC и JSON парсирање. Во кешот се само валидни
+    tokens, па лажни tokens не можат да ги истиснат вистинските.
+    """
+
+    def __init__(self, secret, cache_size=VERIFY_CACHE_SIZE):
+        self.secret = secret
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def verify(self, token, now=None) -> Optional[str]:
+        """Корисникот од token-от или None ако е невалиден или истечен"""
+        if not isinstance(token, str):
+            self.rejected += 1
+            return None
+        now = now or time.time()
+
+        cached = self._cache.get(token)
+        if cached is not None:
+            username, expires = cached
+            if expires > now:
+                self.hits += 1
+                self._cache.move_to_end(token)
+                return username
+            del self._cache[token]
+            self.rejected += 1
+            return None
+
+        self.misses += 1
+        claims = self._check(token)
+        if claims is None or claims["exp"] <= now:
+            self.rejected += 1
+            return None
+
+        self._cache[token] = (claims["sub"], claims["exp"])
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return claims["sub"]
+
+    def _check(self, token):
+        payload, _, signature = token.partition(".")
+        if not payload or not signature:
+            return None
+        try:
+            # Бајти: compare_digest не прима str со не-ASCII знаци
+            if not hmac.compare_digest(_sign(self.secret, payload).encode("ascii"), signature.encode("ascii")):
+                return None
+            claims = json.loads(_b64decode(payload))
+        except (ValueError, UnicodeError):
+            return None
+        if not isinstance(claims, dict) or not isinstance(claims.get("sub"), str) \
+                or not isinstance(claims.get("exp"), int):
+            return None
+        return claims
+
+    def stats(self):
+        return {"cached": len(self._cache), "hits": self.hits, "misses": self.misses, "rejected": self.rejected}
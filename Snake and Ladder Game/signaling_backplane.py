@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Pub/sub backplane за signaling сервер во cluster
+Секој јазол е претплатен на свој канал (node:<id>). Сопственикот на сесијата се
+одредува со consistent hashing на session_id (или на invite кодот), а пораките за
+клиенти на други јазли патуваат преку backplane-от. Публикациите се собираат
+и се праќаат во серии на крајот од тековната итерација на event loop-от.
+Ако broker-от не стига да прими, сериите чекаат writer.drain(), а над
+max_pending пораки новите се отфрлаат. По прекин на врската претплатата
+се обновува; пораките објавени во меѓувреме се губат (pub/sub семантика).
+
+Backends: in-memory (еден процес), локален TCP broker и Redis (RESP протокол).
+"""
+
+import argparse
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import struct
+from urllib.parse import urlparse
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+NODE_REPLICAS = 64
+DEFAULT_BROKER_PORT = 6400
+MAX_PENDING_MESSAGES = 10_000
+# Broker-от исклучува претплатник чиј излезен бафер е поголем од ова
+SUBSCRIBER_HIGH_WATER = 4 * 1024 * 1024
+RECONNECT_INITIAL_DELAY = 0.1
+RECONNECT_MAX_DELAY = 5.0
+
+_FRAME_HEADER = struct.Struct("!I")
+
+
+def node_channel(node_id):
+    return f"node:{node_id}"
+
+
+def write_frame(writer, message):
+    """Порака со должина напред - JSON од клиентот може да содржи нови редови"""
+    if isinstance(message, str):
+        message = message.encode("utf-8")
+    writer.write(_FRAME_HEADER.pack(len(message)) + message)
+
+
+async def read_frame(reader):
+    """Следна порака или None кога другата страна ја затворила врската"""
+    try:
+        header = await reader.readexactly(_FRAME_HEADER.size)
+        return (await reader.readexactly(_FRAME_HEADER.unpack(header)[0])).decode("utf-8")
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+
+
+class HashRing:
+    """Consistent hashing: секој јазол има replicas точки на кругот"""
+
+    def __init__(self, nodes, replicas=NODE_REPLICAS):
+        self.nodes = list(dict.fromkeys(nodes))
+        points = sorted((self._hash(f"{node}#{i}"), node) for node in self.nodes for i in range(replicas))
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+    @property
+    def clustered(self):
+        return len(self.nodes) > 1
+
+    def node_for(self, key):
+        if not self.clustered:
+            return self.nodes[0]
+        index = bisect.bisect(self._points, self._hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class RemoteClient:
+    """Клиент поврзан на друг јазол; за серверот изгледа како обична конекција"""
+
+    def __init__(self, backplane, conn_id, node_id):
+        self.backplane = backplane
+        self.conn_id = conn_id
+        self.node_id = node_id
+        self.remote_address = (node_id, conn_id)
+        self.closed = False
+
+    async def send(self, message):
+        if self.closed:
+            raise websockets.exceptions.ConnectionClosed(None, None)
+        self.backplane.publish(node_channel(self.node_id), {"kind": "deliver", "conn": self.conn_id,
+                                                            "message": message})
+
+
+class Backplane:
+    """
+    Основа за backends. publish е синхрон и само ја додава пораката во серијата
+    за каналот; серијата се праќа со _send_batches кога loop-от ќе се ослободи.
+    handler(messages) се повикува по ред, една серија по друга; грешка во
+    една серија се логира и не ја прекинува претплатата.
+    """
+
+    def __init__(self, max_pending=MAX_PENDING_MESSAGES):
+        self.max_pending = max_pending
+        self._pending = {}
+        self._pending_count = 0
+        self._flush_scheduled = False
+        self._drain_task = None
+        self.published = 0
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0
+
+    async def start(self, channel, handler):
+        raise NotImplementedError
+
+    def publish(self, channel, message):
+        if self._pending_count >= self.max_pending:
+            if self.dropped % 1000 == 0:
+                logger.warning(f"Backplane is not keeping up - dropping messages ({self.dropped} so far)")
+            self.dropped += 1
+            return
+        self._pending.setdefault(channel, []).append(message)
+        self._pending_count += 1
+        self.published += 1
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        # Додека чекаме drain, пораките се собираат; _drain повторно повикува _flush
+        if self._drain_task is not None or not self._pending:
+            return
+        batches, self._pending = self._pending, {}
+        self._pending_count = 0
+        self.batches += len(batches)
+        self._send_batches(batches)
+
+    def _send_batches(self, batches):
+        raise NotImplementedError
+
+    def _drain_later(self, writer):
+        """Ако transport-от не испратил сѐ, следниот flush чека writer.drain()"""
+        if self._drain_task is None and writer.transport.get_write_buffer_size():
+            self._drain_task = asyncio.ensure_future(self._drain(writer))
+
+    async def _drain(self, writer):
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass  # _consume ја обновува врската
+        finally:
+            self._drain_task = None
+        self._flush()
+
+    def _drop(self, batches):
+        count = sum(len(messages) for messages in batches.values())
+        self.dropped += count
+        logger.warning(f"Backplane not connected - dropped {count} messages")
+
+    async def _deliver(self, handler, payload, decode=None):
+        """Една серија до handler-от; лоша рамка или грешка не ја запира претплатата"""
+        try:
+            await handler(decode(payload) if decode else payload)
+        except Exception:
+            self.errors += 1
+            logger.exception("Backplane batch failed")
+
+    @staticmethod
+    async def _reconnect(connect, what):
+        """connect() со експоненцијален backoff додека не успее"""
+        delay = RECONNECT_INITIAL_DELAY
+        while True:
+            try:
+                result = await connect()
+                logger.info(f"{what} reconnected")
+                return result
+            except (OSError, asyncio.IncompleteReadError, RuntimeError) as e:
+                logger.warning(f"{what} reconnect failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    async def _stop_draining(self):
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+
+    async def close(self):
+        pass
+
+
+class InMemoryHub:
+    """Канали во еден процес; повеќе јазли во ист процес делат еден hub"""
+
+    def __init__(self):
+        self.queues = {}
+
+
+class InMemoryBackplane(Backplane):
+    def __init__(self, hub=None):
+        super().__init__()
+        self.hub = hub or InMemoryHub()
+        self._reader = None
+
+    async def start(self, channel, handler):
+        queue = self.hub.queues.setdefault(channel, asyncio.Queue())
+        self._reader = asyncio.ensure_future(self._consume(queue, handler))
+
+    async def _consume(self, queue, handler):
+        while True:
+            await self._deliver(handler, await queue.get())
+
+    def _send_batches(self, batches):
+        for channel, messages in batches.items():
+            queue = self.hub.queues.get(channel)
+            if queue is not None:
+                queue.put_nowait(messages)
+
+    async def close(self):
+        if self._reader:
+            self._reader.cancel()
+
+
+class TcpBackplane(Backplane):
+    """Клиент за PubSubBroker: една TCP конекција, рамки со JSON"""
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_BROKER_PORT):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.channel = None
+        self._writer = None
+        self._reader_task = None
+
+    async def start(self, channel, handler):
+        self.channel = channel
+        reader = await self._connect()
+        self._reader_task = asyncio.ensure_future(self._consume(reader, handler))
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        write_frame(writer, json.dumps({"op": "sub", "channel": self.channel}))
+        await writer.drain()
+        self._writer = writer
+        return reader
+
+    async def _consume(self, reader, handler):
+        while True:
+            frame = await read_frame(reader)
+            if frame is None:
+                logger.error("Backplane broker connection lost - resubscribing")
+                self._writer.close()
+                self._writer = None
+                reader = await self._reconnect(self._connect, "Backplane broker")
+                continue
+            await self._deliver(handler, frame, lambda frame: json.loads(frame)["messages"])
+
+    def _send_batches(self, batches):
+        if self._writer is None or self._writer.is_closing():
+            self._drop(batches)
+            return
+        for channel, messages in batches.items():
+            write_frame(self._writer, json.dumps({"op": "pub", "channel": channel, "messages": messages}))
+        self._drain_later(self._writer)
+
+    async def close(self):
+        await self._stop_draining()
+        if self._reader_task:
+            self._reader_task.cancel()
+        if self._writer:
+            self._writer.close()
+
+
+class PubSubBroker:
+    """
+    Локален broker за TcpBackplane - замена за Redis при развој и тестирање.
+    Претплатник што не чита (бафер над high_water) се исклучува наместо
+    меморијата на broker-от да расте; TcpBackplane потоа се претплатува одново.
+    """
+
+    def __init__(self, high_water=SUBSCRIBER_HIGH_WATER):
+        self.subscribers = {}
+        self.high_water = high_water
+        self.disconnected_slow = 0
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_BROKER_PORT):
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def handle_connection(self, reader, writer):
+        channels = []
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                try:
+                    data = json.loads(frame)
+                    op, channel = data.get("op"), data["channel"]
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    logger.warning("Broker: ignoring malformed frame")
+                    continue
+                if op == "sub":
+                    channels.append(channel)
+                    self.subscribers.setdefault(channel, set()).add(writer)
+                elif op == "pub":
+                    # Рамката се препраќа непроменета
+                    for subscriber in list(self.subscribers.get(channel, ())):
+                        if subscriber.transport.get_write_buffer_size() > self.high_water:
+                            self.drop_subscriber(subscriber)
+                        else:
+                            write_frame(subscriber, frame)
+        finally:
+            for channel in channels:
+                self.subscribers.get(channel, set()).discard(writer)
+            writer.close()
+
+    def drop_subscriber(self, writer):
+        logger.warning(f"Broker: disconnecting slow subscriber {writer.get_extra_info('peername')}")
+        self.disconnected_slow += 1
+        for subscribers in self.subscribers.values():
+            subscribers.discard(writer)
+        writer.transport.abort()
+
+
+def _resp_command(*parts):
+    encoded = [part.encode("utf-8") if isinstance(part, str) else part for part in parts]
+    return b"".join([b"*%d\r\n" % len(encoded)] + [b"$%d\r\n%s\r\n" % (len(part), part) for part in encoded])
+
+
+async def _read_resp(reader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Redis connection closed")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"*":
+        return [await _read_resp(reader) for _ in range(int(body))]
+    if kind == b"$":
+        length = int(body)
+        return None if length < 0 else (await reader.readexactly(length + 2))[:-2]
+    if kind == b":":
+        return int(body)
+    if kind == b"-":
+        raise RuntimeError(body.decode("utf-8", "replace"))
+    return body
+
+
+class RedisBackplane(Backplane):
+    """
+    Redis PUBLISH/SUBSCRIBE преку RESP, без дополнителни зависности.
+    Серијата за еден канал е една PUBLISH порака, а сите PUBLISH од еден
+    flush се праќаат со едно запишување (pipelining).
+    """
+
+    def __init__(self, host="127.0.0.1", port=6379):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.channel = None
+        self._writer = None
+        self._sub_writer = None
+        self._tasks = []
+
+    async def start(self, channel, handler):
+        self.channel = channel
+        sub_reader = await self._subscribe()
+        pub_reader = await self._connect_publisher()
+        self._tasks = [asyncio.ensure_future(self._consume(sub_reader, handler)),
+                       asyncio.ensure_future(self._drain_replies(pub_reader))]
+
+    async def _subscribe(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        writer.write(_resp_command("SUBSCRIBE", self.channel))
+        await writer.drain()
+        await _read_resp(reader)  # потврда за SUBSCRIBE
+        self._sub_writer = writer
+        return reader
+
+    async def _connect_publisher(self):
+        reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        return reader
+
+    async def _consume(self, reader, handler):
+        while True:
+            try:
+                reply = await _read_resp(reader)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+                logger.error(f"Redis subscription lost ({e}) - resubscribing")
+                self._sub_writer.close()
+                reader = await self._reconnect(self._subscribe, "Redis subscription")
+                continue
+            except RuntimeError as e:
+                logger.error(f"Redis error on subscription: {e}")
+                continue
+            if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                await self._deliver(handler, reply[2], json.loads)
+
+    async def _drain_replies(self, reader):
+        # Бројот на примачи од PUBLISH не ни треба, само грешките
+        while True:
+            try:
+                await _read_resp(reader)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+                logger.error(f"Redis publish connection lost ({e}) - reconnecting")
+                self._writer.close()
+                self._writer = None
+                reader = await self._reconnect(self._connect_publisher, "Redis publisher")
+            except RuntimeError as e:
+                logger.error(f"Redis PUBLISH failed: {e}")
+
+    def _send_batches(self, batches):
+        if self._writer is None or self._writer.is_closing():
+            self._drop(batches)
+            return
+        self._writer.write(b"".join(_resp_command("PUBLISH", channel, json.dumps(messages))
+                                    for channel, messages in batches.items()))
+        self._drain_later(self._writer)
+
+    async def close(self):
+        await self._stop_draining()
+        for task in self._tasks:
+            task.cancel()
+        for writer in (self._writer, self._sub_writer):
+            if writer:
+                writer.close()
+
+
+def backplane_from_url(url):
+    """memory, tcp://host:port или redis://host:port"""
+    if not url or url == "memory":
+        return InMemoryBackplane()
+    parsed = urlparse(url)
+    if parsed.scheme == "tcp":
+        return TcpBackplane(parsed.hostname or "127.0.0.1", parsed.port or DEFAULT_BROKER_PORT)
+    if parsed.scheme == "redis":
+        return RedisBackplane(parsed.hostname or "127.0.0.1", parsed.port or 6379)
+    raise ValueError(f"Unknown backplane: {url}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local pub/sub broker for signaling cluster nodes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_BROKER_PORT)
+    args = parser.parse_args()
+
+    async def main():
+        server = await PubSubBroker().serve(args.host, args.port)
+        print(f"Backplane broker on {args.host}:{args.port}. Press Ctrl+C to stop.")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nBroker stopped by user")
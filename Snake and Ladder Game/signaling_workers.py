@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Signaling сервер во повеќе процеси
+N worker процеси го делат истиот порт (SO_REUSEPORT) и kernel-от ги распределува
+конекциите. Сесијата живее кај worker-от што ја креирал: првиот знак од invite
+кодот и префиксот на session_id се неговиот id. Guest (или resume) што ќе стигне
+на друг worker се препраќа цел до сопственикот преку Unix domain socket,
+па host и guest секогаш се relay-ираат во истиот процес.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+import uuid
+
+import websockets
+
+from invite_codes import INVITE_CODE_ALPHABET, InviteCodeRegistry, normalize_invite_code
+from session_tokens import TokenVerifier, load_secret
+from signaling_backplane import read_frame, write_frame
+from webrtc_signaling_server import EnhancedSignalingServer, logger
+
+MAX_WORKERS = len(INVITE_CODE_ALPHABET)
+REUSEPORT_AVAILABLE = hasattr(socket, "SO_REUSEPORT") and hasattr(socket, "AF_UNIX")
+
+
+def worker_prefix(worker_id):
+    return INVITE_CODE_ALPHABET[worker_id]
+
+
+def socket_path(socket_dir, port, worker_id):
+    return os.path.join(socket_dir, f"snl-signaling-{port}-{worker_id}.sock")
+
+
+class ForwardedSocket:
+    """Клиент поврзан на друг worker; за серверот изгледа како обична конекција"""
+
+    def __init__(self, writer, remote_address):
+        self.writer = writer
+        self.remote_address = remote_address
+
+    async def send(self, message):
+        if self.writer.is_closing():
+            raise websockets.exceptions.ConnectionClosed(None, None)
+        write_frame(self.writer, message)
+        await self.writer.drain()
+
+
+class WorkerSignalingServer(EnhancedSignalingServer):
+    """EnhancedSignalingServer во еден worker, со препраќање до сопственикот на сесијата"""
+
+    def __init__(self, worker_id, workers, port, socket_dir, **kwargs):
+        super().__init__(**kwargs)
+        self.worker_id = worker_id
+        self.workers = workers
+        self.port = port
+        self.socket_dir = socket_dir
+        self.prefix = worker_prefix(worker_id)
+        self.invite_codes = InviteCodeRegistry(prefix=self.prefix)
+        self.forwarded_out = 0
+        self.forwarded_in = 0
+
+    def new_session_id(self) -> str:
+        return f"{self.prefix}-{uuid.uuid4()}"
+
+    def owner_of(self, message):
+        """Worker што ја поседува сесијата од join/resume порака; None ако е оваа"""
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(data, dict):
+            return None
+
+        kind = data.get("type")
+        if kind == "join_session" and data.get("invite_code"):
+            key = normalize_invite_code(data["invite_code"])[:1]
+        elif kind in ("join_session", "resume_session") and data.get("session_id"):
+            key = str(data["session_id"]).split("-", 1)[0]
+        else:
+            return None
+
+        owner = INVITE_CODE_ALPHABET.find(key) if len(key) == 1 else -1
+        if owner < 0 or owner >= self.workers or owner == self.worker_id:
+            return None
+        return owner
+
+    async def handle_client(self, websocket: websockets.WebSocketServerProtocol, path: str = None):
+        await self.register_client(websocket)
+        try:
+            async for message in websocket:
+                # Само конекции без сесија можат да припаѓаат на друг worker
+                if websocket not in self.client_sessions:
+                    owner = self.owner_of(message)
+                    if owner is not None:
+                        await self.forward_connection(websocket, message, owner)
+                        return
+                await self.handle_message(websocket, message)
+        except websockets.exceptions.ConnectionClosed:
+            logger.info(f"Client {websocket.remote_address} disconnected normally")
+        except Exception as e:
+            logger.error(f"Error handling client {websocket.remote_address}: {e}")
+        finally:
+            await self.unregister_client(websocket)
+
+    async def forward_connection(self, websocket, first_message, owner):
+        """Препраќај ја конекцијата до worker-от owner додека едната страна не се затвори"""
+        try:
+            reader, writer = await asyncio.open_unix_connection(socket_path(self.socket_dir, self.port, owner))
+        except OSError as e:
+            logger.error(f"Worker {owner} unreachable: {e}")
+            await self.send_safe(websocket, json.dumps({"type": "error", "message": "Session not found"}))
+            return
+
+        self.forwarded_out += 1
+        logger.info(f"Forwarding {websocket.remote_address} to worker {owner}")
+        write_frame(writer, json.dumps({"remote_address": list(websocket.remote_address or ())}))
+        write_frame(writer, first_message)
+
+        async def upstream():
+            async for message in websocket:
+                write_frame(writer, message)
+                await writer.drain()
+
+        async def downstream():
+            while True:
+                message = await read_frame(reader)
+                if message is None:
+                    break
+                await websocket.send(message)
+
+        tasks = [asyncio.ensure_future(upstream()), asyncio.ensure_future(downstream())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+            if websocket.open:
+                await websocket.close()
+
+    async def serve_forwarded(self):
+        """Unix socket на кој другите worker-и препраќаат конекции за нашите сесии"""
+        path = socket_path(self.socket_dir, self.port, self.worker_id)
+        if os.path.exists(path):
+            os.unlink(path)
+        return await asyncio.start_unix_server(self.handle_forwarded, path=path)
+
+    async def handle_forwarded(self, reader, writer):
+        hello = await read_frame(reader)
+        if hello is None:
+            writer.close()
+            return
+
+        remote_address = tuple(json.loads(hello).get("remote_address") or ("forwarded", 0))
+        client = ForwardedSocket(writer, remote_address)
+        self.forwarded_in += 1
+        await self.register_client(client)
+        try:
+            while True:
+                message = await read_frame(reader)
+                if message is None:
+                    break
+                await self.handle_message(client, message)
+        except Exception as e:
+            logger.error(f"Error handling forwarded client {remote_address}: {e}")
+        finally:
+            await self.unregister_client(client)
+            writer.close()
+
+
+def reuseport_socket(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.setblocking(False)
+    return sock
+
+
+def run_worker(worker_id, workers, host, port, socket_dir, require_auth=False):
+    """Влезна точка на еден worker процес"""
+    async def serve():
+        server = WorkerSignalingServer(worker_id, workers, port, socket_dir,
+                                       token_verifier=TokenVerifier(load_secret()), require_auth=require_auth)
+        forwarded = await server.serve_forwarded()
+        async with websockets.serve(server.handle_client, sock=reuseport_socket(host, port),
+                                    ping_interval=30, ping_timeout=10):
+            logger.info(f"Worker {worker_id}/{workers} (pid {os.getpid()}) serving on {host}:{port}")
+            try:
+                await asyncio.Future()
+            finally:
+                forwarded.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+def start_worker_pool(host="0.0.0.0", port=8765, workers=None, socket_dir=None, require_auth=False):
+    """Стартај workers процеси на ист порт; врати ја листата процеси"""
+    workers = max(1, min(workers or os.cpu_count() or 1, MAX_WORKERS))
+    if not REUSEPORT_AVAILABLE and workers > 1:
+        logger.warning("SO_REUSEPORT is not available - running a single worker")
+        workers = 1
+    socket_dir = socket_dir or tempfile.gettempdir()
+
+    processes = []
+    for worker_id in range(workers):
+        process = multiprocessing.Process(target=run_worker, args=(worker_id, workers, host, port, socket_dir, require_auth),
+                                          name=f"signaling-worker-{worker_id}", daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
+
+
+def stop_worker_pool(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-process signaling server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="default: number of CPUs")
+    parser.add_argument("--require-auth", action="store_true", help="reject clients without a valid session token")
+    args = parser.parse_args()
+
+    processes = start_worker_pool(args.host, args.port, args.workers, require_auth=args.require_auth)
+    print(f"Signaling server: {len(processes)} workers on {args.host}:{args.port}. Press Ctrl+C to stop.")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        print("\nServer stopped by user")
+    finally:
+        stop_worker_pool(processes)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Заеднички кеш на спрајтови за целиот процес (коцки, змии, скали)
+Клуч: (asset, size, angle, scale), LRU исфрлање; PhotoImage се чуваат по Tk root
+"""
+
+import hashlib
+import os
+import weakref
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw, ImageTk
+
+ASSET_PATH = "snake_ladder_assets/"
+SPRITE_CACHE_SIZE = 256
+# Процедуралните извори се цртаат поголеми, па намалувањето дава мазни рабови
+DICE_SOURCE_SIZE = 140
+
+
+def draw_dice_face(value, size=DICE_SOURCE_SIZE):
+    """Страна на коцка"""
+    img = Image.new('RGBA', (size, size), '#ecf0f1')
+    draw = ImageDraw.Draw(img)
+    dot_radius = size // 12
+    center = size // 2
+    offset = size // 4
+    border = max(3, size // 23)
+
+    # Рамка на коцката
+    draw.rectangle([2, 2, size - 3, size - 3], outline='#34495e', width=border, fill='#ecf0f1')
+
+    # Точки врз основа на вредност
+    dots = {
+        1: [(center, center)],
+        2: [(center - offset, center - offset), (center + offset, center + offset)],
+        3: [(center - offset, center - offset), (center, center), (center + offset, center + offset)],
+        4: [(center - offset, center - offset), (center + offset, center - offset),
+            (center - offset, center + offset), (center + offset, center + offset)],
+        5: [(center - offset, center - offset), (center + offset, center - offset),
+            (center - offset, center + offset), (center + offset, center + offset), (center, center)],
+        6: [(center - offset, center - offset), (center + offset, center - offset),
+            (center - offset, center), (center + offset, center),
+            (center - offset, center + offset), (center + offset, center + offset)]
+    }
+
+    for x, y in dots[value]:
+        draw.ellipse((x - dot_radius, y - dot_radius, x + dot_radius, y + dot_radius), fill='#e74c3c')
+    return img
+
+
+def draw_snake_sprite():
+    """Резервна слика на змија кога нема asset"""
+    img = Image.new('RGBA', (80, 80), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.ellipse([10, 20, 70, 60], fill='#e74c3c', outline='#c0392b', width=3)
+    draw.ellipse([50, 10, 75, 35], fill='#c0392b', outline='#8b0000', width=2)
+    draw.ellipse([58, 16, 62, 20], fill='white')
+    draw.ellipse([68, 16, 72, 20], fill='white')
+    draw.ellipse([59, 17, 61, 19], fill='black')
+    draw.ellipse([69, 17, 71, 19], fill='black')
+    return img
+
+
+def draw_ladder_sprite():
+    """Резервна слика на скала кога нема asset"""
+    img = Image.new('RGBA', (80, 80), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([25, 5, 30, 75], fill='#8B4513', outline='#654321', width=1)
+    draw.rectangle([50, 5, 55, 75], fill='#8B4513', outline='#654321', width=1)
+    for i in range(6):
+        y = 10 + i * 11
+        draw.rectangle([25, y, 55, y + 3], fill='#A0522D', outline='#654321', width=1)
+    return img
+
+
+class SpriteCache:
+    """
+    LRU кеш на PIL слики. Секој asset има извор: готова PNG датотека во
+    asset_dir ако постои, инаку процедурален loader. Ротација и промена на
+    големина се прават еднаш по клуч.
+    """
+
+    def __init__(self, asset_dir=ASSET_PATH, max_entries=SPRITE_CACHE_SIZE):
+        self.asset_dir = asset_dir
+        self.max_entries = max_entries
+        self._sources = {}
+        self._images = OrderedDict()
+        self._photos = weakref.WeakKeyDictionary()
+        self._digests = {}
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, asset, loader, filename=None):
+        """loader() -> PIL слика; filename е пред-подготвена слика во asset_dir"""
+        self._sources[asset] = (loader, filename)
+
+    @staticmethod
+    def make_key(asset, size=None, angle=0, scale=1.0):
+        # Аглите се заокружуваат за блиски вредности да делат ист спрајт
+        return asset, size, round(angle, 1), scale
+
+    def _load_source(self, asset):
+        try:
+            loader, filename = self._sources[asset]
+        except KeyError:
+            raise KeyError(f"Unknown sprite asset: {asset}")
+
+        if filename:
+            path = os.path.join(self.asset_dir, filename)
+            if os.path.exists(path):
+                try:
+                    with Image.open(path) as source:
+                        return source.convert("RGBA")
+                except OSError as e:
+                    print(f"Could not load sprite {path}: {e}")
+        return loader()
+
+    def _remember(self, key, image):
+        self._images[key] = image
+        if len(self._images) > self.max_entries:
+            self._images.popitem(last=False)
+
+    def image(self, asset, size=None, angle=0, scale=1.0) -> Image.Image:
+        """PIL слика за клучот; size е страна на квадрат во пиксели пред scale"""
+        key = self.make_key(asset, size, angle, scale)
+        image = self._images.get(key)
+        if image is not None:
+            self.hits += 1
+            self._images.move_to_end(key)
+            return image
+
+        self.misses += 1
+        if size is None and key[2] == 0 and scale == 1.0:
+            image = self._load_source(asset)
+        else:
+            image = self.image(asset)
+            if key[2]:
+                image = image.rotate(-key[2], expand=True)
+            if size is not None:
+                pixels = max(1, round(size * scale))
+                image = image.resize((pixels, pixels), Image.Resampling.LANCZOS)
+
+        self._remember(key, image)
+        return image
+
+    def photo(self, widget, asset, size=None, angle=0, scale=1.0) -> ImageTk.PhotoImage:
+        """
+        PhotoImage за клучот. Tk сликите припаѓаат на интерпретерот,
+        па се кешираат по root - сите Toplevel прозорци ги делат.
+        """
+        root = widget._root()
+        photos = self._photos.get(root)
+        if photos is None:
+            photos = self._photos[root] = OrderedDict()
+
+        key = self.make_key(asset, size, angle, scale)
+        photo = photos.get(key)
+        if photo is not None:
+            photos.move_to_end(key)
+            return photo
+
+        photo = ImageTk.PhotoImage(self.image(asset, size, angle, scale), master=root)
+        photos[key] = photo
+        if len(photos) > self.max_entries:
+            photos.popitem(last=False)
+        return photo
+
+    def digest(self, *assets):
+        """Hash на изворите - за клучеви на кешови на диск што ги содржат спрајтовите"""
+        parts = []
+        for asset in assets:
+            digest = self._digests.get(asset)
+            if digest is None:
+                source = self.image(asset)
+                hasher = hashlib.sha256(f"{source.mode}{source.size}".encode("ascii"))
+                hasher.update(source.tobytes())
+                digest = self._digests[asset] = hasher.hexdigest()
+            parts.append(digest)
+        return hashlib.sha256("".join(parts).encode("ascii")).hexdigest()[:12]
+
+    def stats(self):
+        return {"entries": len(self._images), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        self._images.clear()
+        self._digests.clear()
+        self._photos = weakref.WeakKeyDictionary()
+
+
+SPRITES = SpriteCache()
+SPRITES.register("snake", draw_snake_sprite, "snake_big.png")
+SPRITES.register("ladder", draw_ladder_sprite, "ladder_big.png")
+for _value in range(1, 7):
+    SPRITES.register(f"dice_{_value}", lambda value=_value: draw_dice_face(value), f"dice_{_value}.png")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Тестови за вчитување табли: секоја невалидна датотека е BoardConfigError,
+за да ја прескокнат find_board и load_default_board
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from board_config import (CLASSIC_BOARD, BoardConfig, BoardConfigError, find_board, load_board,
+                          load_default_board)
+
+
+class BoardConfigTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, filename, data):
+        path = os.path.join(self.directory.name, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        return path
+
+    def test_malformed_definitions_raise_board_config_error(self):
+        for data in ([1, 2], "board", {"rows": "x"}, {"rows": 2.7}, {"rows": True},
+                     {"cols": None}, {"snakes": 5}, {"snakes": {"x": 1}},
+                     {"ladders": [[2, 30, 40]]}, {"ladders": {"2": 30.5}}):
+            with self.subTest(data=data):
+                with self.assertRaises(BoardConfigError):
+                    load_board(self.write("bad.json", data))
+
+    def test_integer_values_from_json_are_accepted(self):
+        board = BoardConfig.from_dict({"rows": "5", "cols": 6.0, "snakes": {"20": 3}, "ladders": [[2, 15]]})
+        self.assertEqual((board.rows, board.cols), (5, 6))
+        self.assertEqual(board.snakes, {20: 3})
+        self.assertEqual(board.ladders, {2: 15})
+
+    def test_chained_jumps_and_cycles_are_rejected(self):
+        with self.assertRaises(BoardConfigError):
+            BoardConfig(5, 5, snakes={20: 3}, ladders={3: 10})
+        with self.assertRaises(BoardConfigError):
+            BoardConfig(5, 5, snakes={20: 3}, ladders={3: 20})
+
+    def test_find_board_skips_malformed_files(self):
+        self.write("a_list.json", [1, 2])
+        self.write("b_rows.json", {"rows": "x"})
+        board = BoardConfig(5, 5, snakes={20: 3}, ladders={2: 15}, name="small")
+        board.save(os.path.join(self.directory.name, "c_small.json"))
+
+        found = find_board(board.fingerprint, self.directory.name)
+        self.assertEqual(found.fingerprint, board.fingerprint)
+
+    def test_default_board_falls_back_to_classic(self):
+        path = self.write("bad.json", [1, 2])
+        with mock.patch.dict(os.environ, {"SNAKE_LADDER_BOARD": path}):
+            self.assertIs(load_default_board(), CLASSIC_BOARD)
+
+
+if __name__ == "__main__":
+    unittest.main()
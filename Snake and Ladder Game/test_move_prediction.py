@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Тестови за предвидување на потези: двајца peers преку вистинскиот signaling
+сервер, зад локален relay што внесува латенција во двете насоки. Примачот е
+вистинскиот P2PSnakeLadderGame (handler-ите за пораки), без Tk прозорец.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+import unittest
+
+from game_engine import DEFAULT_ENGINE
+from prediction import MovePredictor
+
+try:
+    import websockets
+    from webrtc_signaling_server import EnhancedSignalingServer, logger as server_logger
+
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+try:
+    from board_config import CLASSIC_BOARD
+    from webrtc_snake_ladder_game import P2PSnakeLadderGame
+
+    GAME_AVAILABLE = True
+except ImportError:
+    GAME_AVAILABLE = False
+
+HOST = "127.0.0.1"
+RELAY_DELAY = 0.05
+# Колку трае анимацијата кај играчот што се движи пред да испрати player_move
+MOVER_ANIMATION = 0.1
+TURNS = 12
+
+
+class LatencyRelay:
+    """TCP relay што ја одложува секоја насока за delay секунди (редоследот се чува)"""
+
+    def __init__(self, target_port, delay=RELAY_DELAY):
+        self.target_port = target_port
+        self.delay = delay
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, HOST, 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection(HOST, self.target_port)
+        await asyncio.gather(self._pipe(client_reader, upstream_writer),
+                             self._pipe(upstream_reader, client_writer))
+
+    async def _pipe(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        async def deliver():
+            while True:
+                release_at, chunk = await queue.get()
+                if chunk is None:
+                    break
+                wait = release_at - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                writer.write(chunk)
+                await writer.drain()
+            writer.close()
+
+        delivery = asyncio.create_task(deliver())
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                queue.put_nowait((loop.time() + self.delay, chunk))
+        except ConnectionError:
+            pass
+        queue.put_nowait((0, None))
+        try:
+            await delivery
+        except ConnectionError:
+            pass
+
+
+class FakeRoot:
+    """root.after/after_cancel врз asyncio loop-от, за AnimationScheduler без Tk"""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+
+    def after(self, delay_ms, callback):
+        return self.loop.call_later(delay_ms / 1000, callback)
+
+    def after_cancel(self, handle):
+        handle.cancel()
+
+
+class FakeWidget:
+    def __init__(self):
+        self.options = {}
+
+    def config(self, **options):
+        self.options.update(options)
+
+
+class FakeCanvas:
+    def __init__(self):
+        self.items = {}
+
+    def coords(self, item, *coords):
+        if coords:
+            self.items[item] = coords
+        return self.items.get(item, (0, 0, 0, 0))
+
+
+def headless_game(player_index, channel):
+    """P2PSnakeLadderGame без Tk: вистинската состојба и handler-и, widgets се stubs"""
+    game = P2PSnakeLadderGame.__new__(P2PSnakeLadderGame)
+    game.root = FakeRoot()
+    game.init_state(channel, is_host=player_index == 0, player_names=["Host", "Guest"], board=CLASSIC_BOARD)
+    # Наместо setup_ui/init_game
+    game.dice_images = [f"dice{face}" for face in range(1, 7)]
+    game.status_label = FakeWidget()
+    game.dice_label = FakeWidget()
+    game.roll_button = FakeWidget()
+    game.canvas = FakeCanvas()
+    game.tokens = ["token0", "token1"]
+    game.labels = ["label0", "label1"]
+    return game
+
+
+class Peer:
+    """Peer со headless игра; send_message е каналот што го користи играта"""
+
+    def __init__(self, websocket, player_index):
+        self.websocket = websocket
+        self.player_index = player_index
+        self.session_id = None
+        self.game = headless_game(player_index, self)
+        self.sent = []
+        self.one_way_delays = []
+        self.handled = asyncio.Queue()
+        self.outgoing = asyncio.Queue()
+        self.tasks = []
+
+    @property
+    def positions(self):
+        return self.game.positions
+
+    async def expect(self, message_type):
+        while True:
+            data = json.loads(await self.websocket.recv())
+            if data.get("type") == message_type:
+                return data
+
+    def send_message(self, payload):
+        """Интерфејсот на WebRTCClient: пораките одат по ред преку еден writer"""
+        payload = dict(payload, sent_at=time.perf_counter())
+        self.sent.append(payload)
+        self.outgoing.put_nowait(json.dumps({
+            "type": "game_message",
+            "session_id": self.session_id,
+            "data": payload
+        }))
+        return True
+
+    async def wait_for(self, message_type):
+        """Чекај додека играта не обработи порака од тој тип"""
+        while await asyncio.wait_for(self.handled.get(), timeout=5) != message_type:
+            pass
+
+    def start(self):
+        self.tasks = [asyncio.create_task(self._read_loop()), asyncio.create_task(self._write_loop())]
+
+    async def stop(self):
+        self.game.animations.close()
+        self.game.cancel_ack_timer()
+        for task in self.tasks:
+            task.cancel()
+        await self.websocket.close()
+
+    async def _write_loop(self):
+        while True:
+            await self.websocket.send(await self.outgoing.get())
+
+    async def _read_loop(self):
+        async for raw in self.websocket:
+            data = json.loads(raw)
+            if data.get("type") == "game_message":
+                message = data["data"]
+                self.one_way_delays.append(time.perf_counter() - message["sent_at"])
+                self.game.handle_p2p_message(message)
+                self.handled.put_nowait(message["type"])
+
+
+@unittest.skipUnless(WEBSOCKETS_AVAILABLE and GAME_AVAILABLE, "websockets or game dependencies not installed")
+class MovePredictionRelayTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        server_logger.disabled = True
+        logging.getLogger("websockets").setLevel(logging.WARNING)
+        logging.getLogger("asyncio").setLevel(logging.WARNING)
+
+        signaling = EnhancedSignalingServer()
+        self.server = await websockets.serve(signaling.handle_client, HOST, 0)
+        self.relay = LatencyRelay(self.server.sockets[0].getsockname()[1])
+        await self.relay.start()
+
+        url = f"ws://{HOST}:{self.relay.port}"
+        self.host = Peer(await websockets.connect(url), 0)
+        self.guest = Peer(await websockets.connect(url), 1)
+
+        await self.host.websocket.send(json.dumps({"type": "create_session", "player_name": "Host"}))
+        created = await self.host.expect("session_created")
+        await self.guest.websocket.send(json.dumps({"type": "join_session", "invite_code": created["invite_code"],
+                                                    "player_name": "Guest"}))
+        await self.host.expect("guest_joined")
+        await self.guest.expect("session_joined")
+
+        for peer in (self.host, self.guest):
+            peer.session_id = created["session_id"]
+            await peer.websocket.send(json.dumps({"type": "client_ready", "session_id": peer.session_id}))
+        for peer in (self.host, self.guest):
+            await peer.expect("connection_established")
+            peer.start()
+
+    async def asyncTearDown(self):
+        for peer in (self.host, self.guest):
+            await peer.stop()
+        self.server.close()
+        await self.server.wait_closed()
+        await self.relay.stop()
+
+    async def play_turn(self, mover, receiver, die, reported_position=None):
+        """Стар протокол од страната на играчот што се движи: dice_roll, анимација, player_move, game_sync"""
+        player = mover.player_index
+        landing, final = mover.game.engine.resolve_move(mover.positions[player], die)
+
+        mover.send_message({"type": "dice_roll", "player": player, "value": die})
+        await asyncio.sleep(MOVER_ANIMATION)
+        if landing is not None:
+            mover.positions[player] = final if reported_position is None else reported_position
+            mover.send_message({"type": "player_move", "player": player, "new_position": mover.positions[player]})
+        mover.game.current_player = 1 - player
+        mover.send_message({"type": "game_sync", "state": {"positions": mover.positions,
+                                                           "current_player": mover.game.current_player}})
+        await receiver.wait_for("game_sync")
+
+    async def test_relay_injects_latency(self):
+        await self.play_turn(self.host, self.guest, 3)
+        self.assertGreaterEqual(min(self.guest.one_way_delays), RELAY_DELAY * 2 * 0.9)
+
+    async def test_prediction_matches_authoritative_moves(self):
+        rng = random.Random(7)
+        peers = (self.host, self.guest)
+        for turn in range(TURNS):
+            mover = peers[turn % 2]
+            await self.play_turn(mover, peers[1 - turn % 2], rng.randint(1, 6))
+
+        for peer in peers:
+            predictor = peer.game.predictor
+            self.assertEqual(predictor.corrected, 0)
+            self.assertEqual(predictor.unpredicted, 0)
+            self.assertGreater(predictor.confirmed, 0)
+            # Предвидувањето е готово уште кога пристигнал dice_roll (толеранција за jitter на scheduler-от)
+            self.assertGreaterEqual(min(predictor.hidden_latency.samples), MOVER_ANIMATION * 0.5)
+            # Примачот го потврдува секој потег со move_complete
+            self.assertIn("move_complete", [message["type"] for message in peer.sent])
+        self.assertEqual(self.host.positions, self.guest.positions)
+
+    async def test_mismatch_is_corrected(self):
+        await self.play_turn(self.host, self.guest, 4, reported_position=20)
+
+        self.assertEqual(self.guest.game.predictor.corrected, 1)
+        self.assertEqual(self.guest.game.predictor.confirmed, 0)
+        self.assertEqual(self.guest.positions[0], 20)
+
+    async def test_turns_keep_state_hashes_in_sync(self):
+        rng = random.Random(11)
+        peers = (self.host, self.guest)
+        for turn in range(TURNS):
+            mover, receiver = peers[turn % 2], peers[1 - turn % 2]
+            mover.game.commit_turn(mover.player_index, rng.randint(1, 6))
+            await receiver.wait_for("turn")
+
+        self.assertEqual(self.host.game.engine_state, self.guest.game.engine_state)
+        self.assertEqual(self.host.game.state_hash, self.guest.game.state_hash)
+        for peer in peers:
+            self.assertFalse(peer.game.snapshot_requested)
+            self.assertGreater(peer.game.predictor.confirmed, 0)
+
+
+class RecordingChannel:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, message):
+        self.sent.append(message)
+        return True
+
+
+@unittest.skipUnless(GAME_AVAILABLE, "game dependencies not installed")
+class TurnHandlingTest(unittest.IsolatedAsyncioTestCase):
+    """Компактен протокол меѓу две headless игри, без мрежа"""
+
+    async def asyncSetUp(self):
+        self.host = headless_game(0, RecordingChannel())
+        self.guest = headless_game(1, RecordingChannel())
+
+    async def asyncTearDown(self):
+        for game in (self.host, self.guest):
+            game.animations.close()
+            game.cancel_ack_timer()
+
+    def test_invalid_turn_requests_snapshot(self):
+        for player, die in ((5, 3), (-1, 3), ("0", 3), (0, 0), (0, 7), (0, 2.0)):
+            self.guest.handle_p2p_message({"type": "turn", "seq": 1, "player": player, "die": die,
+                                           "hash": 0, "ack": 0})
+
+        self.assertEqual(self.guest.positions, [0, 0])
+        self.assertEqual(self.guest.turns.received_seq, 0)
+        self.assertEqual([message["type"] for message in self.guest.p2p_connection.sent], ["snapshot_request"])
+
+    def test_unacked_turns_are_resent_on_resume(self):
+        self.host.commit_turn(0, 3)
+        self.host.on_connection_restored()
+        first, resent = self.host.p2p_connection.sent
+        self.assertEqual(first["seq"], resent["seq"])
+
+        for message in (first, resent):
+            self.guest.handle_p2p_message(message)
+        self.assertEqual(self.guest.state_hash, self.host.state_hash)
+        self.assertTrue(self.guest.turns.ack_pending)
+
+        self.guest.flush_ack()
+        self.host.handle_p2p_message(self.guest.p2p_connection.sent[-1])
+        self.assertEqual(self.host.turns.pending_turns(), [])
+
+    def test_compact_turns_feed_the_predictor(self):
+        self.host.commit_turn(0, 3)
+        self.guest.handle_p2p_message(self.host.p2p_connection.sent[-1])
+
+        self.assertEqual(self.guest.predictor.confirmed, 1)
+        self.assertEqual(self.guest.predictor.pending, {})
+
+    def test_overshoot_is_left_out_of_prediction_stats(self):
+        for game in (self.host, self.guest):
+            game.positions = [97, 0]
+            game.reset_state_hash()
+        self.host.commit_turn(0, 5)
+        self.guest.handle_p2p_message(self.host.p2p_connection.sent[-1])
+
+        self.assertEqual(self.guest.positions, [97, 0])
+        self.assertEqual(self.guest.current_player, 1)
+        self.assertEqual(self.guest.predictor.stats()["unpredicted"], 0)
+        self.assertEqual(self.guest.predictor.confirmed, 0)
+
+    def test_unverified_prediction_is_reconciled_by_snapshot(self):
+        self.guest.positions = [10, 0]
+        self.guest.reset_state_hash()
+        self.host.commit_turn(0, 3)
+        self.guest.handle_p2p_message(self.host.p2p_connection.sent[-1])
+        self.assertTrue(self.guest.snapshot_requested)
+        self.assertIn(0, self.guest.predictor.pending)
+
+        self.host.handle_p2p_message(self.guest.p2p_connection.sent[-1])
+        self.guest.handle_p2p_message(self.host.p2p_connection.sent[-1])
+        self.assertEqual(self.guest.positions, self.host.positions)
+        self.assertEqual(self.guest.predictor.corrected, 1)
+        self.assertEqual(self.guest.predictor.pending, {})
+
+    def test_snapshot_catch_up_replaces_running_animation(self):
+        self.guest.positions = [10, 0]
+        self.guest.reset_state_hash()
+        self.guest.hop_token(0, 0, 10)
+        self.host.commit_turn(0, 3)
+        self.guest.handle_p2p_message(self.host.p2p_connection.sent[-1])
+        self.host.handle_p2p_message(self.guest.p2p_connection.sent[-1])
+        self.assertTrue(self.guest.animations.is_running("token0"))
+
+        self.guest.handle_p2p_message(self.host.p2p_connection.sent[-1])
+        self.assertFalse(self.guest.animations.is_running("token0"))
+        self.assertEqual(self.guest.token_xy(0), self.guest.token_anchor(0, self.host.positions[0]))
+
+    def test_game_sync_keeps_fields_for_older_peers(self):
+        self.host.positions[0] = 14
+        self.host.switch_turn()
+        sync = self.host.p2p_connection.sent[-1]
+        self.assertEqual(sync["state"]["positions"], [14, 0])
+        self.assertEqual(sync["state"]["current_player"], 1)
+
+        self.guest.handle_p2p_message(sync)
+        self.assertEqual(self.guest.positions, [14, 0])
+        self.assertEqual(self.guest.state_hash, sync["state"]["hash"])
+        self.assertFalse(self.guest.snapshot_requested)
+
+
+class MovePredictorTest(unittest.TestCase):
+
+    def test_snake_and_ladder_destinations(self):
+        predictor = MovePredictor(DEFAULT_ENGINE)
+        prediction = predictor.predict(0, 0, 1)
+        self.assertEqual((prediction.landing, prediction.final), (1, 38))
+        prediction = predictor.predict(1, 92, 6)
+        self.assertEqual((prediction.landing, prediction.final), (98, 78))
+
+    def test_overshoot_is_not_pending(self):
+        predictor = MovePredictor(DEFAULT_ENGINE)
+        predictor.predict(0, 90, 2)
+        self.assertTrue(predictor.predict(0, 97, 5).overshoot)
+        self.assertNotIn(0, predictor.pending)
+        self.assertEqual(predictor.reconcile(0, 97), (None, False))
+        self.assertEqual(predictor.unpredicted, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Тестови за хаширање на лозинки: формат, проверка, надградба на стари записи
+и /login на auth серверот (надградба при најава, исто време за непостоечки корисник)
+"""
+
+import hashlib
+import os
+import tempfile
+import unittest
+
+from password_hashing import (Pbkdf2Hasher, ScryptHasher, hash_password, is_legacy_hash, needs_rehash,
+                              verify_and_rehash, verify_password)
+from session_tokens import SECRET_ENV
+
+try:
+    from fastapi.testclient import TestClient
+    import auth_server
+
+    FASTAPI_AVAILABLE = True
+except ImportError:
+    FASTAPI_AVAILABLE = False
+
+# Евтини поставки - тестовите го проверуваат однесувањето, не цената
+FAST_SCRYPT = ScryptHasher(n=2 ** 10)
+FAST_PBKDF2 = Pbkdf2Hasher(i=1000)
+PASSWORD = "correct horse"
+
+
+def legacy_hash(password):
+    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+
+
+class PasswordHashingTest(unittest.TestCase):
+
+    def test_format_and_salt(self):
+        encoded = hash_password(PASSWORD, FAST_SCRYPT)
+        algorithm, params, salt, _ = encoded.split("$")
+        self.assertEqual((algorithm, params), ("scrypt", "n=1024,r=8,p=1"))
+        self.assertNotEqual(hash_password(PASSWORD, FAST_SCRYPT), encoded)
+
+    def test_verify(self):
+        for hasher in (FAST_SCRYPT, FAST_PBKDF2):
+            encoded = hash_password(PASSWORD, hasher)
+            self.assertTrue(verify_password(PASSWORD, encoded))
+            self.assertFalse(verify_password("wrong", encoded))
+
+    def test_malformed_hashes_do_not_verify(self):
+        for encoded in ("", "scrypt$n=1024", "bcrypt$x$y$z", "scrypt$n=x$c2FsdA$aGFzaA", "a" * 64):
+            self.assertFalse(verify_password(PASSWORD, encoded))
+
+    def test_legacy_hash(self):
+        encoded = legacy_hash(PASSWORD)
+        self.assertTrue(is_legacy_hash(encoded))
+        self.assertTrue(verify_password(PASSWORD, encoded))
+        self.assertFalse(verify_password("wrong", encoded))
+
+    def test_needs_rehash(self):
+        self.assertTrue(needs_rehash(legacy_hash(PASSWORD), FAST_SCRYPT))
+        self.assertTrue(needs_rehash(hash_password(PASSWORD, FAST_PBKDF2), FAST_SCRYPT))
+        self.assertTrue(needs_rehash(hash_password(PASSWORD, ScryptHasher(n=2 ** 11)), FAST_SCRYPT))
+        self.assertFalse(needs_rehash(hash_password(PASSWORD, FAST_SCRYPT), FAST_SCRYPT))
+
+    def test_verify_and_rehash_upgrades_legacy_hash(self):
+        valid, rehashed = verify_and_rehash(PASSWORD, legacy_hash(PASSWORD), FAST_SCRYPT)
+        self.assertTrue(valid)
+        self.assertFalse(needs_rehash(rehashed, FAST_SCRYPT))
+        self.assertTrue(verify_password(PASSWORD, rehashed))
+
+    def test_verify_and_rehash_current_hash(self):
+        self.assertEqual(verify_and_rehash(PASSWORD, hash_password(PASSWORD, FAST_SCRYPT), FAST_SCRYPT),
+                         (True, None))
+
+    def test_verify_and_rehash_wrong_password(self):
+        self.assertEqual(verify_and_rehash("wrong", legacy_hash(PASSWORD), FAST_SCRYPT), (False, None))
+
+
+@unittest.skipUnless(FASTAPI_AVAILABLE, "fastapi not installed")
+class AuthLoginTest(unittest.TestCase):
+
+    def setUp(self):
+        self.previous_dir = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        os.environ.setdefault(SECRET_ENV, "test-secret")
+        self.previous_hasher = auth_server.PASSWORD_HASHER
+        auth_server.PASSWORD_HASHER = FAST_SCRYPT
+        self.client = TestClient(auth_server.app)
+        self.client.__enter__()
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+        auth_server.PASSWORD_HASHER = self.previous_hasher
+        os.chdir(self.previous_dir)
+        self.directory.cleanup()
+
+    def login(self, username, password=PASSWORD):
+        return self.client.post("/login", json={"username": username, "password": password})
+
+    def test_legacy_hash_is_upgraded_on_login(self):
+        auth_server.users.create("ana", {"password_hash": legacy_hash(PASSWORD)})
+        self.assertEqual(self.login("ana").status_code, 200)
+        self.assertFalse(needs_rehash(auth_server.users.get("ana")[1]["password_hash"], FAST_SCRYPT))
+        self.assertEqual(self.login("ana").status_code, 200)
+
+    def test_unknown_user_runs_the_kdf(self):
+        self.client.post("/register", json={"username": "ana", "password": PASSWORD})
+        before = auth_server.hashing.completed
+        self.assertEqual(self.login("ana", "wrong").status_code, 401)
+        self.assertEqual(self.login("nobody").status_code, 401)
+        self.assertEqual(auth_server.hashing.completed - before, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Тестови за потпишаните session tokens и LRU кешот за проверка
+"""
+
+import os
+import tempfile
+import unittest
+
+from session_tokens import SECRET_ENV, TokenVerifier, _b64encode, _sign, issue_token, load_secret
+
+SECRET = b"test-secret"
+NOW = 1_700_000_000
+
+
+class SessionTokenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.verifier = TokenVerifier(SECRET)
+
+    def test_valid_token(self):
+        token = issue_token("Ана", SECRET, ttl=60, now=NOW)
+        self.assertEqual(self.verifier.verify(token, now=NOW + 59), "Ана")
+
+    def test_expired_token(self):
+        token = issue_token("ana", SECRET, ttl=60, now=NOW)
+        self.assertIsNone(self.verifier.verify(token, now=NOW + 60))
+        self.assertEqual(self.verifier.rejected, 1)
+
+    def test_expiry_applies_to_cached_token(self):
+        token = issue_token("ana", SECRET, ttl=60, now=NOW)
+        self.assertEqual(self.verifier.verify(token, now=NOW), "ana")
+        self.assertIsNone(self.verifier.verify(token, now=NOW + 61))
+        self.assertEqual(self.verifier.stats()["cached"], 0)
+
+    def test_tampered_token(self):
+        token = issue_token("ana", SECRET, ttl=60, now=NOW)
+        payload, signature = token.split(".")
+        other_payload = issue_token("admin", SECRET, ttl=60, now=NOW).split(".")[0]
+
+        self.assertIsNone(self.verifier.verify(f"{other_payload}.{signature}", now=NOW))
+        self.assertIsNone(self.verifier.verify(f"{payload}.{signature[:-1]}A", now=NOW))
+        self.assertIsNone(TokenVerifier(b"other-secret").verify(token, now=NOW))
+
+    def test_malformed_tokens(self):
+        payload = issue_token("ana", SECRET, ttl=60, now=NOW).split(".")[0]
+        for token in ("", ".", "abc", "abc.", ".abc", f"{payload}.ж", "ж.abc", f"{payload}.{'A' * 43}",
+                      "e30.x", None, 42, b"abc.def"):
+            self.assertIsNone(self.verifier.verify(token, now=NOW), token)
+
+    def test_signed_payload_must_have_claims(self):
+        # Валиден потпис, но содржината не е {"sub": str, "exp": int}
+        for body in (b"[]", b'{"sub": 1, "exp": 2000000000}', b'{"sub": "ana"}', b"not json"):
+            payload = _b64encode(body)
+            self.assertIsNone(self.verifier.verify(f"{payload}.{_sign(SECRET, payload)}", now=NOW))
+
+    def test_cache_hits_and_lru_eviction(self):
+        verifier = TokenVerifier(SECRET, cache_size=2)
+        first, second, third = (issue_token(name, SECRET, ttl=60, now=NOW) for name in ("a", "b", "c"))
+
+        verifier.verify(first, now=NOW)
+        verifier.verify(second, now=NOW)
+        verifier.verify(first, now=NOW)  # first е сега најново користен
+        verifier.verify(third, now=NOW)  # second излегува од кешот
+        self.assertEqual(verifier.stats(), {"cached": 2, "hits": 1, "misses": 3, "rejected": 0})
+
+        verifier.verify(second, now=NOW)
+        self.assertEqual(verifier.misses, 4)
+        verifier.verify(third, now=NOW)
+        self.assertEqual(verifier.hits, 2)
+
+    def test_invalid_tokens_are_not_cached(self):
+        for index in range(10):
+            self.verifier.verify(f"forged{index}.signature", now=NOW)
+        self.assertEqual(self.verifier.stats()["cached"], 0)
+
+
+class LoadSecretTest(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = os.environ.pop(SECRET_ENV, None)
+
+    def tearDown(self):
+        if self.saved is not None:
+            os.environ[SECRET_ENV] = self.saved
+
+    def test_secret_file_is_created_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, ".session_secret")
+            secret = load_secret(path)
+            self.assertEqual(load_secret(path), secret)
+            self.assertEqual(os.listdir(directory), [".session_secret"])
+            if os.name == "posix":
+                self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+
+    def test_environment_overrides_file(self):
+        os.environ[SECRET_ENV] = "from-env"
+        try:
+            self.assertEqual(load_secret("/nonexistent/.session_secret"), b"from-env")
+        finally:
+            del os.environ[SECRET_ENV]
+
+
+if __name__ == "__main__":
+    unittest.main()
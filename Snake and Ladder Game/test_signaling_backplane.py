@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Тестови за backplane-от: грешки во серија не ја прекинуваат претплатата,
+претплатата се обновува по пад на broker-от, бавен претплатник се исклучува,
+сесија со играчи на два јазли преживува прекин и resume
+"""
+
+import asyncio
+import json
+import logging
+import unittest
+
+try:
+    import websockets
+    import signaling_backplane
+    from signaling_backplane import (InMemoryBackplane, InMemoryHub, PubSubBroker, TcpBackplane, node_channel,
+                                     write_frame)
+    from webrtc_signaling_server import EnhancedSignalingServer, logger as server_logger
+
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+HOST = "127.0.0.1"
+
+
+class Collector:
+    """Handler што ги собира сериите; failing серии фрлаат исклучок"""
+
+    def __init__(self):
+        self.messages = []
+        self.received = asyncio.Event()
+
+    async def __call__(self, messages):
+        if messages == ["fail"]:
+            raise RuntimeError("handler failed")
+        self.messages.extend(messages)
+        self.received.set()
+
+    async def wait(self, count):
+        while len(self.messages) < count:
+            self.received.clear()
+            await asyncio.wait_for(self.received.wait(), timeout=5)
+
+
+@unittest.skipUnless(WEBSOCKETS_AVAILABLE, "websockets not installed")
+class BackplaneTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        logging.getLogger("signaling_backplane").disabled = True
+        logging.getLogger("asyncio").setLevel(logging.WARNING)
+        self.previous_delay = signaling_backplane.RECONNECT_INITIAL_DELAY
+        signaling_backplane.RECONNECT_INITIAL_DELAY = 0.01
+        self.closers = []
+
+    async def asyncTearDown(self):
+        for close in reversed(self.closers):
+            await close()
+        signaling_backplane.RECONNECT_INITIAL_DELAY = self.previous_delay
+
+    async def start_broker(self, broker=None, port=0):
+        broker = broker or PubSubBroker()
+        server = await broker.serve(HOST, port)
+
+        async def close():
+            # Конекциите на broker-от завршуваат сами кога јазлите ќе се затворат
+            await asyncio.sleep(0.05)
+            server.close()
+            await server.wait_closed()
+        self.closers.append(close)
+        return broker, server, server.sockets[0].getsockname()[1]
+
+    async def start_node(self, backplane, node_id="a"):
+        handler = Collector()
+        await backplane.start(node_channel(node_id), handler)
+        self.closers.append(backplane.close)
+        return handler
+
+    async def test_handler_error_does_not_stop_subscription(self):
+        hub = InMemoryHub()
+        backplane = InMemoryBackplane(hub)
+        handler = await self.start_node(backplane)
+
+        hub.queues[node_channel("a")].put_nowait(["fail"])
+        backplane.publish(node_channel("a"), "after")
+        await handler.wait(1)
+        self.assertEqual(handler.messages, ["after"])
+        self.assertEqual(backplane.errors, 1)
+
+    async def test_malformed_frame_does_not_stop_subscription(self):
+        _, _, port = await self.start_broker()
+        subscriber = TcpBackplane(HOST, port)
+        handler = await self.start_node(subscriber)
+        publisher = TcpBackplane(HOST, port)
+        await self.start_node(publisher, "b")
+
+        # Валидна рамка за broker-от, но без "messages" - кај претплатникот е грешка
+        write_frame(publisher._writer, '{"op": "pub", "channel": "node:a"}')
+        publisher.publish(node_channel("a"), "after")
+        await handler.wait(1)
+        self.assertEqual(handler.messages, ["after"])
+        self.assertEqual(subscriber.errors, 1)
+
+    async def test_resubscribes_after_broker_restart(self):
+        broker, server, port = await self.start_broker()
+        subscriber = TcpBackplane(HOST, port)
+        handler = await self.start_node(subscriber)
+        while not broker.subscribers.get(node_channel("a")):
+            await asyncio.sleep(0.01)
+
+        # Broker-от паѓа: listening socket-от и постоечките конекции
+        server.close()
+        for writers in broker.subscribers.values():
+            for writer in writers:
+                writer.transport.abort()
+        await server.wait_closed()
+        await self.start_broker(port=port)
+
+        publisher = TcpBackplane(HOST, port)
+        await self.start_node(publisher, "b")
+        for _ in range(100):
+            publisher.publish(node_channel("a"), "hello")
+            await asyncio.sleep(0.02)
+            if handler.messages:
+                break
+        self.assertIn("hello", handler.messages)
+
+    async def test_broker_disconnects_slow_subscriber(self):
+        broker, _, port = await self.start_broker(PubSubBroker(high_water=64 * 1024))
+        # Претплатник што никогаш не чита
+        _, writer = await asyncio.open_connection(HOST, port)
+        write_frame(writer, '{"op": "sub", "channel": "node:slow"}')
+        await writer.drain()
+
+        async def close():
+            writer.close()
+        self.closers.append(close)
+
+        publisher = TcpBackplane(HOST, port)
+        await self.start_node(publisher, "b")
+        payload = "x" * 16 * 1024
+        for _ in range(2000):
+            publisher.publish(node_channel("slow"), payload)
+            await asyncio.sleep(0)
+            if broker.disconnected_slow:
+                break
+        self.assertEqual(broker.disconnected_slow, 1)
+        self.assertEqual(broker.subscribers[node_channel("slow")], set())
+
+    async def test_publish_is_bounded_when_not_flushing(self):
+        backplane = InMemoryBackplane()
+        backplane.max_pending = 10
+        for index in range(15):
+            backplane.publish(node_channel("a"), index)
+        self.assertEqual(backplane.dropped, 5)
+        self.assertEqual(backplane.published, 10)
+
+
+async def expect(websocket, message_type):
+    while True:
+        data = json.loads(await asyncio.wait_for(websocket.recv(), timeout=5))
+        if data.get("type") == message_type:
+            return data
+
+
+@unittest.skipUnless(WEBSOCKETS_AVAILABLE, "websockets not installed")
+class ClusterSessionTest(unittest.IsolatedAsyncioTestCase):
+    """Два јазли со заеднички InMemoryHub: host на јазолот на сесијата, guest на другиот"""
+
+    async def asyncSetUp(self):
+        server_logger.disabled = True
+        logging.getLogger("websockets").setLevel(logging.WARNING)
+        logging.getLogger("asyncio").setLevel(logging.WARNING)
+        hub = InMemoryHub()
+        nodes = ["node-a", "node-b"]
+        self.nodes = []
+        for node_id in nodes:
+            server = EnhancedSignalingServer(backplane=InMemoryBackplane(hub), node_id=node_id, nodes=nodes)
+            await server.start_backplane()
+            listener = await websockets.serve(server.handle_client, HOST, 0)
+            self.nodes.append((server, listener, f"ws://{HOST}:{listener.sockets[0].getsockname()[1]}"))
+        self.websockets = []
+
+    async def asyncTearDown(self):
+        for websocket in self.websockets:
+            await websocket.close()
+        for server, listener, _ in self.nodes:
+            listener.close()
+            await listener.wait_closed()
+            await server.backplane.close()
+
+    async def connect(self, node):
+        websocket = await websockets.connect(self.nodes[node][2])
+        self.websockets.append(websocket)
+        return websocket
+
+    async def send_turn(self, websocket, session_id, seq):
+        await websocket.send(json.dumps({"type": "game_message", "session_id": session_id, "seq": seq,
+                                         "data": {"type": "turn", "seq": seq}}))
+
+    async def test_create_join_relay_and_resume_across_nodes(self):
+        node_a, node_b = self.nodes[0][0], self.nodes[1][0]
+        host = await self.connect(0)
+        await host.send(json.dumps({"type": "create_session", "player_name": "Host"}))
+        created = await expect(host, "session_created")
+        session_id = created["session_id"]
+        self.assertIn(session_id, node_a.sessions)
+
+        guest = await self.connect(1)
+        await guest.send(json.dumps({"type": "join_session", "invite_code": created["invite_code"],
+                                     "player_name": "Guest"}))
+        joined = await expect(guest, "session_joined")
+        self.assertEqual(joined["session_id"], session_id)
+        self.assertEqual(node_b.sessions, {})
+        await expect(host, "guest_joined")
+
+        for websocket in (host, guest):
+            await websocket.send(json.dumps({"type": "client_ready", "session_id": session_id}))
+        for websocket in (host, guest):
+            await expect(websocket, "connection_established")
+
+        # Relay во двете насоки преку backplane-от
+        await self.send_turn(host, session_id, 1)
+        relayed = await expect(guest, "game_message")
+        self.assertEqual((relayed["seq"], relayed["data"]["seq"]), (1, 1))
+        await self.send_turn(guest, session_id, 1)
+        self.assertEqual((await expect(host, "game_message"))["data"]["seq"], 1)
+
+        # Guest-от паѓа; јазолот на сесијата чува порака за него
+        await guest.close()
+        await expect(host, "peer_connection_lost")
+        await self.send_turn(host, session_id, 2)
+
+        guest = await self.connect(1)
+        await guest.send(json.dumps({"type": "resume_session", "session_id": session_id,
+                                     "resume_token": joined["resume_token"], "last_seq": relayed["seq"]}))
+        resumed = await expect(guest, "session_resumed")
+        self.assertTrue(resumed["replay_complete"])
+        self.assertEqual((resumed["last_seq"], resumed["replayed"]), (1, 1))
+        self.assertEqual((await expect(guest, "game_message"))["data"]["seq"], 2)
+        await expect(host, "peer_reconnected")
+
+        await self.send_turn(guest, session_id, 2)
+        self.assertEqual((await expect(host, "game_message"))["data"]["seq"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
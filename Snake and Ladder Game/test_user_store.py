@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Тестови за CachedUserStore: граница на LRU кешот и редослед на запишувањата
+"""
+
+import os
+import tempfile
+import unittest
+
+from user_store import CachedUserStore, SQLiteUserStore, new_user_record
+
+# Flusher-от не се буди сам за време на тестовите
+NO_AUTO_FLUSH = 3600
+
+
+class CachedUserStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.sqlite = SQLiteUserStore(os.path.join(self.directory.name, "users.db"))
+        self.store = CachedUserStore(self.sqlite, flush_interval=NO_AUTO_FLUSH, max_users=3)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def create(self, *names):
+        for name in names:
+            self.store.create(name, new_user_record("hash", "2026-01-01"))
+
+    def test_cache_is_bounded_lru(self):
+        self.create("a", "b", "c")
+        self.store.get("a")
+        self.create("d")
+        self.assertEqual(list(self.store._users), ["c", "a", "d"])
+        self.assertEqual(self.store.get("b")[0], "b")
+        self.assertEqual(self.store.stats()["cached_users"], 3)
+
+    def test_dirty_users_are_not_evicted(self):
+        self.create("a", "b", "c")
+        self.store.update("a", wins=5)
+        self.create("d", "e")
+        self.assertIn("a", self.store._users)
+        self.assertEqual(len(self.store._users), 3)
+
+        self.store.flush()
+        self.create("f")
+        self.assertNotIn("a", self.store._users)
+        self.assertEqual(self.store.get("a")[1]["wins"], 5)
+
+    def test_synchronous_update_drops_older_pending_values(self):
+        self.create("ana")
+        self.store.update("ana", last_login="old", wins=1)
+        self.store.update("ana", password_hash="new-hash", last_login="new")
+        self.store.flush()
+
+        record = self.sqlite.get("ana")[1]
+        self.assertEqual((record["password_hash"], record["last_login"], record["wins"]), ("new-hash", "new", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Тестови за сигурната лента на WebRTCClient: двајца клиенти преку вистинскиот
+signaling сервер, DataChannel-от е лажна врска што може да изгуби рамка и да падне
+"""
+
+import asyncio
+import contextlib
+import io
+import logging
+import threading
+import time
+import unittest
+
+try:
+    import websockets
+    import webrtc_client
+    from p2p_datachannel import RELIABLE
+    from webrtc_client import WebRTCClient
+    from webrtc_signaling_server import EnhancedSignalingServer, logger as server_logger
+
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+HOST = "127.0.0.1"
+# Подолго од стариот REORDER_TIMEOUT (2 s) по кој празнината се прескокнуваше
+RELAY_OUTAGE = 2.5
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise TimeoutError("Condition not reached")
+        time.sleep(0.01)
+
+
+class LocalServer:
+    """Signaling сервер во посебен thread, на слободна порта"""
+
+    def __init__(self):
+        self.url = None
+        self._loop = None
+        self._stop = None
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._serve()), daemon=True)
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        server = EnhancedSignalingServer()
+        async with websockets.serve(server.handle_client, HOST, 0) as listener:
+            self.url = f"ws://{HOST}:{listener.sockets[0].getsockname()[1]}"
+            await self._stop.wait()
+
+    def start(self):
+        self._thread.start()
+        wait_for(lambda: self.url is not None)
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(timeout=5)
+
+
+class LossyLink:
+    """Лажен DataChannel: рамките стигнуваат до примачот, освен изгубените seq"""
+
+    def __init__(self, receiver, lose):
+        self.receiver = receiver
+        self.lose = set(lose)
+        self.is_open = True
+        self.sent = 0
+
+    def send(self, payload, lane=RELIABLE):
+        self.sent += 1
+        if self.sent not in self.lose:
+            self.receiver.loop.call_soon_threadsafe(self.receiver._on_direct_message, payload, lane)
+
+    def lane_open(self, lane):
+        return False
+
+    async def close(self):
+        self.is_open = False
+
+
+@unittest.skipUnless(WEBSOCKETS_AVAILABLE, "websockets not installed")
+class ReliableLaneTest(unittest.TestCase):
+
+    def setUp(self):
+        server_logger.disabled = True
+        logging.getLogger("websockets").setLevel(logging.CRITICAL)
+        self.previous_delay = webrtc_client.RECONNECT_MAX_DELAY
+        webrtc_client.RECONNECT_MAX_DELAY = webrtc_client.RECONNECT_INITIAL_DELAY
+        # Клиентите печатат секоја порака
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+
+        self.server = LocalServer()
+        self.server.start()
+        self.host = WebRTCClient(self.server.url, use_datachannel=False)
+        self.guest = WebRTCClient(self.server.url, use_datachannel=False)
+        self.received = []
+        self.guest.on_message_received = lambda data: self.received.append(data["n"])
+
+        self.host.create_session("Host")
+        wait_for(lambda: self.host.invite_code is not None)
+        self.guest.join_session(self.host.invite_code, "Guest")
+        wait_for(lambda: self.host.connection_state == "connected" and self.guest.connection_state == "connected")
+
+    def tearDown(self):
+        self.host.close()
+        self.guest.close()
+        self.server.stop()
+        self.quiet.__exit__(None, None, None)
+        webrtc_client.RECONNECT_MAX_DELAY = self.previous_delay
+
+    def in_host_loop(self, callback):
+        done = threading.Event()
+
+        def run():
+            callback()
+            done.set()
+        self.host.loop.call_soon_threadsafe(run)
+        done.wait(timeout=5)
+
+    def test_gap_is_held_until_relay_resume_when_datachannel_dies(self):
+        link = LossyLink(self.guest, lose={2})
+
+        def open_link():
+            self.host.link = link
+            self.host._on_direct_open()
+        self.in_host_loop(open_link)
+
+        for n in (1, 2, 3):
+            self.host.send_message({"type": "turn", "n": n})
+        wait_for(lambda: link.sent == 3 and 3 in self.guest._reorder)
+        self.assertEqual(self.received, [1])
+
+        # Каналот паѓа со изгубената рамка 2, а relay-от на испраќачот е во resume
+        self.host.signaling_url, url = f"ws://{HOST}:1", self.host.signaling_url
+
+        self.in_host_loop(lambda: asyncio.ensure_future(self.host.websocket.close()))
+        wait_for(lambda: self.host.connection_state == "reconnecting")
+
+        def close_link():
+            link.is_open = False
+            self.host._on_direct_closed()
+        self.in_host_loop(close_link)
+
+        time.sleep(RELAY_OUTAGE)
+        self.assertEqual(self.received, [1])
+        self.assertEqual(self.guest.peer_seq, 1)
+
+        self.host.signaling_url = url
+        wait_for(lambda: len(self.received) == 3)
+        self.assertEqual(self.received, [1, 2, 3])
+        self.assertEqual(self.guest._reorder, {})
+
+    def test_incomplete_replay_skips_the_lost_messages(self):
+        self.guest._deliver(1, {"n": 1})
+        self.guest._deliver(3, {"n": 3})
+        self.assertEqual(self.received, [1])
+
+        self.guest._replay_gap = True
+        self.guest._end_replay()
+        self.assertEqual(self.received, [1, 3])
+        self.assertEqual(self.guest.peer_seq, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Bridge од мрежниот thread кон Tk main thread (push наместо polling)
+"""
+
+import os
+import collections
+import tkinter as tk
+
+WAKEUP_EVENT = "<<TkDispatcherWakeup>>"
+
+
+class TkDispatcher:
+    """
+    Thread-safe повикување на функции во Tk thread-от.
+    На POSIX се буди преку self-pipe и createfilehandler, инаку преку event_generate.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._calls = collections.deque()
+        self._read_fd = None
+        self._write_fd = None
+        self.closed = False
+
+        if os.name == "posix" and hasattr(root.tk, "createfilehandler"):
+            self._read_fd, self._write_fd = os.pipe()
+            os.set_blocking(self._read_fd, False)
+            os.set_blocking(self._write_fd, False)
+            root.tk.createfilehandler(self._read_fd, tk.READABLE, self._on_readable)
+        else:
+            root.bind(WAKEUP_EVENT, lambda e: self._drain(), add="+")
+
+    def call_soon(self, callback, *args):
+        """Закажи повик во Tk thread-от (може од било кој thread)"""
+        if self.closed:
+            return False
+
+        self._calls.append((callback, args))
+        try:
+            if self._write_fd is not None:
+                os.write(self._write_fd, b"\0")
+            else:
+                self.root.event_generate(WAKEUP_EVENT, when="tail")
+        except BlockingIOError:
+            # Pipe-от е полн - веќе има чекачко будење
+            pass
+        except (OSError, tk.TclError, RuntimeError):
+            return False
+        return True
+
+    def _on_readable(self, fd, mask):
+        try:
+            os.read(fd, 4096)
+        except BlockingIOError:
+            pass
+        self._drain()
+
+    def _drain(self):
+        while self._calls:
+            callback, args = self._calls.popleft()
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error in dispatched callback: {e}")
+
+    def close(self):
+        """Ослободи го pipe-от и file handler-от"""
+        if self.closed:
+            return
+        self.closed = True
+
+        if self._read_fd is not None:
+            try:
+                self.root.tk.deletefilehandler(self._read_fd)
+            except tk.TclError:
+                pass
+            os.close(self._read_fd)
+            os.close(self._write_fd)
+            self._read_fd = self._write_fd = None
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Компактен протокол за потези
+Еден "turn" по потег: реден број, играч, коцка и хаш на состојбата по потегот,
+со кумулативна потврда (ack) за пораките од другата страна закачена на секоја порака.
+Непотврдените потези се праќаат повторно по resume; целосна состојба (snapshot)
+се праќа само кога хашовите не се совпаѓаат.
+"""
+
+from collections import OrderedDict
+
+TURN = "turn"
+ACK = "ack"
+SNAPSHOT_REQUEST = "snapshot_request"
+SNAPSHOT = "snapshot"
+# Ако не испратиме ништо во овој рок по примен потег, се праќа самостоен ack
+ACK_DELAY_MS = 5000
+
+ACCEPTED = "new"
+DUPLICATE = "duplicate"
+GAP = "gap"
+
+
+class TurnChannel:
+    """
+    Редни броеви и потврди за потезите со еден peer.
+    received_seq е највисокиот реден број примен по ред; тоа е кумулативниот ack.
+    """
+
+    def __init__(self):
+        self.next_seq = 1
+        self.received_seq = 0
+        self.unacked = OrderedDict()
+        self.ack_pending = False
+
+    def make_turn(self, player, die, state_hash):
+        message = {
+            "type": TURN,
+            "seq": self.next_seq,
+            "player": player,
+            "die": die,
+            "hash": state_hash,
+            "ack": self.received_seq
+        }
+        self.unacked[self.next_seq] = message
+        self.next_seq += 1
+        self.ack_pending = False
+        return message
+
+    def make_ack(self):
+        self.ack_pending = False
+        return {"type": ACK, "ack": self.received_seq}
+
+    def on_ack(self, ack):
+        """Отстрани ги сите потврдени потези (ack е кумулативен)"""
+        while self.unacked:
+            seq = next(iter(self.unacked))
+            if seq > ack:
+                break
+            del self.unacked[seq]
+
+    def pending_turns(self):
+        """Непотврдените потези со освежен ack, за повторно праќање"""
+        for message in self.unacked.values():
+            message["ack"] = self.received_seq
+        return list(self.unacked.values())
+
+    def accept(self, message):
+        """Прими turn од peer-от; врати ACCEPTED, DUPLICATE или GAP"""
+        self.on_ack(int(message.get("ack", 0)))
+        seq = int(message["seq"])
+        if seq <= self.received_seq:
+            # Повторно пратен потег - испраќачот не го видел нашиот ack
+            self.ack_pending = True
+            return DUPLICATE
+
+        status = ACCEPTED if seq == self.received_seq + 1 else GAP
+        self.received_seq = seq
+        self.ack_pending = True
+        return status
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Складиште на корисници за auth серверот
+SQLiteUserStore чува еден ред по корисник со индекс на username_key (името со
+мали букви), па пребарувањето е O(log n) и секое барање пишува само свој ред.
+JsonUserStore е стариот формат (цела датотека); служи за миграција и споредба.
+CachedUserStore ги чува корисниците во меморија и ги запишува ажурирањата на
+статистиките и last_login во серии (write-behind).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple
+
+USER_FIELDS = ("password_hash", "created_at", "last_login", "games_played", "wins", "losses")
+STAT_FIELDS = ("games_played", "wins", "losses")
+# Полиња чие губење при пад е прифатливо - се запишуваат со задоцнување
+WRITE_BEHIND_FIELDS = ("last_login",) + STAT_FIELDS
+
+FLUSH_INTERVAL = 1.0
+MAX_PENDING = 1000
+MAX_CACHED_USERS = 10_000
+
+
+def username_key(username) -> str:
+    """Клуч за споредба без разлика на големи/мали букви (важи и за кирилица)"""
+    return str(username).lower()
+
+
+def _row_values(username, record):
+    """Вредности за INSERT: името, клучот и полињата (статистиките без None)"""
+    values = [record.get(field) for field in USER_FIELDS]
+    for index, field in enumerate(USER_FIELDS):
+        if field in STAT_FIELDS:
+            values[index] = values[index] or 0
+    return (username, username_key(username), *values)
+
+
+_INSERT = ("INSERT{} INTO users (username, username_key, password_hash, created_at, last_login,"
+           " games_played, wins, losses) VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+def new_user_record(password_hash, created_at):
+    return {
+        "password_hash": password_hash,
+        "created_at": created_at,
+        "last_login": None,
+        "games_played": 0,
+        "wins": 0,
+        "losses": 0
+    }
+
+
+class JsonUserStore:
+    """Сите корисници во една JSON датотека; секое читање/пишување е O(вкупно корисници)"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self) -> Dict[str, dict]:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Error loading users: {e}")
+        return {}
+
+    def save(self, users) -> bool:
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(users, f, indent=2, ensure_ascii=False)
+            return True
+        except Exception as e:
+            print(f"Error saving users: {e}")
+            return False
+
+    @staticmethod
+    def _find(users, username) -> Optional[Tuple[str, dict]]:
+        key = username_key(username)
+        for name, record in users.items():
+            if username_key(name) == key:
+                return name, record
+        return None
+
+    def get(self, username) -> Optional[Tuple[str, dict]]:
+        return self._find(self.load(), username)
+
+    def create(self, username, record) -> bool:
+        users = self.load()
+        if any(username_key(name) == username_key(username) for name in users):
+            return False
+        users[username] = record
+        return self.save(users)
+
+    def update(self, username, **fields) -> bool:
+        users = self.load()
+        found = self._find(users, username)
+        if found is None:
+            return False
+        found[1].update(fields)
+        return self.save(users)
+
+    def update_many(self, updates: Dict[str, dict]) -> int:
+        users = self.load()
+        updated = 0
+        for username, fields in updates.items():
+            found = self._find(users, username)
+            if found is not None:
+                found[1].update(fields)
+                updated += 1
+        return updated if self.save(users) else 0
+
+    def count(self) -> int:
+        return len(self.load())
+
+    def iter_users(self) -> Iterator[Tuple[str, dict]]:
+        return iter(self.load().items())
+
+    def close(self):
+        pass
+
+
+class SQLiteUserStore:
+    """
+    SQLite во WAL режим: читачите не ги блокираат пишувањата.
+    Секој thread има своја конекција; уникатноста на името ја гарантира
+    индексот, па два паралелни /register за исто име не можат да поминат.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        with self._connection() as db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    username_key TEXT NOT NULL,
+                    password_hash TEXT NOT NULL,
+                    created_at TEXT,
+                    last_login TEXT,
+                    games_played INTEGER NOT NULL DEFAULT 0,
+                    wins INTEGER NOT NULL DEFAULT 0,
+                    losses INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS users_username_key ON users (username_key);
+            """)
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            # Во WAL режим NORMAL не губи конзистентност, само последните commit-и при пад на OS
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            with self._lock:
+                self._connections.append(db)
+        return db
+
+    @staticmethod
+    def _record(row) -> dict:
+        return {field: row[field] for field in USER_FIELDS}
+
+    def get(self, username) -> Optional[Tuple[str, dict]]:
+        row = self._connection().execute(
+            "SELECT * FROM users WHERE username_key = ?", (username_key(username),)).fetchone()
+        if row is None:
+            return None
+        return row["username"], self._record(row)
+
+    def create(self, username, record) -> bool:
+        try:
+            with self._connection() as db:
+                db.execute(_INSERT.format(""), _row_values(username, record))
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def update(self, username, **fields) -> bool:
+        columns = [field for field in fields if field in USER_FIELDS]
+        if not columns:
+            return False
+        with self._connection() as db:
+            cursor = db.execute(
+                f"UPDATE users SET {', '.join(f'{column} = ?' for column in columns)} WHERE username_key = ?",
+                tuple(fields[column] for column in columns) + (username_key(username),))
+        return cursor.rowcount > 0
+
+    def update_many(self, updates: Dict[str, dict]) -> int:
+        """Повеќе ажурирања во една трансакција (еден fsync); врати број ажурирани корисници"""
+        by_columns = {}
+        for username, fields in updates.items():
+            columns = tuple(field for field in fields if field in USER_FIELDS)
+            if columns:
+                by_columns.setdefault(columns, []).append(
+                    tuple(fields[column] for column in columns) + (username_key(username),))
+
+        updated = 0
+        with self._connection() as db:
+            for columns, rows in by_columns.items():
+                cursor = db.executemany(
+                    f"UPDATE users SET {', '.join(f'{column} = ?' for column in columns)} WHERE username_key = ?",
+                    rows)
+                updated += cursor.rowcount
+        return updated
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def iter_users(self) -> Iterator[Tuple[str, dict]]:
+        for row in self._connection().execute("SELECT * FROM users ORDER BY id"):
+            yield row["username"], self._record(row)
+
+    def import_users(self, users: Dict[str, dict]) -> int:
+        """Внеси многу корисници во една трансакција; постоечките имиња се прескокнуваат"""
+        with self._connection() as db:
+            before = db.total_changes
+            db.executemany(_INSERT.format(" OR IGNORE"),
+                           (_row_values(name, record) for name, record in users.items()))
+            return db.total_changes - before
+
+    def close(self):
+        with self._lock:
+            for db in self._connections:
+                db.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class CachedUserStore:
+    """
+    LRU кеш пред складиштето: пребарувањата се од меморија по првото читање,
+    најмногу max_users корисници (оние со незапишани промени не се исфрлаат).
+    Нови корисници и критични полиња (password_hash) се запишуваат веднаш;
+    WRITE_BEHIND_FIELDS се собираат и се запишуваат во една трансакција на секои
+    flush_interval секунди, порано ако има max_pending корисници со промени,
+    и при close. При пад се губат најмногу промените од последниот интервал.
+    """
+
+    def __init__(self, store, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING, max_users=MAX_CACHED_USERS):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_users = max_users
+        self._users: "OrderedDict[str, Tuple[str, dict]]" = OrderedDict()
+        self._dirty: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        # Flush и синхроните запишувања одат по ред: постар flush не смее да пребрише понова вредност
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self.flushed_users = 0
+        self.last_flush_seconds = 0.0
+        self._flusher = threading.Thread(target=self._flush_loop, name="user-store-flush", daemon=True)
+        self._flusher.start()
+
+    def get(self, username) -> Optional[Tuple[str, dict]]:
+        key = username_key(username)
+        with self._lock:
+            cached = self._users.get(key)
+            if cached is not None:
+                self.hits += 1
+                self._users.move_to_end(key)
+                return cached[0], dict(cached[1])
+
+        found = self.store.get(username)
+        with self._lock:
+            self.misses += 1
+            if found is None:
+                return None
+            # Друг thread можеби веќе го внел (и изменил) записот
+            cached = self._users.get(key)
+            if cached is None:
+                cached = found
+                cached[1].update(self._dirty.get(key, {}))
+            self._remember(key, cached)
+            return cached[0], dict(cached[1])
+
+    def _remember(self, key, entry):
+        """Внеси во кешот (под _lock) и исфрли ги најстарите записи без задоцнети промени"""
+        self._users[key] = entry
+        self._users.move_to_end(key)
+        excess = len(self._users) - self.max_users
+        if excess > 0:
+            # Меѓу првите excess + pending клучеви секогаш има доволно без промени
+            oldest = itertools.islice(self._users, excess + len(self._dirty))
+            for old_key in [old_key for old_key in oldest if old_key not in self._dirty][:excess]:
+                del self._users[old_key]
+
+    def create(self, username, record) -> bool:
+        if not self.store.create(username, record):
+            return False
+        with self._lock:
+            self._remember(username_key(username), (username, dict(record)))
+        return True
+
+    def update(self, username, **fields) -> bool:
+        found = self.get(username)
+        if found is None:
+            return False
+
+        key = username_key(username)
+        if any(field not in WRITE_BEHIND_FIELDS for field in fields):
+            with self._write_lock:
+                # Постарите задоцнети вредности за истите полиња не смеат да ја пребришат оваа
+                with self._lock:
+                    pending = self._dirty.get(key)
+                    if pending is not None:
+                        for field in fields:
+                            pending.pop(field, None)
+                        if not pending:
+                            del self._dirty[key]
+                if not self.store.update(found[0], **fields):
+                    return False
+        else:
+            with self._lock:
+                self._dirty.setdefault(key, {}).update(fields)
+                if len(self._dirty) >= self.max_pending:
+                    self._wakeup.set()
+
+        with self._lock:
+            cached = self._users.get(key)
+            if cached is not None:
+                cached[1].update(fields)
+        return True
+
+    def count(self) -> int:
+        return self.store.count()
+
+    def iter_users(self) -> Iterator[Tuple[str, dict]]:
+        for username, record in self.store.iter_users():
+            with self._lock:
+                pending = self._dirty.get(username_key(username))
+            if pending:
+                record.update(pending)
+            yield username, record
+
+    @property
+    def pending(self) -> int:
+        return len(self._dirty)
+
+    def flush(self) -> int:
+        """Запиши ги сите задоцнети промени; врати број запишани корисници"""
+        with self._write_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+            if not dirty:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                updated = self.store.update_many(dirty)
+            except Exception as e:
+                # Врати ги промените назад (поновите ажурирања имаат предност) за следниот обид
+                print(f"Error flushing user updates: {e}")
+                with self._lock:
+                    for key, fields in dirty.items():
+                        self._dirty[key] = {**fields, **self._dirty.get(key, {})}
+                return 0
+
+        self.flushes += 1
+        self.flushed_users += len(dirty)
+        self.last_flush_seconds = time.perf_counter() - started
+        return updated
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def stats(self):
+        return {
+            "cached_users": len(self._users),
+            "max_users": self.max_users,
+            "hits": self.hits,
+            "misses": self.misses,
+            "pending": self.pending,
+            "flushes": self.flushes,
+            "flushed_users": self.flushed_users,
+            "last_flush_ms": round(self.last_flush_seconds * 1000, 3)
+        }
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        self._flusher.join()
+        self.flush()
+        self.store.close()
+
+
+def migrate_json(json_path, store: SQLiteUserStore) -> int:
+    """Еднократна миграција од JSON датотеката; врати број внесени корисници"""
+    users = JsonUserStore(json_path).load()
+    imported = store.import_users(users)
+    print(f"Migrated {imported} of {len(users)} users from {json_path}")
+    return imported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate game_users.json to SQLite")
+    parser.add_argument("json_path", nargs="?", default="game_users.json")
+    parser.add_argument("db_path", nargs="?", default="game_users.db")
+    args = parser.parse_args()
+
+    store = SQLiteUserStore(args.db_path)
+    migrate_json(args.json_path, store)
+    store.close()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """
-Поедноставен WebSocket клиент без сложен threading
+Поедноставен WebSocket клиент со еден долготраен event loop thread
+Пораките одат преку relay на серверот, а кога е достапен aiortc, по
+connection_established се надградуваат на директен WebRTC DataChannel
 """
 
 import asyncio
@@ -9,14 +11,76 @@ import websockets
 import threading
 import queue
 import time
+from collections import deque
 from typing import Callable, Optional
 
+from session_resume import REPLAY_BUFFER_SIZE, RESUME_GRACE_SECONDS
+from p2p_datachannel import (AIORTC_AVAILABLE, ICE_SERVERS, RELIABLE, UNRELIABLE, WEBRTC_SIGNALS,
+                             DataChannelLink, lane_for)
+from latency_stats import LatencyStats
+
 WEBRTC_AVAILABLE = True
 
+# Backoff при обид за resume по прекин на конекцијата
+RECONNECT_INITIAL_DELAY = 0.25
+RECONNECT_MAX_DELAY = 4.0
+# Presence ping по неподредената лента
+PING_INTERVAL = 5.0
+
+
+class LaneStats:
+    """
+    Статистики по лента: колку чекала пораката пред да излезе на жица
+    и губење пресметано од редниот број на лентата кај примачот.
+    """
+
+    def __init__(self):
+        self.next_seq = 1
+        self.sent = 0
+        self.dropped = 0
+        self.received = 0
+        self.lost = 0
+        self.late = 0
+        self.highest_received = 0
+        self.queue_delay = LatencyStats()
+
+    def stamp(self):
+        seq = self.next_seq
+        self.next_seq += 1
+        return seq
+
+    def on_sent(self, delay):
+        self.sent += 1
+        self.queue_delay.record(delay)
+
+    def on_received(self, lane_seq):
+        self.received += 1
+        if lane_seq is None:
+            return
+        if lane_seq > self.highest_received:
+            self.lost += lane_seq - self.highest_received - 1
+            self.highest_received = lane_seq
+        else:
+            # Стигнала по подоцнежна порака - веќе бројена како изгубена
+            self.late += 1
+            self.lost = max(0, self.lost - 1)
+
+    def summary(self):
+        return {
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "received": self.received,
+            "lost": self.lost,
+            "late": self.late,
+            "queue_delay": self.queue_delay.summary()
+        }
+
 
 class WebRTCClient:
-    def __init__(self, signaling_server_url="ws://127.0.0.1:8765"):  # Вратено на localhost
+    def __init__(self, signaling_server_url="ws://127.0.0.1:8765", use_datachannel=True,
+                 ice_servers=ICE_SERVERS, session_token=None):  # Вратено на localhost
         self.signaling_url = signaling_server_url
+        self.session_token = session_token  # од /login; без него signaling го зема player_name
         self.websocket = None
 
         self.session_id = None
@@ -28,64 +92,141 @@ class WebRTCClient:
         self.on_message_received: Optional[Callable] = None
         self.on_connection_state_change: Optional[Callable] = None
         self.on_peer_info_received: Optional[Callable] = None
+        # Будење на потрошувачот (Tk) кога ќе пристигне порака во queue
+        self.on_message_queued: Optional[Callable] = None
 
         # Поедноставен message queue
         self.message_queue = queue.Queue()
         self.running = False
 
+        # Еден event loop thread за целата сесија
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self._outgoing: Optional[asyncio.Queue] = None
+        self._sender_task = None
+
+        # Resume по прекин: token од серверот, последна примена порака (seq од серверот)
+        # и испратените пораки што серверот можеби не ги примил
+        self.resume_token = None
+        self.last_seq = 0
+        self.out_seq = 0
+        self._sent = deque(maxlen=REPLAY_BUFFER_SIZE)
+        self._resent_through = 0
+        self._send_lock = threading.Lock()
+        self._connected: Optional[asyncio.Event] = None
+
+        # Директен DataChannel; relay останува резерва ако ICE не успее или каналот падне
+        self.use_datachannel = use_datachannel and AIORTC_AVAILABLE
+        self.ice_servers = ice_servers
+        self.link: Optional[DataChannelLink] = None
+        self.transport = "relay"
+        self._direct_from_seq = None
+        self._relay_resend_from = None
+        # Пораките од peer-от се подредуваат по неговиот seq (стигнуваат по два пата)
+        # Празнина во сигурната лента се чува додека не стигне пораката: таа е секогаш
+        # препратена (relay по пад на каналот, replay по resume), освен кога replay-от е нецелосен
+        self.peer_seq = 0
+        self._reorder = {}
+        self._replay_remaining = 0
+        self._replay_gap = False
+        self._skip_next_gap = False
+        self.sent_direct = 0
+        self.sent_relayed = 0
+        self.lanes = {RELIABLE: LaneStats(), UNRELIABLE: LaneStats()}
+        self.ping_rtt = LatencyStats()
+        self._ping_task = None
+
         print(f"Connecting to: {self.signaling_url}")
 
+    def start_async_thread(self):
+        """Стартај го долготрајниот event loop thread"""
+        if self.thread and self.thread.is_alive():
+            return
+
+        loop_ready = threading.Event()
+
+        def run_async_loop():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self._outgoing = asyncio.Queue()
+            self._connected = asyncio.Event()
+            self.loop.call_soon(loop_ready.set)
+            try:
+                self.loop.run_forever()
+            except Exception as e:
+                print(f"Error in async loop: {e}")
+            finally:
+                self.loop.close()
+
+        self.thread = threading.Thread(target=run_async_loop, daemon=True)
+        self.thread.start()
+        loop_ready.wait(timeout=10)
+
+    def stop_async_thread(self):
+        """Застани го event loop thread-от"""
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread and self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join(timeout=5.0)
+
+    def submit(self, coro):
+        """Thread-safe: закажи корутина на event loop-от, врати concurrent Future"""
+        if not self.loop or not self.loop.is_running():
+            coro.close()
+            raise RuntimeError("Event loop is not running")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def _report_error(self, future):
+        """Callback за futures од create/join"""
+        error = future.exception() if not future.cancelled() else None
+        if error:
+            print(f"Session error: {error}")
+            self.connection_state = "error"
+            if self.on_connection_state_change:
+                self.on_connection_state_change("error")
+
     def create_session(self, player_name="Host", player_avatar="🙂"):
         """Создај сесија"""
         self.is_host = True
         self.running = True
+        self.start_async_thread()
 
-        def run_host():
-            try:
-                asyncio.run(self._create_session_async(player_name, player_avatar))
-            except Exception as e:
-                print(f"Host session error: {e}")
-                self.connection_state = "error"
-                if self.on_connection_state_change:
-                    self.on_connection_state_change("error")
-
-        thread = threading.Thread(target=run_host, daemon=True)
-        thread.start()
-        return thread
+        future = self.submit(self._create_session_async(player_name, player_avatar))
+        future.add_done_callback(self._report_error)
+        return future
 
     def join_session(self, invite_code, player_name="Guest", player_avatar="😎"):
         """Приклучи се на сесија"""
         self.is_host = False
         self.running = True
+        self.start_async_thread()
 
-        def run_guest():
-            try:
-                asyncio.run(self._join_session_async(invite_code, player_name, player_avatar))
-            except Exception as e:
-                print(f"Guest session error: {e}")
-                self.connection_state = "error"
-                if self.on_connection_state_change:
-                    self.on_connection_state_change("error")
+        future = self.submit(self._join_session_async(invite_code, player_name, player_avatar))
+        future.add_done_callback(self._report_error)
+        return future
 
-        thread = threading.Thread(target=run_guest, daemon=True)
-        thread.start()
-        return thread
+    def _with_token(self, message):
+        """Додај го session token-от ако корисникот е најавен"""
+        if self.session_token:
+            message["session_token"] = self.session_token
+        return message
 
     async def _create_session_async(self, player_name, player_avatar):
         """Async host сесија"""
         try:
             print("Connecting to signaling server...")
             self.websocket = await websockets.connect(self.signaling_url)
+            self._sender_task = asyncio.ensure_future(self._sender_loop())
 
             # Испрати create request
-            await self.websocket.send(json.dumps({
+            await self.websocket.send(json.dumps(self._with_token({
                 "type": "create_session",
                 "player_name": player_name,
                 "player_avatar": player_avatar
-            }))
+            })))
 
             # Слушај пораки
-            await self._listen_for_messages()
+            await self._run_session()
 
         except Exception as e:
             print(f"Create session error: {e}")
@@ -93,25 +234,25 @@ class WebRTCClient:
             if self.on_connection_state_change:
                 self.on_connection_state_change("error")
         finally:
-            if self.websocket:
-                await self.websocket.close()
+            await self._close_websocket()
 
     async def _join_session_async(self, invite_code, player_name, player_avatar):
         """Async guest сесија"""
         try:
             print("Connecting to signaling server...")
             self.websocket = await websockets.connect(self.signaling_url)
+            self._sender_task = asyncio.ensure_future(self._sender_loop())
 
             # Испрати join request
-            await self.websocket.send(json.dumps({
+            await self.websocket.send(json.dumps(self._with_token({
                 "type": "join_session",
                 "invite_code": invite_code.upper(),
                 "player_name": player_name,
                 "player_avatar": player_avatar
-            }))
+            })))
 
             # Слушај пораки
-            await self._listen_for_messages()
+            await self._run_session()
 
         except Exception as e:
             print(f"Join session error: {e}")
@@ -119,8 +260,67 @@ class WebRTCClient:
             if self.on_connection_state_change:
                 self.on_connection_state_change("error")
         finally:
-            if self.websocket:
-                await self.websocket.close()
+            await self._close_websocket()
+
+    def _set_state(self, state):
+        self.connection_state = state
+        if self.on_connection_state_change:
+            self.on_connection_state_change(state)
+
+    async def _run_session(self):
+        """Слушај; по неочекуван прекин на активна игра пробај resume"""
+        loop = asyncio.get_running_loop()
+        deadline = None
+        while True:
+            await self._listen_for_messages()
+            if not (self.running and self.resume_token and self.connection_state in ("connected", "reconnecting")):
+                return
+            if self.connection_state == "connected":
+                deadline = loop.time() + RESUME_GRACE_SECONDS
+            else:
+                # Нов прекин пред session_resumed: истиот grace период, со мала пауза меѓу обидите
+                await asyncio.sleep(RECONNECT_INITIAL_DELAY)
+            if not await self._reconnect(deadline):
+                print("Could not resume session")
+                self._set_state("error")
+                return
+
+    async def _reconnect(self, deadline):
+        """Нова конекција и resume_session со backoff, додека трае grace периодот на серверот"""
+        self._connected.clear()
+        self._set_state("reconnecting")
+        await self.websocket.close()
+
+        loop = asyncio.get_running_loop()
+        delay = RECONNECT_INITIAL_DELAY
+        while self.running and loop.time() < deadline:
+            try:
+                self.websocket = await asyncio.wait_for(websockets.connect(self.signaling_url),
+                                                        timeout=max(0.1, deadline - loop.time()))
+                await self.websocket.send(json.dumps({
+                    "type": "resume_session",
+                    "session_id": self.session_id,
+                    "resume_token": self.resume_token,
+                    "last_seq": self.last_seq
+                }))
+                return True
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                print(f"Reconnect failed: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        return False
+
+    async def _resend_unacknowledged(self, server_seq):
+        """Препрати ги пораките по последната што серверот ја примил пред прекинот"""
+        with self._send_lock:
+            while self._sent and self._sent[0][0] <= server_seq:
+                self._sent.popleft()
+            pending = list(self._sent)
+        for seq, payload in pending:
+            await self.websocket.send(payload)
+            self._resent_through = seq
+        if pending:
+            print(f"Resent {len(pending)} messages after resume")
 
     async def _listen_for_messages(self):
         """Слушај за signaling пораки"""
@@ -136,6 +336,7 @@ class WebRTCClient:
                 if message_type == "session_created":
                     self.session_id = data.get("session_id")
                     self.invite_code = data.get("invite_code")
+                    self.resume_token = data.get("resume_token")
                     print(f"Session created: {self.invite_code}")
 
                     self.connection_state = "waiting_for_guest"
@@ -147,26 +348,75 @@ class WebRTCClient:
                     print("Guest joined")
                     if self.on_peer_info_received:
                         self.on_peer_info_received(guest_info)
+                    await self._send_client_ready()
 
                 elif message_type == "session_joined":
                     self.session_id = data.get("session_id")
+                    self.resume_token = data.get("resume_token")
                     host_info = data.get("host_info")
                     print("Session joined")
                     if self.on_peer_info_received:
                         self.on_peer_info_received(host_info)
+                    await self._send_client_ready()
 
                 elif message_type == "connection_established":
                     print("Connection established!")
                     self.connection_state = "connected"
+                    self._connected.set()
+                    # Host го започнува WebRTC offer-от; играта веднаш тече преку relay
+                    if self.is_host:
+                        self._start_datachannel(offer=True)
+                    if self._ping_task is None:
+                        self._ping_task = asyncio.ensure_future(self._ping_loop())
                     if self.on_connection_state_change:
                         self.on_connection_state_change("connected")
 
+                elif message_type == "game_message" and data.get("lane") == UNRELIABLE:
+                    self._receive_unreliable(data)
+
                 elif message_type == "game_message":
-                    game_data = data.get("data")
-                    print(f"Game message: {game_data.get('type', 'unknown')}")
-                    self.message_queue.put(game_data)
-                    if self.on_message_received:
-                        self.on_message_received(game_data)
+                    # Серверот нумерира секоја порака; по resume може да стигне дупликат
+                    seq = data.get("seq")
+                    if seq is None or seq > self.last_seq:
+                        if seq is not None:
+                            self.last_seq = seq
+                        self._deliver(data.get("peer_seq"), data.get("data"))
+                    else:
+                        print(f"Duplicate game message {seq} ignored")
+                    if self._replay_remaining:
+                        self._replay_remaining -= 1
+                        if not self._replay_remaining:
+                            self._end_replay()
+
+                elif message_type in WEBRTC_SIGNALS:
+                    if message_type == "webrtc_offer" and self.link is None:
+                        self._start_datachannel(offer=False)
+                    if self.link is not None:
+                        self.link.post(data)
+
+                elif message_type == "session_resumed":
+                    print(f"Session resumed (server has our messages up to {data.get('last_seq')})")
+                    await self._resend_unacknowledged(int(data.get("last_seq", 0)))
+                    # Пропуштените пораки следат веднаш по оваа
+                    self._replay_remaining = int(data.get("replayed", 0))
+                    self._replay_gap = not data.get("replay_complete", True)
+                    if not self._replay_remaining:
+                        self._end_replay()
+                    self.connection_state = "connected"
+                    self._connected.set()
+                    if self.on_connection_state_change:
+                        self.on_connection_state_change(
+                            "resumed" if data.get("replay_complete", True) else "resumed_with_gap")
+
+                elif message_type == "peer_connection_lost":
+                    print("Peer connection lost, waiting for it to resume")
+                    if self.on_connection_state_change:
+                        self.on_connection_state_change("peer_reconnecting")
+
+                elif message_type == "peer_reconnected":
+                    print("Peer reconnected")
+                    if self.on_connection_state_change:
+                        self.on_connection_state_change("peer_reconnected")
 
                 elif message_type == "error":
                     error_msg = data.get("message", "Unknown error")
@@ -188,55 +438,296 @@ class WebRTCClient:
         except Exception as e:
             print(f"Listen error: {e}")
 
+    def _deliver(self, sender_seq, game_data):
+        """Пораки од peer-от по редоследот на испраќање, без разлика преку кој транспорт стигнале"""
+        if sender_seq is None:
+            self.lanes[RELIABLE].on_received(None)
+            self._enqueue(game_data)
+            return
+        if self._skip_next_gap and sender_seq > self.peer_seq:
+            self._skip_next_gap = False
+            self.peer_seq = sender_seq - 1
+        if sender_seq <= self.peer_seq:
+            return
+
+        self._reorder[sender_seq] = game_data
+        while self.peer_seq + 1 in self._reorder:
+            self.peer_seq += 1
+            self.lanes[RELIABLE].on_received(self.peer_seq)
+            self._enqueue(self._reorder.pop(self.peer_seq))
+
+        # Испраќачот чува само REPLAY_BUFFER_SIZE пораки - постарата повеќе не може да стигне
+        if len(self._reorder) > REPLAY_BUFFER_SIZE:
+            self._skip_gap()
+
+    def _end_replay(self):
+        """Replay-от по resume заврши; ако серверот изгубил пораки, празнината е трајна"""
+        if self._replay_gap:
+            self._replay_gap = False
+            self._skip_gap()
+
+    def _skip_gap(self):
+        """Продолжи без пораките што недостасуваат (играта бара snapshot)"""
+        if not self._reorder:
+            # Празнината е пред пораките што допрва ќе стигнат
+            self._skip_next_gap = True
+            return
+        print(f"Missing peer messages {self.peer_seq + 1}..{min(self._reorder) - 1} - skipping")
+        self.peer_seq = min(self._reorder) - 1
+        self._deliver(self.peer_seq + 1, self._reorder.pop(self.peer_seq + 1))
+
+    def _receive_unreliable(self, data):
+        """Неподредена лента: без подредување и dedup; ping/pong не стигнуваат до играта"""
+        self.lanes[UNRELIABLE].on_received(data.get("lseq"))
+        game_data = data.get("data") or {}
+        kind = game_data.get("type")
+        if kind == "ping":
+            self.send_message({"type": "pong", "t": game_data.get("t")})
+        elif kind == "pong":
+            self.ping_rtt.record(time.perf_counter() - game_data.get("t", 0))
+        else:
+            self._enqueue(game_data)
+
+    async def _ping_loop(self):
+        """RTT се мери кај испраќачот - pong го враќа неговото време"""
+        while self.running:
+            await asyncio.sleep(PING_INTERVAL)
+            if self.connection_state == "connected":
+                self.send_message({"type": "ping", "t": time.perf_counter()})
+
+    def _enqueue(self, game_data):
+        print(f"Game message: {game_data.get('type', 'unknown')}")
+        self.message_queue.put((time.perf_counter(), game_data))
+        if self.on_message_queued:
+            self.on_message_queued()
+        if self.on_message_received:
+            self.on_message_received(game_data)
+
+    # ---------- WebRTC DataChannel ----------
+    def _start_datachannel(self, offer):
+        if not self.use_datachannel or self.link is not None:
+            return
+        self.link = DataChannelLink(self._send_signal, self._on_direct_open, self._on_direct_message,
+                                    self._on_direct_closed, ice_servers=self.ice_servers)
+        self.link.start(offer=offer)
+        print("Negotiating direct DataChannel (game continues over relay)")
+
+    async def _send_signal(self, message):
+        message["session_id"] = self.session_id
+        await self.websocket.send(json.dumps(message))
+
+    def _on_direct_open(self):
+        # Следната порака од sender loop-от оди директно; примачот ги подредува по seq
+        self.transport = "datachannel"
+        print("DataChannel open - game messages now go peer-to-peer")
+        if self.on_connection_state_change:
+            self.on_connection_state_change("direct")
+
+    def _on_direct_message(self, message, lane):
+        try:
+            data = json.loads(message)
+            if lane == UNRELIABLE:
+                self._receive_unreliable(data)
+            else:
+                self._deliver(data.get("seq"), data.get("data"))
+        except (TypeError, ValueError) as e:
+            print(f"Invalid DataChannel message: {e}")
+
+    def _on_direct_closed(self):
+        was_direct = self.transport == "datachannel"
+        self.transport = "relay"
+        self.link = None
+        if self._direct_from_seq is not None:
+            # Препраќањето го прави sender loop-от пред следната relay порака, за серверот
+            # да ги прими по ред (dedup-от кај него е по највисок seq)
+            self._relay_resend_from = self._direct_from_seq
+            self._direct_from_seq = None
+            self._outgoing.put_nowait((None, None, None))
+        if was_direct:
+            print("DataChannel closed - falling back to relay")
+            if self.on_connection_state_change and self.running:
+                self.on_connection_state_change("relay")
+
+    async def _resend_over_relay(self):
+        """Пораките испратени директно можеби не стигнале; примачот ги отфрла дупликатите"""
+        await self._connected.wait()
+        from_seq = max(self._relay_resend_from, self._resent_through + 1)
+        with self._send_lock:
+            pending = [(seq, payload) for seq, payload in self._sent if seq >= from_seq]
+        try:
+            for seq, payload in pending:
+                await self.websocket.send(payload)
+                self.sent_relayed += 1
+                self._resent_through = seq
+            self._relay_resend_from = None
+        except websockets.exceptions.ConnectionClosed:
+            print("Relay closed while resending - resume will resend")
+
+    def transport_stats(self):
+        return {
+            "transport": self.transport,
+            "sent_direct": self.sent_direct,
+            "sent_relayed": self.sent_relayed,
+            "lanes": {lane: stats.summary() for lane, stats in self.lanes.items()},
+            "ping_rtt": self.ping_rtt.summary()
+        }
+
+    async def _send_client_ready(self):
+        """Readiness handshake кон серверот (наместо фиксно чекање)"""
+        await self.websocket.send(json.dumps({
+            "type": "client_ready",
+            "session_id": self.session_id
+        }))
+
     def send_message(self, message_dict):
-        """Испрати порака преку нов async call"""
-        if not self.websocket or self.connection_state != "connected":
+        """Thread-safe: стави порака во редот за испраќање преку постоечкиот websocket"""
+        # Додека трае reconnect пораките се чуваат и праќаат по resume
+        if not self.websocket or self.connection_state not in ("connected", "reconnecting"):
             print("Not ready to send message")
             return False
 
-        def send_async():
+        if lane_for(message_dict.get("type")) == UNRELIABLE:
             try:
-                asyncio.run(self._send_message_async(message_dict))
-                return True
-            except Exception as e:
+                self.loop.call_soon_threadsafe(self._send_unreliable, message_dict, time.perf_counter())
+            except RuntimeError as e:
                 print(f"Send error: {e}")
                 return False
+            return True
+
+        with self._send_lock:
+            self.out_seq += 1
+            payload = json.dumps({
+                "type": "game_message",
+                "session_id": self.session_id,
+                "seq": self.out_seq,
+                "data": message_dict
+            })
+            self._sent.append((self.out_seq, payload))
 
-        thread = threading.Thread(target=send_async, daemon=True)
-        thread.start()
+            try:
+                self.loop.call_soon_threadsafe(self._outgoing.put_nowait,
+                                               (self.out_seq, payload, time.perf_counter()))
+            except RuntimeError as e:
+                print(f"Send error: {e}")
+                return False
         return True
 
-    async def _send_message_async(self, message_dict):
-        """Async испраќање на порaka"""
-        if self.websocket and self.connection_state == "connected":
+    def _send_unreliable(self, message_dict, queued_at):
+        """Во loop-от: директно по "fast" лентата, инаку преку relay без seq; никогаш не чека"""
+        stats = self.lanes[UNRELIABLE]
+        payload = json.dumps({
+            "type": "game_message",
+            "session_id": self.session_id,
+            "lane": UNRELIABLE,
+            "lseq": stats.stamp(),
+            "data": message_dict
+        })
+        if self.link is not None and self.link.lane_open(UNRELIABLE):
             try:
-                # Поврзи се повторно за испраќање
-                temp_ws = await websockets.connect(self.signaling_url)
-                await temp_ws.send(json.dumps({
-                    "type": "game_message",
-                    "session_id": self.session_id,
-                    "data": message_dict
-                }))
-                await temp_ws.close()
-                print(f"Sent: {message_dict.get('type', 'unknown')}")
+                self.link.send(payload, UNRELIABLE)
+                self.sent_direct += 1
+                stats.on_sent(time.perf_counter() - queued_at)
+                return
+            except Exception as e:
+                print(f"DataChannel send error, using relay: {e}")
+        if self._connected.is_set():
+            self._outgoing.put_nowait((None, payload, queued_at))
+        else:
+            stats.dropped += 1
+
+    async def _sender_loop(self):
+        """Единствен writer на websocket-от: ги праќа пораките по ред; по прекин чека resume"""
+        while True:
+            seq, payload, queued_at = await self._outgoing.get()
+            if self._relay_resend_from is not None:
+                await self._resend_over_relay()
+            if payload is None:
+                continue  # само будење за препраќањето
+            if seq is None:
+                await self._send_unreliable_relay(payload, queued_at)
+                continue
+
+            if self.link is not None and self.link.is_open:
+                try:
+                    self.link.send(payload)
+                    self.sent_direct += 1
+                    self.lanes[RELIABLE].on_sent(time.perf_counter() - queued_at)
+                    if self._direct_from_seq is None:
+                        self._direct_from_seq = seq
+                    continue
+                except Exception as e:
+                    print(f"DataChannel send error, using relay: {e}")
+
+            await self._connected.wait()
+            # Веќе препратена при resume
+            if seq <= self._resent_through:
+                continue
+            try:
+                await self.websocket.send(payload)
+                self.sent_relayed += 1
+                self.lanes[RELIABLE].on_sent(time.perf_counter() - queued_at)
+            except websockets.exceptions.ConnectionClosed:
+                print(f"Send message error: connection closed, message {seq} kept for resume")
             except Exception as e:
                 print(f"Send message error: {e}")
 
+    async def _send_unreliable_relay(self, payload, queued_at):
+        """Неподредена порака преку relay: се фрла ако конекцијата е прекината"""
+        stats = self.lanes[UNRELIABLE]
+        if not self._connected.is_set():
+            stats.dropped += 1
+            return
+        try:
+            await self.websocket.send(payload)
+            self.sent_relayed += 1
+            stats.on_sent(time.perf_counter() - queued_at)
+        except websockets.exceptions.ConnectionClosed:
+            stats.dropped += 1
+
+    async def _close_websocket(self):
+        if self._sender_task:
+            self._sender_task.cancel()
+            self._sender_task = None
+        if self._ping_task:
+            self._ping_task.cancel()
+            self._ping_task = None
+        if self.link is not None:
+            await self.link.close()
+        if self.websocket:
+            # Намерно излегување - серверот не чека grace период за resume
+            if self.session_id:
+                try:
+                    await self.websocket.send(json.dumps({"type": "leave_session", "session_id": self.session_id}))
+                except websockets.exceptions.ConnectionClosed:
+                    pass
+            await self.websocket.close()
+
     def get_pending_messages(self):
         """Земи pending пораки"""
+        return [message for _, message in self.drain_pending_messages()]
+
+    def drain_pending_messages(self):
+        """Земи pending пораки заедно со времето на прием (perf_counter)"""
         messages = []
         try:
             while True:
-                message = self.message_queue.get_nowait()
-                messages.append(message)
+                messages.append(self.message_queue.get_nowait())
         except queue.Empty:
             pass
         return messages
 
     def close(self):
-        """Едноставно затворање"""
+        """Затвори ја конекцијата и event loop-от"""
         print("Closing WebSocket client...")
+        print(f"Transport: {self.transport_stats()}")
         self.running = False
         self.connection_state = "disconnected"
-        # Не се обидуваме да затвориме websocket тука - ќе се затвори автоматски
-        print("WebSocket client closed")
\ No newline at end of file
+
+        if self.loop and self.loop.is_running():
+            try:
+                self.submit(self._close_websocket()).result(timeout=2.0)
+            except Exception:
+                pass
+
+        self.stop_async_thread()
+        print("WebSocket client closed")
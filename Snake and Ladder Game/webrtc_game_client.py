@@ -16,6 +16,8 @@ from urllib3.util.retry import Retry
 
 # Увези го оригиналниот код
 from webrtc_snake_ladder_game import P2PSnakeLadderGame as SnakeLadderGame
+from tk_bridge import TkDispatcher
+from board_config import load_default_board
 
 SERVER_URL = "http://localhost:8000"
 
@@ -82,6 +84,7 @@ class WebRTCGameClient:
         # Корисник и профил
         self.current_user = None
         self.user_data = {}
+        self.session_token = None
         self.local_profile = load_local_profile()
         self.display_name = self.local_profile.get("display_name", "Player")
         self.display_avatar = self.local_profile.get("display_avatar", "🙂")
@@ -96,6 +99,12 @@ class WebRTCGameClient:
 
         # Game instance
         self.game_instance = None
+        self.board = load_default_board()
+
+        # Callbacks од мрежниот thread се извршуваат во Tk thread-от
+        self.dispatcher = TkDispatcher(self.root)
+        self.join_started_at = None
+        self.connection_timings = {}
 
         # HTTP session
         self.http_session = create_session()
@@ -153,6 +162,7 @@ class WebRTCGameClient:
     def show_offline_mode(self):
         """Офлајн мод без server"""
         self.current_user = "offline_user"
+        self.session_token = None
         self.display_name = self.local_profile.get("display_name", "Player")
         messagebox.showinfo("Offline Mode", "Работиме во офлајн мод. Достапни се само Solo игри.")
         self.show_main_menu(offline_mode=True)
@@ -247,6 +257,7 @@ class WebRTCGameClient:
                 result = response.json()
                 self.current_user = result.get("username", username)
                 self.user_data = result.get("user_data", {})
+                self.session_token = result.get("session_token")
                 self.display_name = self.current_user
 
                 # Зачувај локално
@@ -420,6 +431,7 @@ class WebRTCGameClient:
         """Одјави се"""
         self.current_user = None
         self.user_data = {}
+        self.session_token = None
         self.cleanup_webrtc()
         self.show_login_window()
 
@@ -514,22 +526,14 @@ class WebRTCGameClient:
 
         self.is_host = True
         self.connection_state = "connecting"
-
-        # Создај WebRTC клиент
-        self.webrtc_client = WebRTCClient()
-        self.webrtc_client.on_connection_state_change = self.on_connection_state_change
-        self.webrtc_client.on_message_received = self.on_p2p_message_received
-        self.webrtc_client.on_peer_info_received = self.on_peer_info_received
+        self.create_webrtc_client()
 
         try:
-            # Стартај сесија во background
-            future = self.webrtc_client.create_session(self.display_name, self.display_avatar)
-
             # Покажи waiting прозорец
             self.show_waiting_window("Creating session...")
 
-            # Периодично провери статус
-            self.root.after(1000, self.check_session_status)
+            # Стартај сесија во background
+            future = self.webrtc_client.create_session(self.display_name, self.display_avatar)
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to create session: {e}")
@@ -549,27 +553,29 @@ class WebRTCGameClient:
 
         self.is_host = False
         self.connection_state = "connecting"
-
-        # Создај WebRTC клиент
-        self.webrtc_client = WebRTCClient()
-        self.webrtc_client.on_connection_state_change = self.on_connection_state_change
-        self.webrtc_client.on_message_received = self.on_p2p_message_received
-        self.webrtc_client.on_peer_info_received = self.on_peer_info_received
+        self.create_webrtc_client()
+        self.join_started_at = time.perf_counter()
 
         try:
-            # Приклучи се на сесија
-            future = self.webrtc_client.join_session(invite_code.strip(), self.display_name, self.display_avatar)
-
             # Покажи waiting прозорец
             self.show_waiting_window(f"Joining session {invite_code.upper()}...")
 
-            # Периодично провери статус
-            self.root.after(1000, self.check_session_status)
+            # Приклучи се на сесија
+            future = self.webrtc_client.join_session(invite_code.strip(), self.display_name, self.display_avatar)
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to join session: {e}")
             self.cleanup_webrtc()
 
+    def create_webrtc_client(self):
+        """Создај WebRTC клиент; callbacks се пренесуваат во Tk thread-от"""
+        self.webrtc_client = WebRTCClient(session_token=self.session_token)
+        self.webrtc_client.on_connection_state_change = \
+            lambda state: self.dispatcher.call_soon(self.on_connection_state_change, state)
+        self.webrtc_client.on_peer_info_received = \
+            lambda peer_info: self.dispatcher.call_soon(self.on_peer_info_received, peer_info)
+        self.connection_timings = {}
+
     def show_waiting_window(self, message):
         """Покажи прозорец за чекање"""
         self.waiting_window = tk.Toplevel(self.root)
@@ -592,65 +598,73 @@ class WebRTCGameClient:
     def cancel_connection(self):
         """Откажи го поврзувањето"""
         self.cleanup_webrtc()
-        if hasattr(self, 'waiting_window'):
-            self.waiting_window.destroy()
+        self.close_waiting_window()
         self.show_main_menu()
 
-    def check_session_status(self):
-        """Периодично провери го статусот на сесијата"""
+    def close_waiting_window(self):
+        if hasattr(self, 'waiting_window') and self.waiting_window.winfo_exists():
+            self.waiting_window.destroy()
+
+    def mark_connection_timing(self, stage):
+        """Запиши време (ms) од почетокот на join до дадената фаза"""
+        if self.join_started_at is not None:
+            self.connection_timings[stage] = (time.perf_counter() - self.join_started_at) * 1000
+
+    # ---------- WebRTC Event Handlers (секогаш во Tk thread) ----------
+    def on_connection_state_change(self, state):
+        """Обработка на промена на connection статус"""
         if not self.webrtc_client:
             return
+        # Промена на транспортот (DataChannel/relay) не е промена на конекцијата
+        if state in ("direct", "relay"):
+            print(f"Game transport: {state}")
+            return
+        self.connection_state = state
 
-        # Ако сме host и чекаме guest
-        if self.is_host and self.connection_state == "waiting_for_guest":
-            if hasattr(self, 'waiting_window'):
+        if state == "waiting_for_guest" and self.is_host:
+            # Зачувај го invite code од WebRTC клиентот
+            self.invite_code = getattr(self.webrtc_client, 'invite_code', 'Unknown')
+            if hasattr(self, 'waiting_window') and self.waiting_window.winfo_exists():
                 self.waiting_label.config(
                     text=f"Session created! Share invite code: {self.invite_code}\nWaiting for player to join...")
 
-        # Ако сме connected, започни игра
-        elif self.connection_state == "connected":
-            if hasattr(self, 'waiting_window'):
-                self.waiting_window.destroy()
+        elif state == "connected":
+            self.mark_connection_timing("connected")
+            self.close_waiting_window()
             self.start_p2p_game()
-            return
 
-        # Ако има грешка
-        elif self.connection_state == "error":
-            if hasattr(self, 'waiting_window'):
-                self.waiting_window.destroy()
+        elif state == "error":
+            self.close_waiting_window()
             messagebox.showerror("Connection Failed", "Failed to establish P2P connection.")
             self.cleanup_webrtc()
             self.show_main_menu()
-            return
 
-        # Продолжи да проверуваш
-        self.root.after(1000, self.check_session_status)
+        # Краток прекин: сесијата се продолжува без рестарт на играта
+        elif state in ("reconnecting", "peer_reconnecting"):
+            if self.game_instance:
+                self.game_instance.show_connection_status(
+                    "Connection lost - reconnecting..." if state == "reconnecting"
+                    else "Opponent connection lost - waiting...")
 
-    # ---------- WebRTC Event Handlers ----------
-    def on_connection_state_change(self, state):
-        """Обработка на промена на connection статус"""
-        self.connection_state = state
-
-        if state == "waiting_for_guest" and self.is_host:
-            # Зачувај го invite code од WebRTC клиентот
-            self.invite_code = getattr(self.webrtc_client, 'invite_code', 'Unknown')
+        elif state in ("resumed", "resumed_with_gap", "peer_reconnected"):
+            if self.game_instance:
+                self.game_instance.on_connection_restored(resync=state == "resumed_with_gap")
 
         elif state == "peer_disconnected":
             messagebox.showinfo("Peer Disconnected", "The other player has disconnected.")
             self.cleanup_webrtc()
             self.show_main_menu()
 
-    def on_p2p_message_received(self, message):
-        """Обработка на P2P пораки"""
-        # Проследи ги пораките во игра инстанцата
-        if self.game_instance and hasattr(self.game_instance, 'on_ws_message'):
-            self.game_instance.on_ws_message(json.dumps(message))
-
     def on_peer_info_received(self, peer_info):
         """Кога примиме информации за другиот играч"""
         self.peer_info = peer_info
         print(f"Peer info received: {peer_info}")
 
+        # Host: мерењето почнува кога guest-от ќе се приклучи
+        if self.is_host:
+            self.join_started_at = time.perf_counter()
+        self.mark_connection_timing("peer_info")
+
     # ---------- Game Management ----------
     def start_p2p_game(self):
         """Започни P2P игра"""
@@ -669,6 +683,9 @@ class WebRTCGameClient:
         # Стартај игра со P2P комуникација
         self.start_game(multiplayer=True, player_names=player_names, player_avatars=player_avatars)
 
+        self.mark_connection_timing("board_ready")
+        print(f"Join-to-board timings (ms): {self.connection_timings}")
+
     def start_game(self, multiplayer=False, player_names=None, player_avatars=None, player_name=None,
                    player_avatar=None):
         """Започни игра"""
@@ -701,7 +718,8 @@ class WebRTCGameClient:
                 p2p_connection=P2PWebSocketAdapter(self.webrtc_client) if multiplayer else None,
                 singleplayer=not multiplayer,
                 is_host=self.is_host if multiplayer else True,
-                on_game_end=self.on_game_end
+                on_game_end=self.on_game_end,
+                board=self.board
             )
         except Exception as e:
             print(f"Error creating game instance: {e}")
@@ -722,6 +740,7 @@ class WebRTCGameClient:
         self.peer_info = None
         self.session_id = None
         self.invite_code = None
+        self.join_started_at = None
 
     def run(self):
         """Стартај апликација"""
@@ -734,6 +753,7 @@ class WebRTCGameClient:
     def on_closing(self):
         """При затварање на апликацијата"""
         self.cleanup_webrtc()
+        self.dispatcher.close()
         self.root.destroy()
 
 
@@ -759,6 +779,19 @@ class P2PWebSocketAdapter:
             return self.webrtc_client.get_pending_messages()
         return []
 
+    def drain_pending_messages(self):
+        """Земи pending пораки со времето на прием"""
+        if self.webrtc_client and hasattr(self.webrtc_client, 'drain_pending_messages'):
+            return self.webrtc_client.drain_pending_messages()
+        return []
+
+    def set_message_wakeup(self, callback):
+        """Регистрирај будење (од мрежниот thread) за секоја нова порака"""
+        if self.webrtc_client and hasattr(self.webrtc_client, 'on_message_queued'):
+            self.webrtc_client.on_message_queued = callback
+            return True
+        return False
+
     def send(self, message):
         """Испрати порака (симулира WebSocket.send)"""
         if self.webrtc_client:
@@ -3,21 +3,108 @@
 Enhanced Signaling сервер со подобра синхронизација
 """
 
+import argparse
 import asyncio
+import itertools
 import websockets
 import json
 import logging
 from typing import Dict, Set
 import uuid
 
+from invite_codes import InviteCodeRegistry, normalize_invite_code
+from signaling_backplane import HashRing, InMemoryBackplane, RemoteClient, backplane_from_url, node_channel
+from session_resume import RESUME_GRACE_SECONDS, ResumableSession, other_role, role_of
+from session_tokens import TokenVerifier, load_secret
+from p2p_datachannel import UNRELIABLE, WEBRTC_SIGNALS
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class EnhancedSignalingServer:
-    def __init__(self):
+    def __init__(self, resume_grace=RESUME_GRACE_SECONDS, backplane=None, node_id="node-0", nodes=None,
+                 token_verifier=None, require_auth=False):
         self.sessions: Dict[str, Dict[str, websockets.WebSocketServerProtocol]] = {}
         self.all_clients: Set[websockets.WebSocketServerProtocol] = set()
+        # Обратен индекс: конекција -> сесии во кои учествува
+        self.client_sessions: Dict[websockets.WebSocketServerProtocol, Set[str]] = {}
+        self.resume_grace = resume_grace
+        # Потпишани tokens од /login; без verifier имињата не се проверуваат
+        self.token_verifier = token_verifier
+        self.require_auth = require_auth
+
+        # Cluster: сесијата ја води јазолот од hash ring-от, другите ги препраќаат пораките
+        if nodes and node_id not in nodes:
+            raise ValueError(f"Node {node_id} is not in the cluster {nodes}")
+        self.node_id = node_id
+        self.ring = HashRing(nodes or [node_id])
+        self.backplane = backplane or InMemoryBackplane()
+        self.invite_codes = InviteCodeRegistry(accept=self.owns if self.ring.clustered else None,
+                                               max_attempts=64 * len(self.ring.nodes))
+        self.remote_clients: Dict[str, RemoteClient] = {}
+        # Локални конекции со пораки кон други јазли: конекција -> id и јазли
+        self.connection_ids: Dict[websockets.WebSocketServerProtocol, str] = {}
+        self.connections: Dict[str, websockets.WebSocketServerProtocol] = {}
+        self.remote_routes: Dict[websockets.WebSocketServerProtocol, Set[str]] = {}
+        self._connection_counter = itertools.count(1)
+
+    async def start_backplane(self):
+        await self.backplane.start(node_channel(self.node_id), self.handle_backplane)
+
+    def owns(self, key: str) -> bool:
+        return self.ring.node_for(key) == self.node_id
+
+    def node_for_message(self, data: dict) -> str:
+        """Јазолот што ја води сесијата од пораката (session_id, па invite код)"""
+        if not self.ring.clustered:
+            return self.node_id
+        if data.get("session_id"):
+            return self.ring.node_for(str(data["session_id"]))
+        if data.get("invite_code"):
+            return self.ring.node_for(normalize_invite_code(data["invite_code"]))
+        return self.node_id
+
+    def forward_to_node(self, node_id: str, websocket: websockets.WebSocketServerProtocol, message: str):
+        conn_id = self.connection_ids.get(websocket)
+        if conn_id is None:
+            conn_id = f"{self.node_id}/{next(self._connection_counter)}"
+            self.connection_ids[websocket] = conn_id
+            self.connections[conn_id] = websocket
+        self.remote_routes.setdefault(websocket, set()).add(node_id)
+        self.backplane.publish(node_channel(node_id), {"kind": "client", "conn": conn_id,
+                                                       "origin": self.node_id, "message": message})
+
+    async def handle_backplane(self, envelopes: list):
+        """Серија од backplane-от: пораки од клиенти на други јазли или пораки за нашите клиенти"""
+        for envelope in envelopes:
+            kind = envelope.get("kind")
+            conn_id = envelope.get("conn")
+            if kind == "client":
+                client = self.remote_clients.get(conn_id)
+                if client is None:
+                    client = RemoteClient(self.backplane, conn_id, envelope["origin"])
+                    self.remote_clients[conn_id] = client
+                    await self.register_client(client)
+                await self.handle_message(client, envelope["message"])
+            elif kind == "deliver":
+                websocket = self.connections.get(conn_id)
+                if websocket is not None:
+                    await self.send_safe(websocket, envelope["message"])
+            elif kind == "closed":
+                client = self.remote_clients.pop(conn_id, None)
+                if client is not None:
+                    client.closed = True
+                    await self.unregister_client(client)
+
+    def release_connection(self, websocket: websockets.WebSocketServerProtocol):
+        """Извести ги јазлите каде клиентот има сесии дека конекцијата е затворена"""
+        conn_id = self.connection_ids.pop(websocket, None)
+        if conn_id is None:
+            return
+        del self.connections[conn_id]
+        for node_id in self.remote_routes.pop(websocket, ()):
+            self.backplane.publish(node_channel(node_id), {"kind": "closed", "conn": conn_id})
 
     async def register_client(self, websocket: websockets.WebSocketServerProtocol):
         self.all_clients.add(websocket)
@@ -26,39 +113,129 @@ class EnhancedSignalingServer:
     async def unregister_client(self, websocket: websockets.WebSocketServerProtocol):
         if websocket in self.all_clients:
             self.all_clients.remove(websocket)
-
-        sessions_to_remove = []
-        for session_id, session_data in self.sessions.items():
-            if websocket in session_data.values():
-                sessions_to_remove.append(session_id)
-                # Извести го другиот клиент дека peer се дисконектирал
-                for role, client in session_data.items():
-                    if client != websocket and client in self.all_clients:
-                        try:
-                            await client.send(json.dumps({
-                                "type": "peer_disconnected",
-                                "session_id": session_id
-                            }))
-                        except websockets.exceptions.ConnectionClosed:
-                            pass
-
-        for session_id in sessions_to_remove:
-            del self.sessions[session_id]
+        self.release_connection(websocket)
+
+        # Само сесиите на овој клиент, без скенирање на сите сесии
+        notifications = []
+        for session_id in self.client_sessions.pop(websocket, set()):
+            session_data = self.sessions.get(session_id)
+            if not session_data:
+                continue
+
+            # Игра во тек: сесијата чека resume_grace секунди наместо веднаш да заврши
+            role = role_of(session_data, websocket)
+            if role is not None and session_data["guest"] is not None:
+                self.suspend_role(session_id, role)
+                peer_role = other_role(role)
+                if session_data["resume"].is_connected(peer_role):
+                    notifications.append(self.send_safe(session_data[peer_role], json.dumps({
+                        "type": "peer_connection_lost",
+                        "session_id": session_id,
+                        "grace_seconds": self.resume_grace
+                    })))
+                continue
+
+            # Извести го другиот клиент дека peer се дисконектирал
+            message = json.dumps({
+                "type": "peer_disconnected",
+                "session_id": session_id
+            })
+            for role in ("host", "guest"):
+                client = session_data.get(role)
+                if client is not None and client != websocket and client in self.all_clients:
+                    notifications.append(self.send_safe(client, message))
+
+            self.remove_session(session_id)
+
+        if notifications:
+            await asyncio.gather(*notifications)
 
         logger.info(f"Client {websocket.remote_address} disconnected. Remaining clients: {len(self.all_clients)}")
 
+    async def send_safe(self, websocket: websockets.WebSocketServerProtocol, message: str) -> bool:
+        """Испрати порака, игнорирај затворени конекции"""
+        try:
+            await websocket.send(message)
+            return True
+        except websockets.exceptions.ConnectionClosed:
+            return False
+
+    def index_session(self, websocket: websockets.WebSocketServerProtocol, session_id: str):
+        """Запиши дека клиентот е член на сесијата"""
+        self.client_sessions.setdefault(websocket, set()).add(session_id)
+
+    def unindex_session(self, websocket: websockets.WebSocketServerProtocol, session_id: str):
+        session_ids = self.client_sessions.get(websocket)
+        if session_ids is not None:
+            session_ids.discard(session_id)
+            if not session_ids:
+                del self.client_sessions[websocket]
+
+    def remove_session(self, session_id: str):
+        """Избриши сесија и ослободи го нејзиниот invite код"""
+        session_data = self.sessions.pop(session_id, None)
+        if session_data:
+            self.invite_codes.release(session_data.get("invite_code"))
+            session_data["resume"].close()
+            for role in ("host", "guest"):
+                if session_data.get(role) is not None:
+                    self.unindex_session(session_data[role], session_id)
+
+    def suspend_role(self, session_id: str, role: str):
+        """Закажи бришење на сесијата ако улогата не се врати во grace периодот"""
+        timer = asyncio.get_running_loop().call_later(
+            self.resume_grace, lambda: asyncio.ensure_future(self.expire_role(session_id, role)))
+        self.sessions[session_id]["resume"].suspend(role, timer)
+        logger.info(f"Session {session_id}: {role} disconnected, holding for {self.resume_grace}s")
+
+    async def expire_role(self, session_id: str, role: str):
+        """Grace периодот истекол - крај на сесијата"""
+        session_data = self.sessions.get(session_id)
+        if not session_data or session_data["resume"].is_connected(role):
+            return
+
+        peer_role = other_role(role)
+        peer_connected = session_data["resume"].is_connected(peer_role)
+        self.remove_session(session_id)
+        if peer_connected and session_data[peer_role] is not None:
+            await self.send_safe(session_data[peer_role], json.dumps({
+                "type": "peer_disconnected",
+                "session_id": session_id
+            }))
+        logger.info(f"Session {session_id} expired: {role} did not reconnect")
+
+    def resolve_session_id(self, session_id=None, invite_code=None):
+        """Најди session_id директно или преку invite код"""
+        if invite_code and not session_id:
+            session_id = self.invite_codes.lookup(invite_code)
+        return session_id
+
     async def handle_message(self, websocket: websockets.WebSocketServerProtocol, message: str):
         try:
             data = json.loads(message)
             message_type = data.get("type")
+
+            node_id = self.node_for_message(data)
+            if node_id != self.node_id and not isinstance(websocket, RemoteClient):
+                self.forward_to_node(node_id, websocket, message)
+                return
+
             logger.info(f"Handling message type: {message_type} from {websocket.remote_address}")
 
             if message_type == "create_session":
                 await self.handle_create_session(websocket, data)
             elif message_type == "join_session":
                 await self.handle_join_session(websocket, data)
+            elif message_type == "client_ready":
+                await self.handle_client_ready(websocket, data)
             elif message_type == "game_message":
                 await self.handle_game_message(websocket, data)
+            elif message_type == "resume_session":
+                await self.handle_resume_session(websocket, data)
+            elif message_type in WEBRTC_SIGNALS:
+                await self.handle_webrtc_signal(websocket, data)
+            elif message_type == "leave_session":
+                await self.handle_leave_session(websocket, data)
             else:
                 logger.warning(f"Unknown message type: {message_type}")
 
@@ -67,45 +244,78 @@ class EnhancedSignalingServer:
         except Exception as e:
             logger.error(f"Error handling message: {e}")
 
+    async def authenticate_player(self, websocket: websockets.WebSocketServerProtocol, data: dict, default_name: str):
+        """
+        Име на играчот: корисникот од session_token ако е валиден, инаку player_name
+        (или одбивање ако require_auth). Врати (име, потврдено); име None = одбиен.
+        """
+        token = data.get("session_token")
+        if token and self.token_verifier is not None:
+            username = self.token_verifier.verify(token)
+            if username is not None:
+                return username, True
+
+        if self.require_auth:
+            await websocket.send(json.dumps({
+                "type": "error",
+                "message": "Authentication required"
+            }))
+            logger.warning(f"Rejected unauthenticated {data.get('type')} from {websocket.remote_address}")
+            return None, False
+        return data.get("player_name", default_name), False
+
+    def new_session_id(self) -> str:
+        # Сесијата се креира на јазолот на host-от: id што на ring-от паѓа на овој јазол
+        while True:
+            session_id = str(uuid.uuid4())
+            if self.owns(session_id):
+                return session_id
+
     async def handle_create_session(self, websocket: websockets.WebSocketServerProtocol, data: dict):
-        session_id = str(uuid.uuid4())
-        player_name = data.get("player_name", "Host")
+        player_name, verified = await self.authenticate_player(websocket, data, "Host")
+        if player_name is None:
+            return
+
+        session_id = self.new_session_id()
         player_avatar = data.get("player_avatar", "🙂")
+        invite_code = self.invite_codes.allocate(session_id)
 
         self.sessions[session_id] = {
             "host": websocket,
             "guest": None,
             "host_info": {
                 "name": player_name,
-                "avatar": player_avatar
+                "avatar": player_avatar,
+                "verified": verified
             },
-            "guest_info": None
+            "guest_info": None,
+            "invite_code": invite_code,
+            "resume": ResumableSession()
         }
-
-        invite_code = session_id[:8].upper()
+        self.index_session(websocket, session_id)
 
         response = {
             "type": "session_created",
             "session_id": session_id,
             "invite_code": invite_code,
-            "player_role": "host"
+            "player_role": "host",
+            "resume_token": self.sessions[session_id]["resume"].issue_token("host")
         }
 
         await websocket.send(json.dumps(response))
         logger.info(f"Session {session_id} created with invite code {invite_code}")
 
     async def handle_join_session(self, websocket: websockets.WebSocketServerProtocol, data: dict):
+        player_name, verified = await self.authenticate_player(websocket, data, "Guest")
+        if player_name is None:
+            return
+
         session_id = data.get("session_id")
         invite_code = data.get("invite_code")
-        player_name = data.get("player_name", "Guest")
         player_avatar = data.get("player_avatar", "😎")
 
         # Ако е предоставен invite код, најди ја сесијата
-        if invite_code and not session_id:
-            for sid, session_data in self.sessions.items():
-                if sid[:8].upper() == invite_code.upper():
-                    session_id = sid
-                    break
+        session_id = self.resolve_session_id(session_id, invite_code)
 
         if not session_id or session_id not in self.sessions:
             error_response = {
@@ -131,8 +341,10 @@ class EnhancedSignalingServer:
         session_data["guest"] = websocket
         session_data["guest_info"] = {
             "name": player_name,
-            "avatar": player_avatar
+            "avatar": player_avatar,
+            "verified": verified
         }
+        self.index_session(websocket, session_id)
 
         host_socket = session_data["host"]
 
@@ -148,25 +360,45 @@ class EnhancedSignalingServer:
             "type": "session_joined",
             "session_id": session_id,
             "player_role": "guest",
-            "host_info": session_data["host_info"]
+            "host_info": session_data["host_info"],
+            "resume_token": session_data["resume"].issue_token("guest")
         }))
 
         logger.info(f"Guest {websocket.remote_address} joined session {session_id}")
 
-        # Чекај малку и потоа извести за поврзаност
-        await asyncio.sleep(0.5)
+        # connection_established се праќа кога двата клиенти ќе испратат client_ready
+
+    async def handle_client_ready(self, websocket: websockets.WebSocketServerProtocol, data: dict):
+        """Readiness handshake: двата peers потврдуваат дека се спремни"""
+        session_id = data.get("session_id")
+        session_data = self.sessions.get(session_id)
+        if not session_data:
+            logger.warning(f"client_ready for non-existent session: {session_id}")
+            return
+
+        role = role_of(session_data, websocket)
+        if role is None:
+            logger.warning(f"client_ready from non-member in session {session_id}")
+            return
+
+        ready_roles = session_data.setdefault("ready", set())
+        if role in ready_roles:
+            return
+        ready_roles.add(role)
+
+        if ready_roles != {"host", "guest"}:
+            return
 
         # Извести за успешна поврзаност
-        connection_msg = {
+        connection_msg = json.dumps({
             "type": "connection_established",
             "session_id": session_id
-        }
-
-        try:
-            await host_socket.send(json.dumps(connection_msg))
-            await websocket.send(json.dumps(connection_msg))
+        })
+        results = await asyncio.gather(self.send_safe(session_data["host"], connection_msg),
+                                       self.send_safe(session_data["guest"], connection_msg))
+        if all(results):
             logger.info(f"Connection established for session {session_id}")
-        except websockets.exceptions.ConnectionClosed:
+        else:
             logger.error(f"Connection closed while establishing session {session_id}")
 
     async def handle_game_message(self, websocket: websockets.WebSocketServerProtocol, data: dict):
@@ -178,26 +410,114 @@ class EnhancedSignalingServer:
             return
 
         session_data = self.sessions[session_id]
+        resume = session_data["resume"]
 
         # Определи кој е target клиент
-        target = None
-        if websocket == session_data["host"] and session_data["guest"]:
-            target = session_data["guest"]
-        elif websocket == session_data["guest"] and session_data["host"]:
-            target = session_data["host"]
-
-        if target and target in self.all_clients:
-            try:
-                await target.send(json.dumps({
-                    "type": "game_message",
-                    "session_id": session_id,
-                    "data": game_data
-                }))
-                logger.debug(f"Relayed game message in session {session_id}")
-            except websockets.exceptions.ConnectionClosed:
-                logger.warning(f"Target client disconnected while relaying message")
-        else:
+        role = role_of(session_data, websocket)
+        if role is None or session_data["guest"] is None:
             logger.warning(f"No valid target for game message in session {session_id}")
+            return
+
+        # Неподредена лента (ping, emote...): без seq и без replay buffer, губењето е прифатливо
+        if data.get("lane") == UNRELIABLE:
+            target_role = other_role(role)
+            if resume.is_connected(target_role):
+                await self.send_safe(session_data[target_role], json.dumps(data))
+            return
+
+        # Повторно испратена порака по reconnect - веќе е проследена
+        if not resume.accept_from(role, data.get("seq")):
+            logger.debug(f"Duplicate game message {data.get('seq')} from {role} in session {session_id}")
+            return
+
+        # Секоја порака се нумерира и чува за евентуален resume на примачот
+        target_role = other_role(role)
+        payload = resume.stamp_for(target_role, session_id, game_data, data.get("seq"))
+        if not resume.is_connected(target_role):
+            logger.debug(f"Buffered game message for disconnected {target_role} in session {session_id}")
+        elif await self.send_safe(session_data[target_role], payload):
+            logger.debug(f"Relayed game message in session {session_id}")
+        else:
+            logger.warning(f"Target client disconnected while relaying message, kept for resume")
+
+    async def handle_webrtc_signal(self, websocket: websockets.WebSocketServerProtocol, data: dict):
+        """SDP offer/answer и ICE кандидати се проследуваат непроменети до другиот peer"""
+        session_id = data.get("session_id")
+        session_data = self.sessions.get(session_id)
+        if not session_data:
+            logger.warning(f"WebRTC signal for non-existent session: {session_id}")
+            return
+
+        role = role_of(session_data, websocket)
+        if role is None or session_data["guest"] is None:
+            logger.warning(f"No valid target for WebRTC signal in session {session_id}")
+            return
+
+        # Не се чуваат во replay buffer-от - изгубен offer значи само дека играта останува на relay
+        target_role = other_role(role)
+        if session_data["resume"].is_connected(target_role):
+            await self.send_safe(session_data[target_role], json.dumps(data))
+            logger.info(f"Relayed {data.get('type')} in session {session_id}")
+
+    async def handle_leave_session(self, websocket: websockets.WebSocketServerProtocol, data: dict):
+        """Клиентот намерно излегува - крај на сесијата без grace период"""
+        session_id = data.get("session_id")
+        session_data = self.sessions.get(session_id)
+        role = role_of(session_data, websocket) if session_data else None
+        if role is None:
+            return
+
+        peer_role = other_role(role)
+        peer_connected = session_data["resume"].is_connected(peer_role)
+        self.remove_session(session_id)
+        if peer_connected and session_data[peer_role] is not None:
+            await self.send_safe(session_data[peer_role], json.dumps({
+                "type": "peer_disconnected",
+                "session_id": session_id
+            }))
+        logger.info(f"Session {session_id}: {role} left")
+
+    async def handle_resume_session(self, websocket: websockets.WebSocketServerProtocol, data: dict):
+        """Клиент се враќа по прекин: нова конекција, само пропуштените пораки"""
+        session_id = data.get("session_id")
+        session_data = self.sessions.get(session_id)
+        role = session_data["resume"].role_for_token(data.get("resume_token")) if session_data else None
+        if role is None:
+            await websocket.send(json.dumps({
+                "type": "error",
+                "message": "Session expired"
+            }))
+            logger.warning(f"Resume rejected for session {session_id}")
+            return
+
+        resume = session_data["resume"]
+        resume.cancel_grace(role)
+        previous = session_data[role]
+        if previous is not None and previous != websocket:
+            self.unindex_session(previous, session_id)
+        session_data[role] = websocket
+        self.index_session(websocket, session_id)
+
+        missed, complete = resume.outbox[role].since(int(data.get("last_seq", 0)))
+        await websocket.send(json.dumps({
+            "type": "session_resumed",
+            "session_id": session_id,
+            "player_role": role,
+            # Последната примена порака од клиентот - тој ги препраќа подоцнежните
+            "last_seq": resume.last_received[role],
+            "replay_complete": complete,
+            "replayed": len(missed)
+        }))
+        for payload in missed:
+            await websocket.send(payload)
+
+        peer_role = other_role(role)
+        if resume.is_connected(peer_role) and session_data[peer_role] is not None:
+            await self.send_safe(session_data[peer_role], json.dumps({
+                "type": "peer_reconnected",
+                "session_id": session_id
+            }))
+        logger.info(f"Session {session_id}: {role} resumed, replayed {len(missed)} messages")
 
     async def handle_client(self, websocket: websockets.WebSocketServerProtocol, path: str):
         await self.register_client(websocket)
@@ -212,12 +532,15 @@ class EnhancedSignalingServer:
             await self.unregister_client(websocket)
 
 
-async def start_signaling_server(host="0.0.0.0", port=8765):
-    """Стартај signaling сервер"""
-    server = EnhancedSignalingServer()
-    logger.info(f"Starting signaling server on {host}:{port}")
+async def start_signaling_server(host="0.0.0.0", port=8765, backplane=None, node_id="node-0", nodes=None,
+                                 require_auth=False):
+    """Стартај signaling сервер; со nodes и заеднички backplane е еден јазол од cluster"""
+    server = EnhancedSignalingServer(backplane=backplane, node_id=node_id, nodes=nodes,
+                                     token_verifier=TokenVerifier(load_secret()), require_auth=require_auth)
+    logger.info(f"Starting signaling server {node_id} on {host}:{port}")
 
     try:
+        await server.start_backplane()
         async with websockets.serve(server.handle_client, host, port,
                                     ping_interval=30, ping_timeout=10):
             logger.info("Signaling server is running. Press Ctrl+C to stop.")
@@ -229,7 +552,18 @@ async def start_signaling_server(host="0.0.0.0", port=8765):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Signaling server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--node-id", default="node-0")
+    parser.add_argument("--nodes", default="", help="comma-separated node ids of the cluster")
+    parser.add_argument("--backplane", default="memory", help="memory, tcp://host:port or redis://host:port")
+    parser.add_argument("--require-auth", action="store_true", help="reject clients without a valid session token")
+    args = parser.parse_args()
+
     try:
-        asyncio.run(start_signaling_server())
+        asyncio.run(start_signaling_server(args.host, args.port, backplane_from_url(args.backplane),
+                                           args.node_id, [node for node in args.nodes.split(",") if node],
+                                           args.require_auth))
     except KeyboardInterrupt:
         print("\nServer stopped by user")
\ No newline at end of file
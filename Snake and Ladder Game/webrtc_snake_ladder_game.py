@@ -5,21 +5,37 @@
 
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk, ImageDraw
 import random
 import os
-import math
 import time
 import json
 
+from latency_stats import LatencyStats
+from tk_bridge import TkDispatcher
+from board_config import CLASSIC_BOARD, find_board
+from board_renderer import board_photo
+from sprite_cache import SPRITES
+from animation import AnimationScheduler, MODE_NORMAL, MODE_TURBO, MODE_INSTANT, ease_in_out
+from prediction import MovePredictor
+from turn_protocol import TurnChannel, ACK_DELAY_MS, DUPLICATE, GAP, SNAPSHOT, SNAPSHOT_REQUEST
+
 # Константи
 BOARD_SIZE = 640
 TILE_SIZE = BOARD_SIZE // 10
 BOARD_MARGIN = 40
-ASSET_PATH = "snake_ladder_assets/"
+DICE_SIZE = 70
 
-SNAKES = {98: 78, 95: 56, 87: 24, 62: 18, 54: 34, 16: 6}
-LADDERS = {1: 38, 4: 14, 9: 21, 28: 84, 36: 44, 51: 67, 71: 91, 80: 100}
+# Траења на анимации во секунди (во turbo режим се 4x пократки)
+DICE_ROLL_DURATION = 1.2
+DICE_FACE_INTERVAL = 0.08
+TILE_HOP_DURATION = 0.1
+JUMP_PAUSE = 0.5
+JUMP_SLIDE_DURATION = 0.4
+REMOTE_SLIDE_DURATION = 0.3
+BOT_MOVE_DELAY = 0.8
+BOT_ROLL_DELAY = 1.0
+# Ботот во singleplayer секогаш игра брзо
+BOT_ANIMATION_MODE = MODE_TURBO
 
 
 class P2PSnakeLadderGame:
@@ -33,12 +49,39 @@ class P2PSnakeLadderGame:
                  p2p_connection=None,
                  singleplayer=False,
                  is_host=True,
-                 on_game_end=None):
+                 on_game_end=None,
+                 board=None,
+                 animation_mode=MODE_NORMAL):
 
         self.root = root
         self.root.title("Snake & Ladder Game - P2P")
         self.root.configure(bg="#2c3e50")
 
+        # Состојбата на играта не зависи од Tk (ја користат и headless тестовите)
+        self.init_state(p2p_connection, singleplayer, is_host, on_game_end,
+                        player_names, player_avatars, board, animation_mode)
+
+        # Push доставување на пораки од мрежниот thread во Tk
+        self.dispatcher = TkDispatcher(self.root)
+
+        # Иницијализирај UI прво
+        self.setup_ui()
+        self.init_game()
+
+        # Пораките се будат преку dispatcher-от; polling само ако адаптерот не поддржува push
+        if self.p2p_connection and hasattr(self.p2p_connection, 'set_message_wakeup'):
+            self.message_push_enabled = self.p2p_connection.set_message_wakeup(self.on_message_queued)
+        self.root.bind("<Destroy>", self.on_destroy, add="+")
+        self.process_p2p_messages()
+
+        # Обезбеди се дека прозорецот е visible
+        self.root.update()
+        self.root.deiconify()
+        self.root.lift()
+
+    def init_state(self, p2p_connection=None, singleplayer=False, is_host=True, on_game_end=None,
+                   player_names=None, player_avatars=None, board=None, animation_mode=MODE_NORMAL):
+        """Состојба на играта без widgets; root треба само after/after_cancel"""
         # P2P комуникација
         self.p2p_connection = p2p_connection
         self.singleplayer = singleplayer
@@ -62,27 +105,34 @@ class P2PSnakeLadderGame:
         self.message_buffer = []
         self.message_check_interval = 100
 
-        # Игрална логика
+        # Латенција на пораките од мрежниот thread до Tk
+        self.message_latency = LatencyStats()
+        self.message_push_enabled = False
+
+        # Сите анимации одат преку еден распоредувач со фиксен frame rate
+        self.animations = AnimationScheduler(self.root, mode=animation_mode)
+
+        # Игрална логика (правилата се во headless engine-от)
+        self.set_board_geometry(board or CLASSIC_BOARD)
+        # Потезите на противникот се предвидуваат од коцката (engine-от е детерминистички)
+        self.predictor = MovePredictor(self.engine)
         self.positions = [0, 0]
         self.dice_value = 0
         self.current_player = 0  # 0 = host, 1 = guest
         self.movable = False
         self.my_player_index = 0 if self.is_host else 1  # Мој индекс
 
-        # За P2P - чекаме confirmation пред switch_turn
+        # За P2P - чекаме confirmation пред switch_turn (само стариот протокол)
         self.waiting_for_move_confirmation = False
 
-        # Иницијализирај UI прво
-        self.setup_ui()
-        self.init_game()
-
-        # Стартај периодично процесирање на пораки
-        self.process_p2p_messages()
-
-        # Обезбеди се дека прозорецот е visible
-        self.root.update()
-        self.root.deiconify()
-        self.root.lift()
+        # Компактен протокол: еден turn по потег, ack закачен на следната порака
+        self.turns = TurnChannel()
+        self.ack_timer = None
+        # Спакувана состојба и нејзин Zobrist хаш; peers споредуваат само хашови
+        self.engine_state = 0
+        self.state_hash = 0
+        self.snapshot_requested = False
+        self.reset_state_hash()
 
     def setup_ui(self):
         """Setup UI"""
@@ -96,8 +146,8 @@ class P2PSnakeLadderGame:
         board_container = tk.Frame(main_frame, bg="#34495e", relief=tk.RAISED, bd=3)
         board_container.pack(side=tk.LEFT, padx=10, anchor="n")
 
-        canvas_width = BOARD_SIZE + BOARD_MARGIN * 2
-        canvas_height = BOARD_SIZE + BOARD_MARGIN * 2
+        canvas_width = self.board_width + BOARD_MARGIN * 2
+        canvas_height = self.board_height + BOARD_MARGIN * 2
 
         self.canvas = tk.Canvas(board_container, width=canvas_width, height=canvas_height,
                                 bg="#2c3e50", highlightbackground="#34495e", highlightthickness=3,
@@ -116,7 +166,6 @@ class P2PSnakeLadderGame:
 
         # Потоа цртај ги остатокот
         self.draw_board()
-        self.draw_snakes_and_ladders()
 
     def init_game(self):
         """Иницијализирај игра"""
@@ -144,6 +193,7 @@ class P2PSnakeLadderGame:
         self.setup_controls()
         self.move_token(0)
         self.move_token(1)
+        self.reset_state_hash()
 
         # Bind кликови на токени - само за свој токен
         if not self.singleplayer:
@@ -162,7 +212,8 @@ class P2PSnakeLadderGame:
                 "type": "player_ready",
                 "player_index": self.my_player_index,
                 "name": self.player_names[self.my_player_index],
-                "avatar": self.player_avatars[self.my_player_index]
+                "avatar": self.player_avatars[self.my_player_index],
+                "board": self.board.fingerprint
             })
 
         self.update_turn_status()
@@ -211,6 +262,13 @@ class P2PSnakeLadderGame:
                                       padx=10, pady=5, width=12)
         self.reset_button.pack(pady=5)
 
+        # Брзина на анимации
+        self.animation_mode_var = tk.StringVar(value=self.animations.mode)
+        speed_menu = tk.OptionMenu(dice_frame, self.animation_mode_var, MODE_NORMAL, MODE_TURBO, MODE_INSTANT,
+                                   command=self.animations.set_mode)
+        speed_menu.config(font=("Arial", 10), bg="#34495e", fg="#ecf0f1", highlightthickness=0, width=10)
+        speed_menu.pack(pady=5)
+
         # Status
         self.status_label = tk.Label(self.controls_frame, text="Starting game...",
                                      font=("Arial", 14, "bold"), bg="#34495e", fg="#f1c40f",
@@ -260,18 +318,44 @@ class P2PSnakeLadderGame:
                 return False
         return False
 
+    def on_message_queued(self):
+        """Повикано од мрежниот thread - закажи процесирање во Tk thread"""
+        self.dispatcher.call_soon(self.process_p2p_messages)
+
     def process_p2p_messages(self):
-        """Периодично процесирај P2P пораки"""
-        if self.p2p_connection and hasattr(self.p2p_connection, 'get_pending_messages'):
+        """Процесирај ги пристигнатите P2P пораки"""
+        if self.p2p_connection:
             try:
-                messages = self.p2p_connection.get_pending_messages()
-                for message in messages:
-                    self.handle_p2p_message(message)
+                if hasattr(self.p2p_connection, 'drain_pending_messages'):
+                    for received_at, message in self.p2p_connection.drain_pending_messages():
+                        self.message_latency.record(time.perf_counter() - received_at)
+                        self.handle_p2p_message(message)
+                elif hasattr(self.p2p_connection, 'get_pending_messages'):
+                    for message in self.p2p_connection.get_pending_messages():
+                        self.handle_p2p_message(message)
             except Exception as e:
                 print(f"Error processing P2P messages: {e}")
 
-        # Закажи следно проверување
-        self.root.after(self.message_check_interval, self.process_p2p_messages)
+        # Fallback: периодично проверување ако нема push
+        if self.p2p_connection and not self.message_push_enabled:
+            self.root.after(self.message_check_interval, self.process_p2p_messages)
+
+    def get_message_latency_stats(self):
+        """Латенција од прием на мрежа до обработка во Tk (ms)"""
+        return self.message_latency.summary()
+
+    def on_destroy(self, event):
+        """Исчисти го bridge-от кога прозорецот се затвора"""
+        if event.widget is not self.root:
+            return
+        if self.message_push_enabled:
+            self.p2p_connection.set_message_wakeup(None)
+        self.dispatcher.close()
+        self.animations.close()
+        self.cancel_ack_timer()
+        print(f"P2P message latency: {self.get_message_latency_stats()}")
+        print(f"Animation frames: {self.animations.stats()}")
+        print(f"Move prediction: {self.predictor.stats()}")
 
     def handle_p2p_message(self, message):
         """Обработка на примени P2P пораки"""
@@ -279,12 +363,27 @@ class P2PSnakeLadderGame:
             message_type = message.get("type")
             print(f"Received P2P: {message_type}")
 
-            if message_type == "player_ready":
+            if message_type == "turn":
+                self.handle_remote_turn(message)
+
+            elif message_type == "ack":
+                self.turns.on_ack(int(message.get("ack", 0)))
+
+            elif message_type == SNAPSHOT_REQUEST:
+                self.send_p2p_message({"type": SNAPSHOT, "state": self.engine_state, "hash": self.state_hash})
+
+            elif message_type == SNAPSHOT:
+                self.handle_snapshot(message)
+
+            elif message_type == "player_ready":
                 player_index = message.get("player_index")
                 name = message.get("name", "Player")
                 avatar = message.get("avatar", "😎")
                 self.update_player_info(player_index, name, avatar)
+                if message.get("board"):
+                    self.handle_remote_board(message["board"])
 
+            # Стар протокол (dice_roll/player_move/move_complete/game_sync) - за компатибилност
             elif message_type == "dice_roll":
                 dice_value = int(message.get("value", 1))
                 player = int(message.get("player", 0))
@@ -308,6 +407,148 @@ class P2PSnakeLadderGame:
         except Exception as e:
             print(f"Error handling P2P message: {e}")
 
+    def handle_remote_board(self, fingerprint):
+        """Peers разменуваат само hash на таблата; guest-от ја презема таблата на host-от"""
+        if fingerprint == self.board.fingerprint or self.is_host:
+            return
+
+        board = find_board(fingerprint)
+        if board is None:
+            self.status_label.config(text="Board mismatch: host board not found locally!")
+            print(f"Unknown board from host: {fingerprint}")
+            return
+
+        print(f"Switching to host board: {board.name}")
+        self.apply_board(board)
+
+    def handle_remote_turn(self, message):
+        """Потег од противникот: коцка + хаш на состојбата по потегот"""
+        player = message.get("player")
+        die = message.get("die")
+        # Вредностите доаѓаат од мрежата - engine-от индексира табела по коцката
+        if not (isinstance(player, int) and isinstance(die, int)
+                and 0 <= player < len(self.positions) and 1 <= die <= self.engine.faces):
+            print(f"Invalid turn {message.get('seq')} (player={player!r}, die={die!r}) - requesting snapshot")
+            self.request_snapshot()
+            return
+
+        status = self.turns.accept(message)
+        if status == DUPLICATE:
+            self.schedule_ack()
+            return
+
+        self.dice_value = die
+        if 1 <= die <= 6:
+            self.dice_label.config(image=self.dice_images[die - 1])
+        self.status_label.config(text=f"{self.player_names[player]} rolled {die}")
+
+        # Предвидување од коцката; хашот на peer-от го потврдува, инаку го поправа snapshot-от
+        prediction = self.predictor.predict(player, self.positions[player], die)
+
+        # Engine-от е детерминистички - потегот го пресметуваме локално и го потврдуваме со хашот
+        expected = None
+        if status != GAP and not self.snapshot_requested and player == self.engine.current_player(self.engine_state):
+            expected = self.engine.apply_roll(self.engine_state, die)
+        if expected is None or self.engine.update_hash(self.state_hash, self.engine_state, expected) != message.get("hash"):
+            print(f"Turn {message.get('seq')}: state hash mismatch - requesting snapshot")
+            self.request_snapshot()
+            self.schedule_ack()
+            return
+
+        # Пречекорување не е потег - не влегува во статистиката на предвидувањата
+        if not prediction.overshoot:
+            self.predictor.reconcile(player, self.engine.position_of(expected, player))
+        on_done = (lambda: self.show_remote_victory(player)) if self.engine.is_finished(expected) else None
+
+        if prediction.overshoot:
+            self.status_label.config(text=f"{self.player_names[player]} overshot - turn passes")
+        else:
+            self.total_moves[player] += 1
+            self.animate_predicted_move(prediction, on_done)
+            on_done = None
+
+        self.apply_engine_state(expected)
+        if on_done:
+            on_done()
+        self.schedule_ack()
+
+    def commit_turn(self, player, die):
+        """
+        Испрати го потегот веднаш по кликот - без чекање на потврда.
+        Локалната состојба се менува одеднаш; анимацијата е само приказ.
+        """
+        self.apply_engine_state(self.engine.apply_roll(self.engine_state, die))
+        self.cancel_ack_timer()
+        self.send_p2p_message(self.turns.make_turn(player, die, self.state_hash))
+
+    def apply_engine_state(self, state):
+        """Позиции и ред од спакуваната состојба на engine-от; хашот се ажурира инкрементално"""
+        self.state_hash = self.engine.update_hash(self.state_hash, self.engine_state, state)
+        self.engine_state = state
+        self.positions = self.engine.positions(state)
+        self.current_player = self.engine.current_player(state)
+        if self.engine.is_finished(state):
+            self.movable = False
+            self.roll_button.config(state=tk.DISABLED)
+        else:
+            self.update_turn_status()
+
+    def reset_state_hash(self):
+        """Целосно пресметување од positions/current_player (почеток, стар протокол)"""
+        self.engine_state = self.engine.pack(self.positions, self.current_player)
+        self.state_hash = self.engine.state_hash(self.engine_state)
+
+    def request_snapshot(self):
+        """Хашовите не се совпаѓаат - побарај ја целосната состојба од peer-от (еднаш)"""
+        if not self.snapshot_requested:
+            self.snapshot_requested = True
+            self.send_p2p_message({"type": SNAPSHOT_REQUEST})
+
+    def handle_snapshot(self, message):
+        """Целосна состојба од peer-от; се преместуваат само токените што се разликуваат"""
+        self.snapshot_requested = False
+        previous = self.positions
+        self.apply_engine_state(int(message.get("state", 0)))
+        if self.state_hash != message.get("hash"):
+            print("Snapshot hash differs from local hash - boards do not match?")
+
+        # Предвидувањата што хашот не ги потврдил се споредуваат со авторитативната состојба
+        for player in list(self.predictor.pending):
+            self.predictor.reconcile(player, self.positions[player])
+
+        for player, position in enumerate(self.positions):
+            if position != previous[player]:
+                self.snap_token(player)
+        if self.engine.is_finished(self.engine_state):
+            self.show_remote_victory(self.engine.winner(self.engine_state))
+
+    def show_remote_victory(self, player):
+        self.status_label.config(text=f"🎉 {self.player_names[player]} WINS! 🎉")
+        self.roll_button.config(state=tk.DISABLED)
+
+    def resend_unacked_turns(self):
+        """Потезите што peer-от не ги потврдил можеби се изгубени; дупликатите тој ги игнорира"""
+        for message in self.turns.pending_turns():
+            self.send_p2p_message(message)
+
+    def schedule_ack(self):
+        """Ack се закачува на следниот наш turn; самостоен ack само ако долго не играме"""
+        if self.ack_timer is None and self.turns.ack_pending:
+            self.ack_timer = self.root.after(ACK_DELAY_MS, self.flush_ack)
+
+    def flush_ack(self):
+        self.ack_timer = None
+        if self.turns.ack_pending:
+            self.send_p2p_message(self.turns.make_ack())
+
+    def cancel_ack_timer(self):
+        if self.ack_timer is not None:
+            try:
+                self.root.after_cancel(self.ack_timer)
+            except tk.TclError:
+                pass
+            self.ack_timer = None
+
     def handle_remote_dice_roll(self, player, dice_value):
         """Обработка на remote dice roll"""
         if not self.singleplayer and player != self.my_player_index:
@@ -318,14 +559,42 @@ class P2PSnakeLadderGame:
             self.status_label.config(text=f"{self.player_names[player]} rolled {dice_value}")
             print(f"Remote player {player} rolled {dice_value}")
 
+            # Не чекај player_move - анимирај го предвидениот потег веднаш
+            if player == self.current_player and 1 <= dice_value <= self.engine.faces:
+                prediction = self.predictor.predict(player, self.positions[player], dice_value)
+                if not prediction.overshoot:
+                    self.animate_predicted_move(prediction)
+
+    def animate_predicted_move(self, prediction, on_done=None):
+        """Иста анимација како кај противникот, без испраќање пораки"""
+        player = prediction.player
+        self.positions[player] = prediction.final
+
+        def after_walk():
+            if prediction.final != prediction.landing:
+                self.announce_jump(player, prediction.landing, prediction.final)
+                self.animations.wait(JUMP_PAUSE,
+                                     lambda: self.slide_token(player, prediction.landing, prediction.final,
+                                                              JUMP_SLIDE_DURATION, on_done),
+                                     key=f"token{player}", mode=self.animation_mode_for(player))
+            elif on_done:
+                on_done()
+
+        self.hop_token(player, prediction.start, prediction.landing, after_walk)
+
     def handle_remote_move(self, player, new_position):
-        """Обработка на remote движење"""
+        """Обработка на remote движење - потврда или корекција на предвидувањето"""
         if not self.singleplayer and player != self.my_player_index:
             print(f"Remote move: Player {player} to position {new_position}")
 
-            # Ажурирај позиција
+            prediction, matched = self.predictor.reconcile(player, new_position)
+            if not matched:
+                if prediction is not None:
+                    print(f"Prediction mismatch for player {player}: predicted {prediction.final}, got {new_position}")
+                # Лизгај од местото каде што токенот е моментално нацртан
+                self.slide_token_from(player, self.token_xy(player), new_position, REMOTE_SLIDE_DURATION)
             self.positions[player] = new_position
-            self.move_token(player)
+            self.reset_state_hash()
 
             # Испрати confirmation
             self.send_p2p_message({
@@ -340,7 +609,7 @@ class P2PSnakeLadderGame:
             self.waiting_for_move_confirmation = False
 
             # Провери за победа
-            if self.positions[player] >= 100:
+            if self.engine.is_winning(self.positions[player]):
                 self.handle_victory(player)
             else:
                 self.switch_turn()
@@ -349,17 +618,37 @@ class P2PSnakeLadderGame:
         """Синхронизирај состојба на игра"""
         try:
             if "positions" in state:
-                self.positions = state["positions"]
-                for i in range(len(self.positions)):
-                    self.move_token(i)
+                # Sync е авторитативен - преостанати предвидувања се застарени
+                self.predictor.discard()
+                # Само токени со различна позиција се преместуваат веднаш (надоврзување)
+                for i, position in enumerate(state["positions"]):
+                    if position != self.positions[i]:
+                        self.positions[i] = position
+                        self.snap_token(i)
 
             if "current_player" in state:
                 self.current_player = state["current_player"]
                 self.update_turn_status()
 
+            self.reset_state_hash()
+            if "hash" in state and state["hash"] != self.state_hash:
+                self.request_snapshot()
+
         except Exception as e:
             print(f"Error syncing game state: {e}")
 
+    def show_connection_status(self, text):
+        """Прекин на конекцијата - пораките се чуваат до resume"""
+        self.status_label.config(text=text)
+
+    def on_connection_restored(self, resync=False):
+        """По resume; ако серверот немал сите пропуштени пораки, побарај snapshot од peer-от"""
+        if resync:
+            self.request_snapshot()
+        self.resend_unacked_turns()
+        if not any(self.engine.is_winning(position) for position in self.positions):
+            self.update_turn_status()
+
     def update_turn_status(self):
         """Ажурирај статус за ред"""
         if not self.singleplayer:
@@ -388,31 +677,38 @@ class P2PSnakeLadderGame:
         self.roll_button.config(state=tk.DISABLED)
         self.animate_dice()
 
-    def animate_dice(self, frame=0):
+    def animation_mode_for(self, player):
+        """Режим за анимации на играч - ботот користи побрз режим"""
+        if self.singleplayer and player == 1 and self.animations.mode == MODE_NORMAL:
+            return BOT_ANIMATION_MODE
+        return None
+
+    def animate_dice(self):
         """Анимација на коцка"""
-        if frame < 15:
-            value = random.randint(1, 6)
-            self.dice_label.config(image=self.dice_images[value - 1])
-            self.root.after(80, lambda: self.animate_dice(frame + 1))
-        else:
-            self.dice_value = random.randint(1, 6)
-            self.dice_label.config(image=self.dice_images[self.dice_value - 1])
+        shown = [-1]
 
-            # Испрати dice roll до другиот играч
-            if not self.singleplayer:
-                self.send_p2p_message({
-                    "type": "dice_roll",
-                    "player": self.current_player,
-                    "value": self.dice_value
-                })
+        def on_frame(progress):
+            face = int(progress * DICE_ROLL_DURATION / DICE_FACE_INTERVAL)
+            if face != shown[0]:
+                shown[0] = face
+                self.dice_label.config(image=self.dice_images[random.randint(1, 6) - 1])
 
-            # Овозможи движење
-            self.movable = True
-            self.status_label.config(text=f"You rolled {self.dice_value}. Click your token to move.")
+        self.animations.animate(DICE_ROLL_DURATION, on_frame, self.finish_dice_roll,
+                                key="dice", mode=self.animation_mode_for(self.current_player))
 
-            # Автоматско движење за бот
-            if self.singleplayer and self.current_player == 1:
-                self.root.after(800, lambda: self.try_move(1))
+    def finish_dice_roll(self):
+        """Крај на анимацијата на коцката"""
+        self.dice_value = random.randint(1, 6)
+        self.dice_label.config(image=self.dice_images[self.dice_value - 1])
+
+        # Овозможи движење
+        self.movable = True
+        self.status_label.config(text=f"You rolled {self.dice_value}. Click your token to move.")
+
+        # Автоматско движење за бот
+        if self.singleplayer and self.current_player == 1:
+            self.animations.wait(BOT_MOVE_DELAY, lambda: self.try_move(1),
+                                 key="bot", mode=self.animation_mode_for(1))
 
     def try_move(self, player):
         """Обиди се да се движиш"""
@@ -425,113 +721,143 @@ class P2PSnakeLadderGame:
         if player != self.current_player or not self.movable:
             return
 
+        # Токенот веќе се движи - не започнувај втор потег со истата коцка
+        if self.animations.is_running(f"token{player}"):
+            return
+
         current_pos = self.positions[player]
-        next_pos = current_pos + self.dice_value
+        next_pos, final_pos = self.engine.resolve_move(current_pos, self.dice_value)
+        self.movable = False
 
-        if current_pos == 0:
-            next_pos = self.dice_value
+        # P2P: потегот се испраќа и редот се менува веднаш, паралелно со анимацијата
+        if not self.singleplayer:
+            self.commit_turn(player, self.dice_value)
 
-        if next_pos > 100:
+        if next_pos is None:
             self.status_label.config(text="Overshot! Turn passes.")
-            self.movable = False
-            if not self.singleplayer:
-                self.switch_turn()
-            else:
+            if self.singleplayer:
                 self.switch_turn()
             return
 
         self.total_moves[player] += 1
+        self.positions[player] = final_pos
 
         # Започни анимација на движење
         self.animate_token_move(player, current_pos, next_pos)
 
-    def animate_token_move(self, player, start_pos, end_pos, step=0):
-        """Анимација на движење на токен"""
-        if step < (end_pos - start_pos):
-            intermediate_pos = start_pos + step + 1
-            self.positions[player] = intermediate_pos
-            self.move_token(player)
-            self.root.after(100, lambda: self.animate_token_move(player, start_pos, end_pos, step + 1))
-        else:
-            # Завршена основна анимација, провери за змии/скали
-            final_pos = end_pos
+    def animate_token_move(self, player, start_pos, end_pos):
+        """Анимација на движење на токен плочка по плочка"""
+        self.hop_token(player, start_pos, end_pos, lambda: self.finish_token_move(player, end_pos))
 
-            if final_pos in LADDERS:
-                self.status_label.config(text=f"{self.player_names[player]} climbed a ladder!")
-                ladder_top = LADDERS[final_pos]
-                self.root.after(500, lambda: self.animate_special_move(player, final_pos, ladder_top))
-                return
-            elif final_pos in SNAKES:
-                self.status_label.config(text=f"{self.player_names[player]} was bitten by a snake!")
-                snake_tail = SNAKES[final_pos]
-                self.root.after(500, lambda: self.animate_special_move(player, final_pos, snake_tail))
-                return
+    def hop_token(self, player, start_pos, end_pos, on_done=None):
+        """Само цртање: токенот скока плочка по плочка од start_pos до end_pos"""
+        steps = end_pos - start_pos
 
-            self.positions[player] = final_pos
-            self.move_token(player)
-            self.movable = False
+        def on_frame(progress):
+            travelled = progress * steps
+            tile = start_pos + int(travelled)
+            x, y = self.interpolate_token(player, tile, min(tile + 1, end_pos), travelled - int(travelled))
+            self.place_token(player, x, y)
 
-            # Испрати движење до другиот играч
-            if not self.singleplayer and player == self.my_player_index:
-                self.waiting_for_move_confirmation = True
-                self.send_p2p_message({
-                    "type": "player_move",
-                    "player": player,
-                    "new_position": final_pos
-                })
+        def finish():
+            self.place_token(player, *self.token_anchor(player, end_pos))
+            if on_done:
+                on_done()
 
-            if final_pos >= 100:
-                self.handle_victory(player)
-            elif self.singleplayer or player == self.my_player_index:
-                if not self.waiting_for_move_confirmation:
-                    self.switch_turn()
+        self.animations.animate(TILE_HOP_DURATION * steps, on_frame, finish,
+                                key=f"token{player}", mode=self.animation_mode_for(player))
+
+    def announce_jump(self, player, from_pos, to_pos):
+        if to_pos > from_pos:
+            self.status_label.config(text=f"{self.player_names[player]} climbed a ladder!")
+        else:
+            self.status_label.config(text=f"{self.player_names[player]} was bitten by a snake!")
+
+    def finish_token_move(self, player, final_pos):
+        """Завршена основна анимација, провери за змии/скали"""
+        jump_pos = self.engine.jumps[final_pos]
+
+        if jump_pos != final_pos:
+            self.announce_jump(player, final_pos, jump_pos)
+            self.animations.wait(JUMP_PAUSE, lambda: self.animate_special_move(player, final_pos, jump_pos),
+                                 key=f"token{player}", mode=self.animation_mode_for(player))
+            return
+
+        self.complete_move(player, final_pos)
 
     def animate_special_move(self, player, from_pos, to_pos):
         """Анимација за специјални движења (змии/скали)"""
-        self.positions[player] = to_pos
-        self.move_token(player)
-        self.movable = False
+        self.slide_token(player, from_pos, to_pos, JUMP_SLIDE_DURATION,
+                         on_done=lambda: self.complete_move(player, to_pos))
 
-        # Испрати движење до другиот играч
-        if not self.singleplayer and player == self.my_player_index:
-            self.waiting_for_move_confirmation = True
-            self.send_p2p_message({
-                "type": "player_move",
-                "player": player,
-                "new_position": to_pos
-            })
-
-        if to_pos >= 100:
+    def complete_move(self, player, final_pos):
+        """Токенот стигна на крајната плочка - провери победа"""
+        if self.engine.is_winning(final_pos):
             self.handle_victory(player)
-        elif self.singleplayer or player == self.my_player_index:
-            if not self.waiting_for_move_confirmation:
-                self.switch_turn()
+        elif self.singleplayer:
+            # Во P2P редот е веќе сменет во commit_turn
+            self.switch_turn()
+
+    def snap_token(self, player):
+        """Catch-up (snapshot, game_sync): instant режим ја заменува анимацијата во тек"""
+        self.animations.animate(REMOTE_SLIDE_DURATION, on_done=lambda: self.move_token(player),
+                                key=f"token{player}", mode=MODE_INSTANT)
+
+    def slide_token(self, player, from_pos, to_pos, duration, on_done=None):
+        """Мазно лизгање од една до друга плочка (змија, скала или remote потег)"""
+        self.slide_token_from(player, self.token_anchor(player, from_pos), to_pos, duration, on_done)
+
+    def slide_token_from(self, player, from_xy, to_pos, duration, on_done=None):
+        """Лизгање од произволни координати (пр. корекција на погрешно предвидување)"""
+        from_x, from_y = from_xy
+        to_x, to_y = self.token_anchor(player, to_pos)
+
+        def on_frame(progress):
+            self.place_token(player, from_x + (to_x - from_x) * progress, from_y + (to_y - from_y) * progress)
+
+        def finish():
+            self.move_token(player)
+            if on_done:
+                on_done()
+
+        self.animations.animate(duration, on_frame, finish, key=f"token{player}",
+                                mode=self.animation_mode_for(player), easing=ease_in_out)
+
+    def token_anchor(self, player, position):
+        """Центар на токенот за позиција (0 е надвор од таблата, посебно за секој играч)"""
+        if position <= 0:
+            if player == 0:
+                return 15, self.board_height + BOARD_MARGIN - 40
+            return self.board_width + BOARD_MARGIN * 2 - 15, self.board_height + BOARD_MARGIN - 40
+        return self.get_tile_center_coords(position)
+
+    def interpolate_token(self, player, from_pos, to_pos, progress):
+        from_x, from_y = self.token_anchor(player, from_pos)
+        to_x, to_y = self.token_anchor(player, to_pos)
+        return from_x + (to_x - from_x) * progress, from_y + (to_y - from_y) * progress
 
     def move_token(self, player):
         """Движење на токен"""
-        if self.positions[player] <= 0:
-            if player == 0:
-                x, y = 15, BOARD_SIZE + BOARD_MARGIN - 40
-            else:
-                x, y = BOARD_SIZE + BOARD_MARGIN * 2 - 15, BOARD_SIZE + BOARD_MARGIN - 40
-        else:
-            x, y = self.get_tile_center_coords(self.positions[player])
+        self.place_token(player, *self.token_anchor(player, self.positions[player]))
 
-        if player == 0:
-            offset_x, offset_y = -8, -8
-        else:
-            offset_x, offset_y = 8, 8
+    def token_offset(self, player):
+        """Токените се поместени за да не се преклопуваат на иста плочка"""
+        return (-8, -8) if player == 0 else (8, 8)
+
+    def token_xy(self, player):
+        """Каде е токенот моментално нацртан (координати без поместувањето)"""
+        x1, y1, x2, y2 = self.canvas.coords(self.tokens[player])
+        offset_x, offset_y = self.token_offset(player)
+        return (x1 + x2) / 2 - offset_x, (y1 + y2) / 2 - offset_y
+
+    def place_token(self, player, x, y):
+        """Постави токен и етикета на координати од таблата"""
+        offset_x, offset_y = self.token_offset(player)
 
         self.canvas.coords(self.tokens[player],
                            x + offset_x - 12, y + offset_y - 12,
                            x + offset_x + 12, y + offset_y + 12)
-
-        if self.positions[player] <= 0:
-            label_y = y + offset_y - 30
-        else:
-            label_y = y + offset_y - 30
-
-        self.canvas.coords(self.labels[player], x + offset_x, label_y)
+        self.canvas.coords(self.labels[player], x + offset_x, y + offset_y - 30)
 
     def handle_victory(self, player):
         """Обработка на победа"""
@@ -564,27 +890,33 @@ class P2PSnakeLadderGame:
         self.current_player = 1 - self.current_player
         self.update_turn_status()
 
-        # Синхронизирај состојба во P2P мод
+        # P2P: positions/current_player за постари peers, хашот за проверка кај новите
         if not self.singleplayer:
+            self.reset_state_hash()
             self.send_p2p_message({
                 "type": "game_sync",
                 "state": {
                     "positions": self.positions,
-                    "current_player": self.current_player
+                    "current_player": self.current_player,
+                    "hash": self.state_hash
                 }
             })
 
         if self.singleplayer and self.current_player == 1:
-            self.root.after(1000, self.roll_dice)
+            self.animations.wait(BOT_ROLL_DELAY, self.roll_dice, key="bot", mode=self.animation_mode_for(1))
 
     def reset_game(self):
         """Resetiraj игра"""
+        self.animations.cancel_all()
+        self.predictor.discard()
         self.positions = [0, 0]
         self.move_token(0)
         self.move_token(1)
         self.current_player = 0
         self.movable = False
         self.waiting_for_move_confirmation = False
+        self.snapshot_requested = False
+        self.reset_state_hash()
         self.update_turn_status()
         self.dice_label.config(image='')
         self.total_moves = [0, 0]
@@ -633,199 +965,55 @@ class P2PSnakeLadderGame:
             pass
 
     # ---------- Image and Board Methods ----------
-    def create_dice_image(self, value, size=70):
-        """Создај слика на коцка"""
-        img = Image.new('RGB', (size, size), '#ecf0f1')
-        draw = ImageDraw.Draw(img)
-        dot_radius = size // 12
-        center = size // 2
-        offset = size // 4
-
-        # Рамка на коцката
-        draw.rectangle([2, 2, size - 3, size - 3], outline='#34495e', width=3, fill='#ecf0f1')
-
-        # Точки врз основа на вредност
-        dots = {
-            1: [(center, center)],
-            2: [(center - offset, center - offset), (center + offset, center + offset)],
-            3: [(center - offset, center - offset), (center, center), (center + offset, center + offset)],
-            4: [(center - offset, center - offset), (center + offset, center - offset),
-                (center - offset, center + offset), (center + offset, center + offset)],
-            5: [(center - offset, center - offset), (center + offset, center - offset),
-                (center - offset, center + offset), (center + offset, center + offset), (center, center)],
-            6: [(center - offset, center - offset), (center + offset, center - offset),
-                (center - offset, center), (center + offset, center),
-                (center - offset, center + offset), (center + offset, center + offset)]
-        }
-
-        for x, y in dots[value]:
-            draw.ellipse((x - dot_radius, y - dot_radius, x + dot_radius, y + dot_radius), fill='#e74c3c')
-        return ImageTk.PhotoImage(img)
-
     def load_images(self):
-        """Вчитај слики"""
-        self.dice_images = [self.create_dice_image(i) for i in range(1, 7)]
-
-        try:
-            snake_path = os.path.join(ASSET_PATH, "snake_big.png")
-            ladder_path = os.path.join(ASSET_PATH, "ladder_big.png")
-
-            if os.path.exists(snake_path):
-                self.base_snake_img = Image.open(snake_path).convert("RGBA")
-            else:
-                self.base_snake_img = self.create_snake_image()
-
-            if os.path.exists(ladder_path):
-                self.base_ladder_img = Image.open(ladder_path).convert("RGBA")
-            else:
-                self.base_ladder_img = self.create_ladder_image()
-
-        except Exception:
-            self.base_snake_img = self.create_snake_image()
-            self.base_ladder_img = self.create_ladder_image()
-
-    def create_snake_image(self):
-        """Создади слика на змија"""
-        img = Image.new('RGBA', (80, 80), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        draw.ellipse([10, 20, 70, 60], fill='#e74c3c', outline='#c0392b', width=3)
-        draw.ellipse([50, 10, 75, 35], fill='#c0392b', outline='#8b0000', width=2)
-        draw.ellipse([58, 16, 62, 20], fill='white')
-        draw.ellipse([68, 16, 72, 20], fill='white')
-        draw.ellipse([59, 17, 61, 19], fill='black')
-        draw.ellipse([69, 17, 71, 19], fill='black')
-        return img
-
-    def create_ladder_image(self):
-        """Создади слика на скала"""
-        img = Image.new('RGBA', (80, 80), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        draw.rectangle([25, 5, 30, 75], fill='#8B4513', outline='#654321', width=1)
-        draw.rectangle([50, 5, 55, 75], fill='#8B4513', outline='#654321', width=1)
-        for i in range(6):
-            y = 10 + i * 11
-            draw.rectangle([25, y, 55, y + 3], fill='#A0522D', outline='#654321', width=1)
-        return img
+        """Слики од заедничкиот кеш - нов прозорец или реванш не прави PIL обработка"""
+        self.dice_images = [SPRITES.photo(self.root, f"dice_{value}", DICE_SIZE) for value in range(1, 7)]
+
+    def set_board_geometry(self, board):
+        """Постави табла: engine и претходно пресметани центри на плочките"""
+        self.board = board
+        self.engine = board.engine()
+        self.tile_size = BOARD_SIZE // max(board.rows, board.cols)
+        self.board_width = self.tile_size * board.cols
+        self.board_height = self.tile_size * board.rows
+
+        # tile_centers[tile] -> (x, y); индекс 0 е надвор од таблата
+        self.tile_centers = [(15, self.board_height + BOARD_MARGIN - 40)]
+        for tile in range(1, board.last_tile + 1):
+            row, col = board.tile_cell(tile)
+            x = col * self.tile_size + self.tile_size // 2 + BOARD_MARGIN
+            y = self.board_height - (row * self.tile_size + self.tile_size // 2) + BOARD_MARGIN
+            self.tile_centers.append((x, y))
+
+    def apply_board(self, board):
+        """Замени ја таблата во тек (пр. таблата на host-от)"""
+        self.set_board_geometry(board)
+        self.predictor = MovePredictor(self.engine)
+        self.reset_state_hash()
+        self.canvas.delete("board")
+        self.canvas.config(width=self.board_width + BOARD_MARGIN * 2,
+                           height=self.board_height + BOARD_MARGIN * 2)
+        self.draw_board()
+        for player in range(len(self.positions)):
+            self.move_token(player)
 
     def draw_board(self):
-        """Цртај табла"""
-        colors = ['#3498db', '#5dade2', '#85c1e9', '#aed6f1', '#d6eaf8', '#ebf5fb']
-
-        for row in range(10):
-            for col in range(10):
-                x1 = col * TILE_SIZE + BOARD_MARGIN
-                y1 = (9 - row) * TILE_SIZE + BOARD_MARGIN
-                x2 = x1 + TILE_SIZE
-                y2 = y1 + TILE_SIZE
-
-                if row % 2 == 0:
-                    index = row * 10 + col + 1
-                else:
-                    index = row * 10 + (9 - col) + 1
-
-                color_index = (row + col) % len(colors)
-                color = colors[color_index]
-
-                if index == 1:
-                    color = '#27ae60'
-                elif index == 100:
-                    color = '#f1c40f'
-                elif index in SNAKES:
-                    color = '#e74c3c'
-                elif index in LADDERS:
-                    color = '#2ecc71'
-
-                self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline='#2c3e50', width=2)
-                self.canvas.create_text(x1 + TILE_SIZE // 2, y1 + TILE_SIZE // 2,
-                                        text=str(index), font=("Arial", 12, "bold"), fill="#2c3e50")
+        """Цртај табла - една пред-рендерирана слика наместо ставка по плочка"""
+        self.board_photo = board_photo(self.root, self.board, self.tile_size, BOARD_MARGIN)
+        self.canvas.create_image(0, 0, image=self.board_photo, anchor="nw", tags="board")
+
+        # Само токените и етикетите остануваат живи ставки над таблата
+        self.canvas.tag_lower("board")
 
     def get_tile_center_coords(self, pos):
         """Врати координати за позиција"""
         if pos <= 0:
-            x = 15
-            y = BOARD_SIZE + BOARD_MARGIN - 40
-            return x, y
-
-        if pos > 100:
-            pos = 100
-
-        pos -= 1
-        row = pos // 10
-
-        if row % 2 == 0:
-            col = pos % 10
-        else:
-            col = 9 - (pos % 10)
-
-        x = col * TILE_SIZE + TILE_SIZE // 2 + BOARD_MARGIN
-        y = BOARD_SIZE - (row * TILE_SIZE + TILE_SIZE // 2) + BOARD_MARGIN
-        return x, y
-
-    def draw_snakes_and_ladders(self):
-        """Цртај змии и скали"""
-        self.snake_photo_images = []
-        self.ladder_photo_images = []
+            return self.tile_centers[0]
 
-        for start_pos, end_pos in SNAKES.items():
-            self._draw_snake(start_pos, end_pos)
+        if pos > self.engine.last_tile:
+            pos = self.engine.last_tile
 
-        for start_pos, end_pos in LADDERS.items():
-            self._draw_ladder(start_pos, end_pos)
-
-        self.canvas.tag_raise("player0")
-        self.canvas.tag_raise("player1")
-        self.canvas.tag_raise("label0")
-        self.canvas.tag_raise("label1")
-
-    def _draw_snake(self, start_pos, end_pos):
-        """Цртај змија"""
-        start_x, start_y = self.get_tile_center_coords(start_pos)
-        end_x, end_y = self.get_tile_center_coords(end_pos)
-
-        self.canvas.create_line(start_x, start_y, end_x, end_y,
-                                fill='#c0392b', width=8, smooth=True,
-                                capstyle=tk.ROUND, arrow=tk.LAST, arrowshape=(16, 20, 6))
-
-        try:
-            resized_snake = self.base_snake_img.resize((40, 40), Image.Resampling.LANCZOS)
-            snake_photo = ImageTk.PhotoImage(resized_snake)
-            self.snake_photo_images.append(snake_photo)
-            self.canvas.create_image(end_x, end_y, image=snake_photo)
-        except Exception:
-            self.canvas.create_oval(end_x - 8, end_y - 8, end_x + 8, end_y + 8,
-                                    fill='#e74c3c', outline='#c0392b', width=2)
-
-    def _draw_ladder(self, start_pos, end_pos):
-        """Цртај скала"""
-        start_x, start_y = self.get_tile_center_coords(start_pos)
-        end_x, end_y = self.get_tile_center_coords(end_pos)
-
-        offset = 8
-        self.canvas.create_line(start_x - offset, start_y, end_x - offset, end_y,
-                                fill='#27ae60', width=4, capstyle=tk.ROUND)
-        self.canvas.create_line(start_x + offset, start_y, end_x + offset, end_y,
-                                fill='#27ae60', width=4, capstyle=tk.ROUND)
-
-        steps = 5
-        for i in range(1, steps):
-            step_x1 = start_x + (end_x - start_x) * i / steps - offset
-            step_y1 = start_y + (end_y - start_y) * i / steps
-            step_x2 = start_x + (end_x - start_x) * i / steps + offset
-            step_y2 = start_y + (end_y - start_y) * i / steps
-            self.canvas.create_line(step_x1, step_y1, step_x2, step_y2, fill='#2ecc71', width=3)
-
-        try:
-            angle = math.atan2(end_y - start_y, end_x - start_x)
-            angle_deg = math.degrees(angle)
-            rotated_ladder = self.base_ladder_img.rotate(-angle_deg, expand=True)
-            resized_ladder = rotated_ladder.resize((50, 50), Image.Resampling.LANCZOS)
-            ladder_photo = ImageTk.PhotoImage(resized_ladder)
-            self.ladder_photo_images.append(ladder_photo)
-            mid_x = (start_x + end_x) // 2
-            mid_y = (start_y + end_y) // 2
-            self.canvas.create_image(mid_x, mid_y, image=ladder_photo)
-        except Exception:
-            pass
+        return self.tile_centers[pos]
 
     def on_ws_message(self, message):
         """Compatibility метод за интеграција со постоечкиот код"""